@@ -3,25 +3,310 @@ import yaml
 import json
 import tempfile
 import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 from ansible_runner import run
-from models import db, PlaybookExecution, Node, NodeGroup
+from models import db, PlaybookExecution, ExecutionLogChunk, Node
+from ssh_prober import SSHProber
+from inventory_cache import InventoryCache
+from fact_cache import FactCache
+from connection_profile import ConnectionProfile
+from versioning import bump
+
+
+class PingResultBatch:
+    """Collects per-node reachability results, emitting and persisting them in bulk"""
+    
+    def __init__(self, socketio, batch_size):
+        self.socketio = socketio
+        self.batch_size = batch_size
+        self.checked_at = datetime.utcnow()
+        self.results = {}
+        self.pending = []
+    
+    def record(self, node_id, success, status=None, error=None, **extra):
+        """Record a node's first result; error is reported to clients but not stored"""
+        if node_id in self.results:
+            return
+        status = status or ('reachable' if success else 'unreachable')
+        self.results[node_id] = dict(id=node_id, status=status, last_checked=self.checked_at, **extra)
+        message = dict(node_id=node_id, status=status, success=success, **extra)
+        if error:
+            message['error'] = error
+        self.pending.append(message)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self.pending:
+            self.socketio.emit('node_ping_result', {'results': self.pending})
+            self.pending = []
+    
+    def save(self):
+        """Write every recorded status with a single executemany UPDATE"""
+        if self.results:
+            db.session.execute(db.update(Node), list(self.results.values()))
+            bump('nodes', 'groups')
+            db.session.commit()
+
+
+def validate_dependencies(playbooks, dependencies):
+    """Return an error message if dependencies is not an acyclic map between submitted playbooks"""
+    if not isinstance(dependencies, dict):
+        return 'Dependencies must map playbook names to lists of playbook names'
+    
+    for playbook, requires in dependencies.items():
+        if playbook not in playbooks:
+            return f'Dependency declared for unknown playbook {playbook}'
+        if not isinstance(requires, list) or any(r not in playbooks for r in requires):
+            return f'Dependencies of {playbook} must be a list of submitted playbooks'
+    
+    # Kahn's algorithm; anything left unordered is part of a cycle
+    remaining = {pb: set(dependencies.get(pb, [])) for pb in playbooks}
+    while remaining:
+        ready = [pb for pb, requires in remaining.items() if not requires & remaining.keys()]
+        if not ready:
+            return f"Dependency cycle between {', '.join(sorted(remaining))}"
+        for pb in ready:
+            del remaining[pb]
+    return None
+
+
+class ExecutionLease:
+    """Heartbeat of a running execution, and the way a cancellation reaches its runs.
+    
+    While held, a thread stamps heartbeat_at every EXECUTION_HEARTBEAT_INTERVAL
+    seconds so the scheduler knows the run is alive, and reads the status back:
+    a 'cancelling' status set by any process trips cancel_requested, which
+    ansible-runner polls through its cancel_callback.
+    """
+    
+    ACTIVE_STATUSES = ('running', 'cancelling')
+    
+    def __init__(self, app, execution_id):
+        self.app = app
+        self.execution_id = execution_id
+        self.interval = app.config['EXECUTION_HEARTBEAT_INTERVAL']
+        self.cancel_requested = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat_loop, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+    
+    def cancelled(self):
+        return self.cancel_requested.is_set()
+    
+    def _beat_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self._beat()
+            except Exception as e:
+                print(f"Execution {self.execution_id} heartbeat error: {e}")
+    
+    def _beat(self):
+        db.session.execute(
+            db.update(PlaybookExecution)
+            .where(PlaybookExecution.id == self.execution_id,
+                   PlaybookExecution.status.in_(self.ACTIVE_STATUSES))
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        status = db.session.query(PlaybookExecution.status).filter_by(id=self.execution_id).scalar()
+        db.session.commit()
+        if status != 'running':
+            self.cancel_requested.set()  # Cancelling, or already finished elsewhere
+
+
+class ExecutionEventStream:
+    """Relays ansible-runner events as compact Socket.IO messages and persists output as it arrives.
+    
+    One stream is shared by every playbook of an execution, including ones
+    running concurrently, so all buffering happens under a lock. While the
+    stream is open (used as a context manager), a ticker thread flushes
+    buffered events and output that have waited EXECUTION_EVENT_FLUSH_INTERVAL,
+    so a quiet task does not hold back what came before it.
+    """
+    
+    HOST_RESULT_EVENTS = {
+        'runner_on_ok': 'ok',
+        'runner_on_failed': 'failed',
+        'runner_on_unreachable': 'unreachable',
+        'runner_on_skipped': 'skipped'
+    }
+    RECAP_FIELDS = (('ok', 'ok'), ('changed', 'changed'), ('failures', 'failed'),
+                    ('dark', 'unreachable'), ('skipped', 'skipped'))
+    
+    def __init__(self, socketio, execution_id, app, prefix_output=False, cancelled=lambda: False):
+        config = app.config
+        self.socketio = socketio
+        self.app = app
+        self.execution_id = execution_id
+        self.cancelled = cancelled  # Polled by runs so a cancellation stops ansible
+        self.batch_size = config['EXECUTION_EVENT_BATCH_SIZE']
+        self.flush_interval = config['EXECUTION_EVENT_FLUSH_INTERVAL']
+        self.output_flush_bytes = config['EXECUTION_OUTPUT_FLUSH_BYTES']
+        self.prefix_output = prefix_output  # Tag lines with their playbook when runs interleave
+        self.lock = threading.RLock()
+        self.events = []
+        self.output = []
+        self.output_size = 0
+        self.log_seq = 0
+        self.log_offset = 0
+        self.last_flush = time.monotonic()
+        self._closed = threading.Event()
+        self._ticker = threading.Thread(target=self._tick_loop, daemon=True)
+    
+    def __enter__(self):
+        self._ticker.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._closed.set()
+        self._ticker.join()
+        self.flush()
+    
+    def _tick_loop(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                with self.lock:
+                    due = (self.events or self.output) and time.monotonic() - self.last_flush >= self.flush_interval
+                    if due:
+                        with self.app.app_context():
+                            self.flush()
+            except Exception as e:
+                print(f"Execution {self.execution_id} event flush error: {e}")
+    
+    def start_playbook(self, playbook_name):
+        self.write(f"=== {playbook_name} ===\n")
+    
+    def handler_for(self, playbook_name, label=None):
+        """ansible-runner event_handler for one playbook; events are not kept in the artifacts directory"""
+        def handle(event):
+            self.handle(event, playbook_name, label)
+            return False
+        return handle
+    
+    def handle(self, event, playbook_name, label=None):
+        with self.lock:
+            stdout = event.get('stdout')
+            if stdout:
+                if self.prefix_output:
+                    stdout = '\n'.join(f'[{label or playbook_name}] {line}' for line in stdout.split('\n'))
+                self.write(stdout + '\n')
+            
+            message = self._compact(event.get('event'), event.get('event_data') or {}, playbook_name)
+            if message:
+                self.events.append(message)
+            
+            if len(self.events) >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+    
+    def _compact(self, event_name, data, playbook_name):
+        if event_name == 'playbook_on_task_start':
+            return {'type': 'task_start', 'playbook': playbook_name, 'play': data.get('play'), 'task': data.get('task')}
+        
+        if event_name in self.HOST_RESULT_EVENTS:
+            result = data.get('res') or {}
+            status = self.HOST_RESULT_EVENTS[event_name]
+            if status == 'ok' and result.get('changed'):
+                status = 'changed'
+            message = {'type': 'host_result', 'playbook': playbook_name, 'task': data.get('task'),
+                       'host': data.get('host'), 'status': status}
+            if status in ('failed', 'unreachable') and result.get('msg'):
+                message['msg'] = str(result['msg'])[:200]
+            return message
+        
+        if event_name == 'playbook_on_stats':
+            stats = {}
+            for key, field in self.RECAP_FIELDS:
+                for host, count in (data.get(key) or {}).items():
+                    stats.setdefault(host, {})[field] = count
+            return {'type': 'recap', 'playbook': playbook_name, 'stats': stats}
+        
+        return None
+    
+    def write(self, text):
+        with self.lock:
+            self.output.append(text)
+            self.output_size += len(text)
+            if self.output_size >= self.output_flush_bytes:
+                self._persist_output()
+    
+    def flush(self):
+        with self.lock:
+            if self.events:
+                self.socketio.emit('execution_events', {'execution_id': self.execution_id, 'events': self.events})
+                self.events = []
+            self._persist_output()
+            self.last_flush = time.monotonic()
+    
+    def _persist_output(self):
+        """Append buffered output as a log chunk so the full log is never held in memory"""
+        if not self.output:
+            return
+        content = ''.join(self.output)
+        self.output = []
+        self.output_size = 0
+        
+        db.session.add(ExecutionLogChunk(
+            execution_id=self.execution_id,
+            seq=self.log_seq,
+            start_offset=self.log_offset,
+            length=len(content),
+            content=content
+        ))
+        self.log_seq += 1
+        self.log_offset += len(content)
+        db.session.execute(
+            db.update(PlaybookExecution)
+            .where(PlaybookExecution.id == self.execution_id)
+            .values(log_size=self.log_offset)
+        )
+        bump('executions')
+        db.session.commit()
+
 
 class AnsibleRunner:
-    def __init__(self, socketio):
+    def __init__(self, socketio, app=None):
         self.socketio = socketio
+        self.app = app
+        if app is not None:
+            self.inventory_cache = InventoryCache(app.config['INVENTORY_CACHE_FOLDER'],
+                                                  app.config['INVENTORY_CACHE_SIZE'], self._host_vars,
+                                                  app.config['INVENTORY_CACHE_LEASE_SECONDS'])
+            self.fact_cache = FactCache(app.config)
+            self.connection_profile = ConnectionProfile(app.config)
+        
+    def _host_vars(self, node):
+        """Connection variables for a node's inventory entry"""
+        return {
+            'ansible_host': node.hostname,
+            'ansible_user': node.username,
+            'ansible_port': node.port,
+            'ansible_ssh_common_args': '-o StrictHostKeyChecking=no',
+            **self.connection_profile.host_vars(node)
+        }
+    
+    def _run_options(self):
+        """Settings shared by every ansible_runner.run call: the fact cache and the SSH connection profile"""
+        options = self.fact_cache.run_options()
+        options['envvars'].update(self.connection_profile.envvars())
+        return options
         
     def ping_node(self, node):
         """Test connectivity to a single node"""
         inventory = {
             'all': {
                 'hosts': {
-                    node.hostname: {
-                        'ansible_host': node.hostname,
-                        'ansible_user': node.username,
-                        'ansible_port': node.port,
-                        'ansible_ssh_common_args': '-o StrictHostKeyChecking=no'
-                    }
+                    node.hostname: self._host_vars(node)
                 }
             }
         }
@@ -36,6 +321,7 @@ class AnsibleRunner:
                     module='ping',
                     inventory=inventory_file,
                     host_pattern=node.hostname,
+                    **self._run_options(),
                     quiet=True
                 )
                 
@@ -48,139 +334,483 @@ class AnsibleRunner:
                 node.status = 'unreachable'
                 
             node.last_checked = datetime.utcnow()
+            bump('nodes', 'groups')
             db.session.commit()
             
         return node.status == 'reachable'
     
-    def execute_playbooks(self, execution_id):
-        """Execute playbooks in background thread"""
+    def ping_nodes(self, node_ids, forks=None):
+        """Ping many nodes with a single forked ad-hoc run in a background thread"""
+        def run_ping():
+            with self.app.app_context():
+                self._run_bulk_ping(node_ids, forks)
+        
+        thread = threading.Thread(target=run_ping)
+        thread.start()
+    
+    def probe_nodes(self, node_ids, escalate=False, forks=None):
+        """Check SSH reachability of many nodes in a background thread.
+        
+        With escalate, nodes that answer with an SSH banner are then pinged
+        through Ansible to confirm they are actually manageable.
+        """
+        def run_probe():
+            with self.app.app_context():
+                passed = self._run_probe(node_ids)
+                if escalate and passed:
+                    self._run_bulk_ping(passed, forks)
+        
+        thread = threading.Thread(target=run_probe)
+        thread.start()
+    
+    def refresh_facts(self, node_ids, forks=None):
+        """Re-gather facts for many nodes into the fact cache in a background thread"""
+        def run_refresh():
+            with self.app.app_context():
+                self._run_fact_refresh(node_ids, forks)
+        
+        thread = threading.Thread(target=run_refresh)
+        thread.start()
+    
+    def _run_fact_refresh(self, node_ids, forks):
+        # The compiled inventory names hosts by hostname, which is also the fact cache key
+        with self.inventory_cache.lease(node_ids, []) as (inventory_file, hosts):
+            if not hosts:
+                return
+            
+            gathered = set()
+            
+            def handle_event(event):
+                if event.get('event') == 'runner_on_ok':
+                    gathered.add(event.get('event_data', {}).get('host'))
+                return False
+            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                try:
+                    run(
+                        private_data_dir=temp_dir,
+                        module='setup',
+                        inventory=inventory_file,
+                        host_pattern='all',
+                        forks=forks or self.app.config['PING_FORKS'],
+                        **self._run_options(),
+                        event_handler=handle_event,
+                        quiet=True
+                    )
+                except Exception as e:
+                    print(f"Fact refresh failed: {e}")
+            
+            self.socketio.emit('node_facts_refreshed', {
+                'host_count': len(hosts),
+                'gathered': len(gathered),
+                'failed': sorted(set(hosts) - gathered)
+            })
+    
+    def _run_probe(self, node_ids):
+        config = self.app.config
+        targets = db.session.query(Node.id, Node.hostname, Node.port).filter(Node.id.in_(node_ids)).all()
+        if not targets:
+            return []
+        
+        batch = PingResultBatch(self.socketio, config['PING_EMIT_BATCH_SIZE'])
+        prober = SSHProber(concurrency=config['PROBE_CONCURRENCY'], timeout=config['PROBE_TIMEOUT'])
+        
+        def on_result(result):
+            batch.record(result['node_id'], result['success'], latency_ms=result['latency_ms'])
+        
+        try:
+            prober.probe([(t.id, t.hostname, t.port or 22) for t in targets], on_result=on_result)
+        finally:
+            # Keep and report whatever was collected even if the probe run itself broke
+            batch.flush()
+            batch.save()
+        
+        return [node_id for node_id, row in batch.results.items() if row['status'] == 'reachable']
+    
+    def _run_bulk_ping(self, node_ids, forks):
+        config = self.app.config
+        forks = forks or config['PING_FORKS']
+        
+        nodes = Node.query.filter(Node.id.in_(node_ids)).all()
+        if not nodes:
+            return
+        
+        # Hosts are aliased by node ID so nodes sharing a hostname stay distinct
+        inventory = {
+            'all': {
+                'hosts': {f'node_{node.id}': self._host_vars(node) for node in nodes}
+            }
+        }
+        
+        batch = PingResultBatch(self.socketio, config['PING_EMIT_BATCH_SIZE'])
+        
+        def handle_event(event):
+            host = event.get('event_data', {}).get('host', '')
+            if host.startswith('node_'):
+                if event.get('event') == 'runner_on_ok':
+                    batch.record(int(host[5:]), True)
+                elif event.get('event') in ('runner_on_unreachable', 'runner_on_failed'):
+                    batch.record(int(host[5:]), False)
+            return False
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            inventory_file = os.path.join(temp_dir, 'inventory.yml')
+            with open(inventory_file, 'w') as f:
+                yaml.dump(inventory, f)
+            
+            error = None
+            try:
+                runner_result = run(
+                    private_data_dir=temp_dir,
+                    module='ping',
+                    inventory=inventory_file,
+                    host_pattern='all',
+                    forks=forks,
+                    **self._run_options(),
+                    event_handler=handle_event,
+                    quiet=True
+                )
+                # 'failed' only means some hosts failed; anything else means the run itself broke
+                if runner_result.status not in ('successful', 'failed'):
+                    error = f"ansible-runner finished with status {runner_result.status}"
+            except Exception as e:
+                traceback.print_exc()
+                error = str(e)
+            if error:
+                print(f"Bulk ping of {len(nodes)} node(s) failed: {error}")
+        
+        # Hosts that never reported back are unreachable, or unknown if the run itself failed
+        for node in nodes:
+            if error:
+                batch.record(node.id, False, status='unknown', error=f'Ping failed: {error}')
+            else:
+                batch.record(node.id, False)
+        batch.flush()
+        batch.save()
+    
+    def execute_playbooks(self, execution_id, on_complete=None):
+        """Execute playbooks in background thread, calling on_complete(execution_id) when done"""
         def run_execution():
+            # Claim the row unless it reached a terminal status (e.g. cancelled while queued)
+            now = datetime.utcnow()
+            claimed = db.session.execute(
+                db.update(PlaybookExecution)
+                .where(PlaybookExecution.id == execution_id,
+                       PlaybookExecution.status.in_(('pending', 'running')))
+                .values(status='running', heartbeat_at=now,
+                        started_at=db.func.coalesce(PlaybookExecution.started_at, now))
+            ).rowcount
+            bump('executions')
+            db.session.commit()
             execution = PlaybookExecution.query.get(execution_id)
-            if not execution:
+            if not claimed or not execution:
                 return
             
+            # Emit status update
+            self.socketio.emit('execution_status', {
+                'execution_id': execution_id,
+                'status': 'running',
+                'message': 'Execution started'
+            })
+            
             try:
-                execution.status = 'running'
-                db.session.commit()
-                
-                # Emit status update
-                self.socketio.emit('execution_status', {
-                    'execution_id': execution_id,
-                    'status': 'running',
-                    'message': 'Execution started'
-                })
+                # Compiled inventory, reused while the targeted nodes and groups are unchanged and
+                # leased so the cache does not prune it while the run reads it
+                inventory = self.inventory_cache.lease(execution.target_nodes, execution.target_groups)
+                with ExecutionLease(self.app, execution_id) as lease, inventory as (inventory_file, hosts):
+                    # Create temporary directory for execution
+                    with tempfile.TemporaryDirectory() as temp_dir:
+                        plan = self._shard_plan(execution, hosts)
+                        results = self._run_playbook_graph(execution, temp_dir, inventory_file, plan,
+                                                           cancelled=lease.cancelled)
+                        all_errors = [r['error'] for r in results.values() if r.get('error')]
                 
-                # Build inventory
-                inventory = self._build_inventory(execution.target_nodes, execution.target_groups)
+                # Output has already been persisted by the stream
+                error_output = '\n\n'.join(all_errors) if all_errors else None
+                status = 'failed' if all_errors else 'completed'
                 
-                # Create temporary directory for execution
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    inventory_file = os.path.join(temp_dir, 'inventory.yml')
-                    with open(inventory_file, 'w') as f:
-                        yaml.dump(inventory, f)
-                    
-                    # Execute each playbook
-                    all_output = []
-                    all_errors = []
-                    
-                    for playbook_name in execution.playbooks:
-                        playbook_path = os.path.join('/app/playbooks', playbook_name)
-                        
-                        if not os.path.exists(playbook_path):
-                            error_msg = f"Playbook {playbook_name} not found"
-                            all_errors.append(error_msg)
-                            continue
-                        
-                        # Emit progress update
-                        self.socketio.emit('execution_progress', {
-                            'execution_id': execution_id,
-                            'current_playbook': playbook_name,
-                            'message': f'Executing {playbook_name}'
-                        })
-                        
-                        try:
-                            result = run(
-                                playbook=playbook_path,
-                                inventory=inventory_file,
-                                quiet=False
-                            )
-                            
-                            # Collect output
-                            if result.stdout:
-                                all_output.append(f"=== {playbook_name} ===\n{result.stdout.read()}")
-                            
-                            if result.stderr:
-                                all_errors.append(f"=== {playbook_name} ERRORS ===\n{result.stderr.read()}")
-                                
-                            if result.status != 'successful':
-                                all_errors.append(f"Playbook {playbook_name} failed with status: {result.status}")
-                                
-                        except Exception as e:
-                            error_msg = f"Error executing {playbook_name}: {str(e)}"
-                            all_errors.append(error_msg)
-                    
-                    # Update execution results
-                    execution.output = '\n\n'.join(all_output)
-                    execution.error_output = '\n\n'.join(all_errors) if all_errors else None
-                    execution.status = 'failed' if all_errors else 'completed'
-                    execution.completed_at = datetime.utcnow()
-                    
-                    db.session.commit()
-                    
-                    # Emit completion status
-                    self.socketio.emit('execution_complete', {
-                        'execution_id': execution_id,
-                        'status': execution.status,
-                        'output': execution.output,
-                        'errors': execution.error_output
-                    })
-                    
             except Exception as e:
-                execution.status = 'failed'
-                execution.error_output = str(e)
-                execution.completed_at = datetime.utcnow()
-                db.session.commit()
-                
-                self.socketio.emit('execution_complete', {
-                    'execution_id': execution_id,
-                    'status': 'failed',
-                    'error': str(e)
-                })
+                db.session.rollback()
+                error_output = str(e)
+                status = 'failed'
+            
+            self._finish_execution(execution_id, status, error_output)
+        
+        def run_in_context():
+            with self.app.app_context():
+                try:
+                    run_execution()
+                finally:
+                    if on_complete:
+                        on_complete(execution_id)
         
         # Start execution in background thread
-        thread = threading.Thread(target=run_execution)
+        thread = threading.Thread(target=run_in_context)
         thread.start()
     
-    def _build_inventory(self, target_nodes, target_groups):
-        """Build Ansible inventory from target nodes and groups"""
-        inventory = {'all': {'hosts': {}, 'children': {}}}
-        
-        # Add individual nodes
-        if target_nodes:
-            nodes = Node.query.filter(Node.id.in_(target_nodes)).all()
-            for node in nodes:
-                inventory['all']['hosts'][node.hostname] = {
-                    'ansible_host': node.hostname,
-                    'ansible_user': node.username,
-                    'ansible_port': node.port,
-                    'ansible_ssh_common_args': '-o StrictHostKeyChecking=no'
-                }
+    def _finish_execution(self, execution_id, status, error_output):
+        """Record a run's outcome unless the execution already reached a terminal status elsewhere.
+        
+        A run that exits while its execution is 'cancelling' finishes as
+        'cancelled'; the scheduler slot is only released here.
+        """
+        finished = db.session.execute(
+            db.update(PlaybookExecution)
+            .where(PlaybookExecution.id == execution_id,
+                   PlaybookExecution.status.in_(ExecutionLease.ACTIVE_STATUSES))
+            .values(status=db.case((PlaybookExecution.status == 'cancelling', 'cancelled'), else_=status),
+                    error_output=error_output, completed_at=datetime.utcnow())
+        ).rowcount
+        bump('executions')
+        db.session.commit()
+        if not finished:
+            return
         
-        # Add groups and their nodes
-        if target_groups:
-            groups = NodeGroup.query.filter(NodeGroup.id.in_(target_groups)).all()
-            for group in groups:
-                group_hosts = {}
-                for node in group.nodes:
-                    group_hosts[node.hostname] = {
-                        'ansible_host': node.hostname,
-                        'ansible_user': node.username,
-                        'ansible_port': node.port,
-                        'ansible_ssh_common_args': '-o StrictHostKeyChecking=no'
-                    }
+        status = db.session.query(PlaybookExecution.status).filter_by(id=execution_id).scalar()
+        if status == 'cancelled':
+            self.socketio.emit('execution_cancelled', {'execution_id': execution_id})
+        else:
+            self.socketio.emit('execution_complete', {
+                'execution_id': execution_id,
+                'status': status,
+                'errors': error_output
+            })
+    
+    def _run_playbook_graph(self, execution, temp_dir, inventory_file, plan=None, cancelled=lambda: False):
+        """Run an execution's playbooks, concurrently where the mode and dependencies allow.
+        
+        Sequential executions run every playbook in order, as before. Parallel
+        executions start each playbook once all its dependencies completed and
+        skip it if any of them did not. Concurrent playbooks split the
+        EXECUTION_FORKS budget between them. A shard plan, if given, is applied
+        to every playbook. Once cancelled() is true, running playbooks are
+        stopped and the ones not started yet are skipped.
+        """
+        config = self.app.config
+        playbooks = execution.playbooks
+        sequential = execution.mode != 'parallel'
+        if sequential:
+            dependencies = {pb: [prev] for prev, pb in zip(playbooks, playbooks[1:])}
+        else:
+            dependencies = execution.dependencies or {}
+        
+        parallelism = 1 if sequential else min(config['EXECUTION_MAX_PARALLEL_PLAYBOOKS'], len(playbooks))
+        forks = max(1, config['EXECUTION_FORKS'] // parallelism)
+        interleaved = parallelism > 1 or any(len(batch) > 1 for batch in plan or [])
+        stream = ExecutionEventStream(self.socketio, execution.id, self.app, prefix_output=interleaved,
+                                      cancelled=cancelled)
+        
+        results = {}
+        
+        def record(playbook_name, **result):
+            results[playbook_name] = result
+            execution.playbook_results = dict(results)
+            bump('executions')
+            db.session.commit()
+            self.socketio.emit('execution_progress', {
+                'execution_id': execution.id,
+                'current_playbook': playbook_name,
+                'playbook_status': result['status'],
+                'message': f'Executing {playbook_name}' if result['status'] == 'running'
+                           else f"{playbook_name} {result['status']}"
+            })
+        
+        def run_one(playbook_name):
+            with self.app.app_context():
+                return self._run_playbook(stream, playbook_name, temp_dir, inventory_file, forks,
+                                          plan, execution.max_fail_percentage)
+        
+        waiting = list(playbooks)
+        futures = {}
+        with stream, ThreadPoolExecutor(max_workers=parallelism) as pool:
+            while waiting or futures:
+                progressed = False
+                if cancelled():
+                    for playbook_name in waiting:
+                        record(playbook_name, status='skipped',
+                               error=f"Playbook {playbook_name} skipped: execution cancelled")
+                    waiting = []
+                for playbook_name in list(waiting):
+                    if len(futures) >= parallelism:
+                        break
+                    requires = dependencies.get(playbook_name, [])
+                    failed = [r for r in requires if r in results and results[r]['status'] != 'completed']
+                    if failed and not sequential:
+                        progressed = True
+                        waiting.remove(playbook_name)
+                        record(playbook_name, status='skipped',
+                               error=f"Playbook {playbook_name} skipped: dependency {failed[0]} did not complete")
+                    elif all(r in results and results[r]['status'] != 'running' for r in requires):
+                        progressed = True
+                        waiting.remove(playbook_name)
+                        record(playbook_name, status='running', started_at=datetime.utcnow().isoformat())
+                        futures[pool.submit(run_one, playbook_name)] = playbook_name
                 
-                inventory['all']['children'][group.name] = {
-                    'hosts': group_hosts
-                }
+                if not futures:
+                    if not progressed:
+                        # Unsatisfiable dependencies are rejected at submission, so this is a safeguard
+                        for playbook_name in waiting:
+                            record(playbook_name, status='skipped',
+                                   error=f"Playbook {playbook_name} skipped: dependencies cannot be satisfied")
+                        break
+                    continue  # Skips may have unblocked or skipped more dependents
+                
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    playbook_name = futures.pop(future)
+                    record(playbook_name, **future.result())
+        
+        return results
+    
+    def _run_playbook(self, stream, playbook_name, temp_dir, inventory_file, forks,
+                      plan=None, max_fail_percentage=None):
+        """Run a single playbook and return its result entry"""
+        started_at = datetime.utcnow()
+        result = {'status': 'completed', 'started_at': started_at.isoformat(), 'forks': forks}
+        playbook_path = os.path.join(self.app.config['UPLOAD_FOLDER'], playbook_name)
+        
+        if not os.path.exists(playbook_path):
+            result.update(status='failed', error=f"Playbook {playbook_name} not found")
+        elif plan is not None:
+            stream.start_playbook(playbook_name)
+            result.update(self._run_sharded(stream, playbook_name, playbook_path, temp_dir, inventory_file,
+                                            forks, plan, max_fail_percentage))
+        else:
+            stream.start_playbook(playbook_name)
+            try:
+                runner_result = run(
+                    private_data_dir=temp_dir,
+                    playbook=playbook_path,
+                    inventory=inventory_file,
+                    forks=forks,
+                    **self._run_options(),
+                    event_handler=stream.handler_for(playbook_name),
+                    cancel_callback=stream.cancelled,
+                    quiet=True
+                )
+                
+                if runner_result.status == 'canceled':
+                    result.update(status='cancelled', error=f"Playbook {playbook_name} cancelled")
+                elif runner_result.status != 'successful':
+                    result.update(status='failed',
+                                  error=f"Playbook {playbook_name} failed with status: {runner_result.status}")
+                    
+            except Exception as e:
+                result.update(status='failed', error=f"Error executing {playbook_name}: {str(e)}")
+            finally:
+                stream.flush()
+        
+        completed_at = datetime.utcnow()
+        result['completed_at'] = completed_at.isoformat()
+        result['duration'] = round((completed_at - started_at).total_seconds(), 3)
+        return result
+    
+    def _shard_plan(self, execution, hosts):
+        """Split hosts into rolling batches of parallel shards, or None to run them all in one process"""
+        shard_count = execution.shard_count or 1
+        if shard_count <= 1 and not execution.batch_size:
+            return None
+        
+        batch_size = execution.batch_size or max(len(hosts), 1)
+        plan = []
+        for start in range(0, len(hosts), batch_size):
+            batch = hosts[start:start + batch_size]
+            plan.append([shard for shard in (batch[i::shard_count] for i in range(shard_count)) if shard])
+        return plan
+    
+    def _run_sharded(self, stream, playbook_name, playbook_path, temp_dir, inventory_file,
+                     forks, plan, max_fail_percentage):
+        """Run a playbook batch by batch, each batch's shards in parallel runner processes.
+        
+        Shard stats are merged into one result. If more than max_fail_percentage
+        of a batch's hosts fail, the remaining batches are not started.
+        """
+        totals = {field: 0 for _, field in ExecutionEventStream.RECAP_FIELDS}
+        failed_hosts = set()
+        errors = []
+        shards_run = 0
+        
+        for batch_number, batch in enumerate(plan, 1):
+            shard_forks = max(1, forks // len(batch))
+            
+            def run_shard(args):
+                shard_number, hosts = args
+                with self.app.app_context():
+                    return self._run_shard(stream, playbook_name, f'{playbook_name} {batch_number}.{shard_number}',
+                                           playbook_path, temp_dir, inventory_file, hosts, shard_forks)
+            
+            with ThreadPoolExecutor(max_workers=len(batch)) as pool:
+                outcomes = list(pool.map(run_shard, enumerate(batch, 1)))
+            
+            batch_failed = set()
+            for hosts, (status, stats) in zip(batch, outcomes):
+                shards_run += 1
+                for key, field in ExecutionEventStream.RECAP_FIELDS:
+                    totals[field] += sum((stats.get(key) or {}).values())
+                    if field in ('failed', 'unreachable'):
+                        batch_failed.update(host for host, count in (stats.get(key) or {}).items() if count)
+                if status != 'successful':
+                    errors.append(f"Playbook {playbook_name} batch {batch_number} shard failed with status: {status}")
+                    if not stats:
+                        batch_failed.update(hosts)  # The run died before reporting per-host stats
+            failed_hosts |= batch_failed
+            
+            if stream.cancelled():
+                if batch_number < len(plan):
+                    errors.append(f"Playbook {playbook_name} cancelled after batch {batch_number} of {len(plan)}")
+                break
+            
+            batch_hosts = sum(len(hosts) for hosts in batch)
+            failed_percentage = 100.0 * len(batch_failed) / batch_hosts
+            if max_fail_percentage is not None and failed_percentage > max_fail_percentage \
+                    and batch_number < len(plan):
+                errors.append(f"Playbook {playbook_name} aborted after batch {batch_number} of {len(plan)}: "
+                              f"{failed_percentage:.1f}% of hosts failed (max {max_fail_percentage}%)")
+                break
+        
+        result = {
+            'stats': totals,
+            'hosts_failed': len(failed_hosts),
+            'batches_run': batch_number if plan else 0,
+            'batches_total': len(plan),
+            'shards_run': shards_run,
+            'shard_forks': shard_forks if plan else forks
+        }
+        if errors:
+            result.update(status='failed', error='\n'.join(errors))
+        return result
+    
+    def _run_shard(self, stream, playbook_name, label, playbook_path, temp_dir, inventory_file, hosts, forks):
+        """Run a playbook limited to hosts and return (status, per-host stats)"""
+        # Ansible reads a limit starting with @ from a file, which keeps large host lists off the command line
+        fd, limit_file = tempfile.mkstemp(dir=temp_dir, suffix='.limit')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(hosts) + '\n')
+        
+        # Runner events are not written to the artifacts directory, so result.stats stays empty
+        stats = {}
+        relay = stream.handler_for(playbook_name, label)
+        
+        def handle_event(event):
+            if event.get('event') == 'playbook_on_stats':
+                stats.update(event.get('event_data') or {})
+            return relay(event)
         
-        return inventory
+        try:
+            runner_result = run(
+                private_data_dir=temp_dir,
+                playbook=playbook_path,
+                inventory=inventory_file,
+                limit=f'@{limit_file}',
+                forks=forks,
+                **self._run_options(),
+                event_handler=handle_event,
+                cancel_callback=stream.cancelled,
+                quiet=True
+            )
+            return runner_result.status, stats
+        except Exception as e:
+            stream.write(f"[{label}] Error: {e}\n")
+            return 'error', {}
+        finally:
+            stream.flush()
@@ -1,9 +1,11 @@
 import os
 import yaml
-import json
-import configparser
+import base64
+import uuid
+import zlib
+import redis
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Request, current_app, request, jsonify, send_from_directory, send_file
 from flask_sqlalchemy import SQLAlchemy
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
@@ -12,26 +14,58 @@ from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
 
 from config import config
-from models import db, User, Node, NodeGroup, PlaybookExecution, InventoryImport
-from ansible_runner import AnsibleRunner
+from models import db, User, Node, NodeGroup, PlaybookExecution, ExecutionLogChunk, InventoryImport, node_group_members
+from ansible_runner import AnsibleRunner, ExecutionLease, validate_dependencies
+from scheduler import ExecutionScheduler
+from serializers import serialize_nodes, serialize_groups, serialize_group
+from versioning import ensure_collection_versions, bump, conditional_json
+from cache import response_cache
+from inventory_parser import normalized_inventory
+from inventory_sync import compute_diff, diff_preview, revert_delta, source_import_ids
+from import_jobs import ImportJobs
+from connection_profile import parse_overrides
 from auth import token_required, admin_required
+from migrations import run_migrations
+from playbook_catalog import PlaybookCatalog, write_lock, atomic_write
+from playbook_validation import SyntaxChecker, load_yaml, content_hash
+
+IMPORT_MODES = ('import', 'sync')
+
+
+class InventoryUploadRequest(Request):
+    """Keeps MAX_CONTENT_LENGTH for every route except inventory uploads, which may be large exports"""
+    LARGE_BODY_ENDPOINTS = ('upload_inventory', 'paste_inventory')
+
+    @property
+    def max_content_length(self):
+        if self.endpoint in self.LARGE_BODY_ENDPOINTS:
+            return current_app.config['INVENTORY_MAX_CONTENT_LENGTH']
+        return super().max_content_length
+
 
 def create_app(config_name='default'):
     app = Flask(__name__)
+    app.request_class = InventoryUploadRequest
     app.config.from_object(config[config_name])
     
     # Initialize extensions
     db.init_app(app)
-    CORS(app, origins="*")
+    response_cache.init_app(app)
+    CORS(app, origins="*", expose_headers=["ETag"])
     jwt = JWTManager(app)
-    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='eventlet')
+    # Threading mode: ansible-runner (pexpect) and the SSH prober need the real select and socket
+    # modules, which eventlet's monkey patching would replace
+    socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading',
+                        message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
     
     # Initialize Ansible runner
-    ansible_runner = AnsibleRunner(socketio)
+    ansible_runner = AnsibleRunner(socketio, app)
     
-    # Create tables and default admin user
+    # Bring the schema up to date and create the default admin user
     with app.app_context():
-        db.create_all()
+        for name in run_migrations(db.engine):
+            print(f"Applied migration {name}")
+        ensure_collection_versions()
         
         # Create default admin user if no users exist
         if User.query.count() == 0:
@@ -45,11 +79,65 @@ def create_app(config_name='default'):
             db.session.commit()
             print("Default admin user created: admin/admin123")
     
+    # Index the playbooks folder, keep the index current and syntax-check new content
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    syntax_checker = SyntaxChecker(app, app.config['UPLOAD_FOLDER'],
+                                   app.config['PLAYBOOK_SYNTAX_CHECK_WORKERS'],
+                                   app.config['PLAYBOOK_SYNTAX_CHECK_TIMEOUT'],
+                                   app.config['PLAYBOOK_SYNTAX_CHECK_INVALID_TTL'])
+    playbook_catalog = PlaybookCatalog(app.config['UPLOAD_FOLDER'], app.config['PLAYBOOK_CATALOG_SCAN_INTERVAL'],
+                                       on_change=syntax_checker.submit)
+    playbook_catalog.start()
+    
+    # Start dispatching queued executions and resuming interrupted imports, unless a separate worker does it
+    scheduler = ExecutionScheduler(app, ansible_runner)
+    import_jobs = ImportJobs(app, socketio)
+    if app.config['SCHEDULER_ENABLED']:
+        scheduler.start()
+        import_jobs.watch()
+    
     # Helper functions
+    def playbook_syntax(entry):
+        """Cached syntax-check result for a catalog entry; YAML errors count as invalid.
+        
+        An 'invalid' result past PLAYBOOK_SYNTAX_CHECK_INVALID_TTL is queued
+        for a new check and reported as pending until it finishes.
+        """
+        if entry['error']:
+            return {'status': 'invalid', 'error': entry['error'], 'checked_at': None}
+        return syntax_checker.status(entry['hash'], entry['name'])
+    
     def allowed_file(filename):
         return '.' in filename and \
                filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
     
+    def resolve_target_node_ids(data):
+        """Resolve node_ids, group_ids or all from a request body to node IDs"""
+        if data.get('all'):
+            return [row.id for row in db.session.query(Node.id)]
+        
+        node_ids = set(data.get('node_ids', []))
+        group_ids = data.get('group_ids', [])
+        if group_ids:
+            members = db.session.query(node_group_members.c.node_id).filter(
+                node_group_members.c.group_id.in_(group_ids))
+            node_ids.update(row.node_id for row in members)
+        return list(node_ids)
+    
+    def execution_to_dict(execution, positions, summary=False):
+        data = execution.to_summary_dict() if summary else execution.to_dict()
+        data['queue_position'] = positions.get(execution.id)
+        return data
+    
+    def encode_execution_cursor(execution):
+        raw = f"{execution.queued_at.isoformat()}|{execution.id}"
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+    
+    def decode_execution_cursor(cursor):
+        """Return (queued_at, id) from a cursor; raises ValueError if malformed"""
+        queued_at, execution_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(queued_at), int(execution_id)
+    
     # Authentication routes
     @app.route('/api/auth/login', methods=['POST'])
     def login():
@@ -110,26 +198,58 @@ def create_app(config_name='default'):
     def get_current_user(current_user):
         return jsonify(current_user.to_dict())
     
+    # Cache administration
+    @app.route('/api/cache/stats')
+    @admin_required
+    def cache_stats(current_user):
+        return jsonify(response_cache.stats())
+    
+    @app.route('/api/cache/clear', methods=['POST'])
+    @admin_required
+    def clear_cache(current_user):
+        response_cache.clear()
+        return jsonify({'message': 'Cache cleared'})
+    
     # Playbook routes
     @app.route('/api/playbooks', methods=['GET'])
     @token_required
     def list_playbooks(current_user):
-        playbooks_dir = app.config['UPLOAD_FOLDER']
-        if not os.path.exists(playbooks_dir):
-            os.makedirs(playbooks_dir)
-        
-        playbooks = []
-        for filename in os.listdir(playbooks_dir):
-            if filename.endswith(('.yml', '.yaml')):
-                file_path = os.path.join(playbooks_dir, filename)
-                stat = os.stat(file_path)
-                playbooks.append({
-                    'name': filename,
-                    'size': stat.st_size,
-                    'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
-                })
+        def build():
+            entries = playbook_catalog.list(
+                query=request.args.get('q'),
+                host=request.args.get('host'),
+                role=request.args.get('role')
+            )
+            results = syntax_checker.results(entry['hash'] for entry in entries)
+            unchecked = {'status': 'unchecked', 'error': None, 'checked_at': None}
+            return [dict(PlaybookCatalog.summary(entry), syntax=results.get(entry['hash'], unchecked))
+                    for entry in entries]
         
-        return jsonify(playbooks)
+        # The catalog fingerprint also catches files changed outside the API
+        return conditional_json('playbooks', build, extra=playbook_catalog.fingerprint)
+    
+    @app.route('/api/playbooks/facets', methods=['GET'])
+    @token_required
+    def playbook_facets(current_user):
+        """Host patterns and roles in use, with how many playbooks reference each"""
+        def build():
+            hosts, roles = {}, {}
+            for entry in playbook_catalog.list():
+                for pattern in entry['hosts']:
+                    hosts[pattern] = hosts.get(pattern, 0) + 1
+                for role in entry['roles']:
+                    roles[role] = roles.get(role, 0) + 1
+            return {'hosts': hosts, 'roles': roles}
+        
+        return conditional_json('playbooks', build, extra=playbook_catalog.fingerprint)
+    
+    @app.route('/api/playbooks/<filename>/info', methods=['GET'])
+    @token_required
+    def playbook_info(current_user, filename):
+        entry = playbook_catalog.current(secure_filename(filename))
+        if entry is None:
+            return jsonify({'message': 'Playbook not found'}), 404
+        return jsonify(dict(PlaybookCatalog.summary(entry), syntax=playbook_syntax(entry)))
     
     @app.route('/api/playbooks', methods=['POST'])
     @token_required
@@ -149,20 +269,25 @@ def create_app(config_name='default'):
             os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
             
             try:
-                file.save(file_path)
+                # Validate YAML before writing; the syntax check then runs in the background
+                content = file.read()
+                load_yaml(content)
                 
-                # Validate YAML
-                with open(file_path, 'r') as f:
-                    yaml.safe_load(f)
+                with write_lock(app.config['UPLOAD_FOLDER']):
+                    atomic_write(file_path, content)
+                playbook_catalog.refresh(filename)
+                bump('playbooks')
+                db.session.commit()
                 
-                return jsonify({'message': 'Playbook uploaded successfully', 'filename': filename})
+                return jsonify({
+                    'message': 'Playbook uploaded successfully',
+                    'filename': filename,
+                    'syntax': playbook_syntax(playbook_catalog.get(filename))
+                })
             
             except yaml.YAMLError as e:
-                os.remove(file_path)
                 return jsonify({'message': f'Invalid YAML: {str(e)}'}), 400
             except Exception as e:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
                 return jsonify({'message': f'Upload failed: {str(e)}'}), 500
         
         return jsonify({'message': 'Invalid file type'}), 400
@@ -172,14 +297,46 @@ def create_app(config_name='default'):
     def get_playbook(current_user, filename):
         try:
             file_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
-            with open(file_path, 'r') as f:
+            with open(file_path, 'rb') as f:
                 content = f.read()
-            return jsonify({'content': content})
+            response = jsonify({'content': content.decode(), 'etag': content_hash(content)})
+            response.set_etag(content_hash(content))
+            return response
         except FileNotFoundError:
             return jsonify({'message': 'Playbook not found'}), 404
         except Exception as e:
             return jsonify({'message': str(e)}), 500
     
+    @app.route('/api/playbooks/<filename>/raw')
+    @token_required
+    def get_playbook_raw(current_user, filename):
+        """Stream the file itself with ETag, Last-Modified, Range and gzip support"""
+        filename = secure_filename(filename)
+        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        entry = playbook_catalog.current(filename)
+        if entry is None:
+            return jsonify({'message': 'Playbook not found'}), 404
+        
+        if request.range is None and request.accept_encodings['gzip']:
+            def compressed():
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip container
+                with open(file_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(64 * 1024), b''):
+                        yield compressor.compress(chunk)
+                yield compressor.flush()
+            
+            response = app.response_class(compressed(), mimetype='text/yaml')
+            response.headers['Content-Encoding'] = 'gzip'
+            # Each encoding is its own representation, so it gets its own ETag
+            response.set_etag(entry['hash'] + '-gzip')
+            response.last_modified = entry['mtime_ns'] / 1e9
+        else:
+            response = send_file(file_path, mimetype='text/yaml', etag=entry['hash'], conditional=True, max_age=0)
+        
+        response.vary.add('Accept-Encoding')
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    
     @app.route('/api/playbooks/<filename>', methods=['PUT'])
     @token_required
     def update_playbook(current_user, filename):
@@ -190,14 +347,39 @@ def create_app(config_name='default'):
             return jsonify({'message': 'Content is required'}), 400
         
         try:
-            # Validate YAML
-            yaml.safe_load(content)
+            # Validate YAML; the syntax check then runs in the background
+            load_yaml(content)
             
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
-            with open(file_path, 'w') as f:
-                f.write(content)
+            filename = secure_filename(filename)
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            with write_lock(app.config['UPLOAD_FOLDER']):
+                # If-Match carries the ETag the editor loaded; a mismatch means someone else saved first
+                if request.if_match:
+                    try:
+                        with open(file_path, 'rb') as f:
+                            current = content_hash(f.read())
+                    except FileNotFoundError:
+                        current = None
+                    # The editor loads through /raw, which tags the gzip representation "<hash>-gzip"
+                    matches = current is not None and any(
+                        request.if_match.contains(tag) for tag in (current, current + '-gzip'))
+                    if not matches:
+                        return jsonify({'message': 'Playbook was changed by someone else; reload it before saving'}), 412
+                
+                encoded = content.encode()
+                atomic_write(file_path, encoded)
             
-            return jsonify({'message': 'Playbook updated successfully'})
+            playbook_catalog.refresh(filename)
+            bump('playbooks')
+            db.session.commit()
+            
+            response = jsonify({
+                'message': 'Playbook updated successfully',
+                'etag': content_hash(encoded),
+                'syntax': playbook_syntax(playbook_catalog.get(filename))
+            })
+            response.set_etag(content_hash(encoded))
+            return response
         
         except yaml.YAMLError as e:
             return jsonify({'message': f'Invalid YAML: {str(e)}'}), 400
@@ -208,8 +390,14 @@ def create_app(config_name='default'):
     @token_required
     def delete_playbook(current_user, filename):
         try:
-            file_path = os.path.join(app.config['UPLOAD_FOLDER'], secure_filename(filename))
-            os.remove(file_path)
+            filename = secure_filename(filename)
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            # Under the same lock as updates, so a save that passed its If-Match check cannot recreate the file
+            with write_lock(app.config['UPLOAD_FOLDER']):
+                os.remove(file_path)
+                playbook_catalog.refresh(filename)
+            bump('playbooks')
+            db.session.commit()
             return jsonify({'message': 'Playbook deleted successfully'})
         except FileNotFoundError:
             return jsonify({'message': 'Playbook not found'}), 404
@@ -231,8 +419,6 @@ def create_app(config_name='default'):
         filename = secure_filename(filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
         
-        if os.path.exists(file_path):
-            return jsonify({'message': 'File already exists'}), 400
         
         # Default playbook template
         template = '''---
@@ -254,8 +440,14 @@ def create_app(config_name='default'):
         
         try:
             os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-            with open(file_path, 'w') as f:
-                f.write(template)
+            with write_lock(app.config['UPLOAD_FOLDER']):
+                if os.path.exists(file_path):
+                    return jsonify({'message': 'File already exists'}), 400
+                atomic_write(file_path, template.encode())
+            
+            playbook_catalog.refresh(filename)
+            bump('playbooks')
+            db.session.commit()
             
             return jsonify({'message': 'Playbook created successfully', 'filename': filename})
         except Exception as e:
@@ -265,8 +457,7 @@ def create_app(config_name='default'):
     @app.route('/api/nodes', methods=['GET'])
     @token_required
     def list_nodes(current_user):
-        nodes = Node.query.all()
-        return jsonify([node.to_dict() for node in nodes])
+        return conditional_json('nodes', lambda: serialize_nodes(Node.query.all(), all_nodes=True))
     
     @app.route('/api/nodes', methods=['POST'])
     @token_required
@@ -277,15 +468,22 @@ def create_app(config_name='default'):
         if not all(field in data for field in required_fields):
             return jsonify({'message': 'Name, hostname, and username are required'}), 400
         
+        try:
+            overrides = parse_overrides(data)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
         node = Node(
             name=data['name'],
             hostname=data['hostname'],
             username=data['username'],
             port=data.get('port', 22),
-            description=data.get('description', '')
+            description=data.get('description', ''),
+            **overrides
         )
         
         db.session.add(node)
+        bump('nodes', 'groups')
         db.session.commit()
         
         return jsonify(node.to_dict()), 201
@@ -302,13 +500,21 @@ def create_app(config_name='default'):
         node = Node.query.get_or_404(node_id)
         data = request.get_json()
         
+        try:
+            overrides = parse_overrides(data)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
         node.name = data.get('name', node.name)
         node.hostname = data.get('hostname', node.hostname)
         node.username = data.get('username', node.username)
         node.port = data.get('port', node.port)
         node.description = data.get('description', node.description)
+        for field, value in overrides.items():
+            setattr(node, field, value)
         node.updated_at = datetime.utcnow()
         
+        bump('nodes', 'groups')
         db.session.commit()
         return jsonify(node.to_dict())
     
@@ -317,6 +523,7 @@ def create_app(config_name='default'):
     def delete_node(current_user, node_id):
         node = Node.query.get_or_404(node_id)
         db.session.delete(node)
+        bump('nodes', 'groups')
         db.session.commit()
         return jsonify({'message': 'Node deleted successfully'})
     
@@ -339,12 +546,69 @@ def create_app(config_name='default'):
         
         return jsonify({'message': 'Ping started', 'node_id': node_id})
     
+    @app.route('/api/nodes/ping', methods=['POST'])
+    @token_required
+    def ping_nodes(current_user):
+        data = request.get_json() or {}
+        node_ids = resolve_target_node_ids(data)
+        
+        if not node_ids:
+            return jsonify({'message': 'No nodes selected'}), 400
+        
+        ansible_runner.ping_nodes(node_ids, forks=data.get('forks'))
+        
+        return jsonify({'message': 'Ping started', 'node_count': len(node_ids)})
+    
+    @app.route('/api/nodes/probe', methods=['POST'])
+    @token_required
+    def probe_nodes(current_user):
+        data = request.get_json() or {}
+        node_ids = resolve_target_node_ids(data)
+        
+        if not node_ids:
+            return jsonify({'message': 'No nodes selected'}), 400
+        
+        ansible_runner.probe_nodes(node_ids, escalate=bool(data.get('escalate')), forks=data.get('forks'))
+        
+        return jsonify({'message': 'Probe started', 'node_count': len(node_ids)})
+    
+    @app.route('/api/nodes/<int:node_id>/facts', methods=['GET'])
+    @token_required
+    def get_node_facts(current_user, node_id):
+        node = Node.query.get_or_404(node_id)
+        try:
+            cached = ansible_runner.fact_cache.get(node.hostname)
+        except (redis.RedisError, ValueError) as e:
+            return jsonify({'message': f'Fact cache unavailable: {str(e)}'}), 503
+        
+        if cached is None:
+            return jsonify({'message': 'No cached facts for this node'}), 404
+        
+        # ?keys=ansible_distribution,ansible_memtotal_mb narrows the response
+        keys = [key for key in request.args.get('keys', '').split(',') if key]
+        if keys:
+            cached['facts'] = {key: cached['facts'][key] for key in keys if key in cached['facts']}
+        
+        return jsonify(dict(cached, node_id=node.id, hostname=node.hostname))
+    
+    @app.route('/api/nodes/facts/refresh', methods=['POST'])
+    @token_required
+    def refresh_node_facts(current_user):
+        data = request.get_json() or {}
+        node_ids = resolve_target_node_ids(data)
+        
+        if not node_ids:
+            return jsonify({'message': 'No nodes selected'}), 400
+        
+        ansible_runner.refresh_facts(node_ids, forks=data.get('forks'))
+        
+        return jsonify({'message': 'Fact refresh started', 'node_count': len(node_ids)})
+    
     # Group routes
     @app.route('/api/groups', methods=['GET'])
     @token_required
     def list_groups(current_user):
-        groups = NodeGroup.query.all()
-        return jsonify([group.to_dict() for group in groups])
+        return conditional_json('groups', lambda: serialize_groups(NodeGroup.query.all()))
     
     @app.route('/api/groups', methods=['POST'])
     @token_required
@@ -363,6 +627,7 @@ def create_app(config_name='default'):
         )
         
         db.session.add(group)
+        bump('groups')
         db.session.commit()
         
         return jsonify(group.to_dict()), 201
@@ -371,7 +636,7 @@ def create_app(config_name='default'):
     @token_required
     def get_group(current_user, group_id):
         group = NodeGroup.query.get_or_404(group_id)
-        return jsonify(group.to_dict())
+        return jsonify(serialize_group(group))
     
     @app.route('/api/groups/<int:group_id>', methods=['PUT'])
     @token_required
@@ -388,14 +653,16 @@ def create_app(config_name='default'):
         group.description = data.get('description', group.description)
         group.updated_at = datetime.utcnow()
         
+        bump('groups', 'nodes')
         db.session.commit()
-        return jsonify(group.to_dict())
+        return jsonify(serialize_group(group))
     
     @app.route('/api/groups/<int:group_id>', methods=['DELETE'])
     @token_required
     def delete_group(current_user, group_id):
         group = NodeGroup.query.get_or_404(group_id)
         db.session.delete(group)
+        bump('groups', 'nodes')
         db.session.commit()
         return jsonify({'message': 'Group deleted successfully'})
     
@@ -404,15 +671,23 @@ def create_app(config_name='default'):
     def add_nodes_to_group(current_user, group_id):
         group = NodeGroup.query.get_or_404(group_id)
         data = request.get_json()
-        node_ids = data.get('node_ids', [])
+        node_ids = set(data.get('node_ids', []))
         
-        for node_id in node_ids:
-            node = Node.query.get(node_id)
-            if node and node not in group.nodes:
-                group.nodes.append(node)
+        # Insert only memberships for existing nodes that are not already in the group
+        existing = {row.id for row in db.session.query(Node.id).filter(Node.id.in_(node_ids))}
+        members = {row.node_id for row in db.session.query(node_group_members.c.node_id).filter(
+            node_group_members.c.group_id == group_id,
+            node_group_members.c.node_id.in_(existing))}
+        new_members = existing - members
+        
+        if new_members:
+            db.session.execute(node_group_members.insert(), [
+                {'node_id': node_id, 'group_id': group_id} for node_id in new_members
+            ])
+            bump('groups', 'nodes')
         
         db.session.commit()
-        return jsonify(group.to_dict())
+        return jsonify(serialize_group(group))
     
     @app.route('/api/groups/<int:group_id>/nodes/<int:node_id>', methods=['DELETE'])
     @token_required
@@ -422,16 +697,64 @@ def create_app(config_name='default'):
         
         if node in group.nodes:
             group.nodes.remove(node)
+            bump('groups', 'nodes')
             db.session.commit()
         
-        return jsonify(group.to_dict())
+        return jsonify(serialize_group(group))
     
     # Execution routes
     @app.route('/api/executions', methods=['GET'])
     @token_required
     def list_executions(current_user):
-        executions = PlaybookExecution.query.order_by(PlaybookExecution.started_at.desc()).all()
-        return jsonify([execution.to_dict() for execution in executions])
+        args = request.args
+        try:
+            limit = min(max(int(args.get('limit', 50)), 1), app.config['EXECUTION_PAGE_MAX_LIMIT'])
+            cursor = decode_execution_cursor(args['cursor']) if args.get('cursor') else None
+            user_id = int(args['user_id']) if args.get('user_id') else None
+            since = datetime.fromisoformat(args['since']) if args.get('since') else None
+            until = datetime.fromisoformat(args['until']) if args.get('until') else None
+        except ValueError:
+            return jsonify({'message': 'Invalid pagination or filter parameters'}), 400
+        
+        def build():
+            # Summaries never need the output blobs
+            query = PlaybookExecution.query.options(
+                db.defer(PlaybookExecution.output),
+                db.defer(PlaybookExecution.error_output)
+            )
+        
+            if args.get('status'):
+                query = query.filter(PlaybookExecution.status.in_(args['status'].split(',')))
+            if user_id:
+                query = query.filter(PlaybookExecution.user_id == user_id)
+            if since:
+                query = query.filter(PlaybookExecution.queued_at >= since)
+            if until:
+                query = query.filter(PlaybookExecution.queued_at < until)
+        
+            # Keyset pagination on (queued_at, id), newest first
+            if cursor:
+                queued_at, execution_id = cursor
+                query = query.filter(db.or_(
+                    PlaybookExecution.queued_at < queued_at,
+                    db.and_(PlaybookExecution.queued_at == queued_at, PlaybookExecution.id < execution_id)
+                ))
+        
+            executions = query.order_by(PlaybookExecution.queued_at.desc(), PlaybookExecution.id.desc()) \
+                .limit(limit + 1).all()
+        
+            next_cursor = None
+            if len(executions) > limit:
+                executions = executions[:limit]
+                next_cursor = encode_execution_cursor(executions[-1])
+        
+            positions = scheduler.queue_positions()
+            return {
+                'executions': [execution_to_dict(execution, positions, summary=True) for execution in executions],
+                'next_cursor': next_cursor
+            }
+        
+        return conditional_json('executions', build)
     
     @app.route('/api/executions', methods=['POST'])
     @token_required
@@ -448,42 +771,147 @@ def create_app(config_name='default'):
         if not target_nodes and not target_groups:
             return jsonify({'message': 'At least one target node or group is required'}), 400
         
+        if len(set(playbooks)) != len(playbooks):
+            return jsonify({'message': 'Each playbook can only be listed once'}), 400
+        
+        # Reject playbooks already known to be broken instead of paying for a doomed run
+        for name in playbooks:
+            # current() stats the file, so an edit since the last scan is checked, not a stale parse
+            entry = playbook_catalog.current(name) if name == secure_filename(name) else None
+            if entry is None:
+                return jsonify({'message': f'Playbook not found: {name}'}), 400
+            if entry['error']:
+                return jsonify({'message': f'Playbook {name} is invalid: {entry["error"]}'}), 400
+            syntax = playbook_syntax(entry)
+            if syntax['status'] == 'invalid':
+                return jsonify({'message': f'Playbook {name} failed syntax check: {syntax["error"]}'}), 400
+        
+        try:
+            priority = int(data.get('priority', 0))
+        except (TypeError, ValueError):
+            return jsonify({'message': 'Priority must be an integer'}), 400
+        
+        mode = data.get('mode', 'sequential')
+        if mode not in ('sequential', 'parallel'):
+            return jsonify({'message': 'Mode must be sequential or parallel'}), 400
+        
+        dependencies = data.get('dependencies') or None
+        if dependencies:
+            if mode != 'parallel':
+                return jsonify({'message': 'Dependencies require parallel mode'}), 400
+            error = validate_dependencies(playbooks, dependencies)
+            if error:
+                return jsonify({'message': error}), 400
+        
+        try:
+            shard_count = int(data.get('shard_count') or 1)
+            batch_size = int(data['batch_size']) if data.get('batch_size') else None
+            max_fail_percentage = float(data['max_fail_percentage']) \
+                if data.get('max_fail_percentage') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({'message': 'Shard count, batch size and max fail percentage must be numbers'}), 400
+        
+        if not 1 <= shard_count <= app.config['EXECUTION_MAX_SHARDS']:
+            return jsonify({'message': f"Shard count must be between 1 and {app.config['EXECUTION_MAX_SHARDS']}"}), 400
+        if batch_size is not None and batch_size < 1:
+            return jsonify({'message': 'Batch size must be at least 1'}), 400
+        if max_fail_percentage is not None and not 0 <= max_fail_percentage <= 100:
+            return jsonify({'message': 'Max fail percentage must be between 0 and 100'}), 400
+        
         execution = PlaybookExecution(
             playbooks=playbooks,
             target_nodes=target_nodes if target_nodes else None,
             target_groups=target_groups if target_groups else None,
+            mode=mode,
+            dependencies=dependencies,
+            shard_count=shard_count,
+            batch_size=batch_size,
+            max_fail_percentage=max_fail_percentage,
+            priority=priority,
             user_id=current_user.id
         )
         
         db.session.add(execution)
+        bump('executions')
         db.session.commit()
         
-        # Start execution in background
-        ansible_runner.execute_playbooks(execution.id)
+        # Queue for the scheduler, which starts it once a slot is free
+        scheduler.notify()
         
-        return jsonify(execution.to_dict()), 201
+        return jsonify(execution_to_dict(execution, scheduler.queue_positions())), 201
     
     @app.route('/api/executions/<int:execution_id>')
     @token_required
     def get_execution(current_user, execution_id):
         execution = PlaybookExecution.query.get_or_404(execution_id)
-        return jsonify(execution.to_dict())
+        return jsonify(execution_to_dict(execution, scheduler.queue_positions()))
+    
+    @app.route('/api/executions/<int:execution_id>/log')
+    @token_required
+    def get_execution_log(current_user, execution_id):
+        execution = PlaybookExecution.query.get_or_404(execution_id)
+        
+        try:
+            offset = max(int(request.args.get('offset', 0)), 0)
+            limit = int(request.args.get('limit', app.config['EXECUTION_LOG_DEFAULT_LIMIT']))
+        except ValueError:
+            return jsonify({'message': 'Offset and limit must be integers'}), 400
+        limit = min(max(limit, 1), app.config['EXECUTION_LOG_MAX_LIMIT'])
+        
+        if execution.log_size or not execution.output:
+            content = ExecutionLogChunk.read(execution_id, offset, limit)
+            size = execution.log_size
+        else:
+            # Executions recorded before chunked storage keep a single output blob
+            content = execution.output[offset:offset + limit]
+            size = len(execution.output)
+        
+        return jsonify({
+            'execution_id': execution_id,
+            'offset': offset,
+            'next_offset': offset + len(content),
+            'size': size,
+            'content': content,
+            # A cancelling run is still writing output until ansible-runner stops
+            'complete': (execution.status not in ('pending',) + ExecutionLease.ACTIVE_STATUSES
+                         and offset + len(content) >= size)
+        })
     
     @app.route('/api/executions/<int:execution_id>/cancel', methods=['POST'])
     @token_required
     def cancel_execution(current_user, execution_id):
-        execution = PlaybookExecution.query.get_or_404(execution_id)
+        PlaybookExecution.query.get_or_404(execution_id)
+        executions = PlaybookExecution.query.filter_by(id=execution_id)
         
-        if execution.status in ['pending', 'running']:
-            execution.status = 'cancelled'
-            execution.completed_at = datetime.utcnow()
+        # Conditional updates, so a run finishing at the same moment keeps its terminal status
+        if executions.filter_by(status='pending').update(
+                {'status': 'cancelled', 'completed_at': datetime.utcnow()}, synchronize_session=False):
+            bump('executions')
             db.session.commit()
-            
             socketio.emit('execution_cancelled', {'execution_id': execution_id})
+            scheduler.notify()
+        elif executions.filter_by(status='running').update({'status': 'cancelling'}, synchronize_session=False):
+            # The run stops ansible at its next heartbeat and then releases its slot as 'cancelled'
+            bump('executions')
+            db.session.commit()
+            socketio.emit('execution_status', {
+                'execution_id': execution_id,
+                'status': 'cancelling',
+                'message': 'Cancelling execution'
+            })
         
-        return jsonify(execution.to_dict())
+        db.session.expire_all()
+        return jsonify(PlaybookExecution.query.get(execution_id).to_dict())
     
     # Inventory import routes
+    def build_preview(inventory_import, offset, limit):
+        """A page of parsed hosts, or for a sync the diff against the current nodes and groups"""
+        inventory = normalized_inventory(inventory_import.file_path, inventory_import.format)
+        if inventory_import.mode == 'sync':
+            diff = compute_diff(inventory.nodes(), inventory.groups_data(), source_import_ids(inventory_import.filename))
+            return diff_preview(diff, offset, limit)
+        return inventory.preview(offset, limit)
+    
     @app.route('/api/inventory/imports', methods=['GET'])
     @token_required
     def list_imports(current_user):
@@ -506,11 +934,17 @@ def create_app(config_name='default'):
         if file_extension not in ['yml', 'yaml', 'ini', 'json']:
             return jsonify({'message': 'Unsupported file format'}), 400
         
+        mode = request.form.get('mode', 'import')
+        if mode not in IMPORT_MODES:
+            return jsonify({'message': 'Mode must be import or sync'}), 400
+        
         # Save file
         inventory_dir = app.config['INVENTORY_FOLDER']
         os.makedirs(inventory_dir, exist_ok=True)
         
-        file_path = os.path.join(inventory_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}")
+        # The random part keeps uploads of the same name within one second from sharing a path
+        file_path = os.path.join(inventory_dir,
+                                 f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}_{filename}")
         file.save(file_path)
         
         # Create import record
@@ -518,6 +952,7 @@ def create_app(config_name='default'):
             filename=filename,
             file_path=file_path,
             format=file_extension,
+            mode=mode,
             user_id=current_user.id
         )
         
@@ -526,7 +961,7 @@ def create_app(config_name='default'):
         
         # Parse and preview
         try:
-            preview = parse_inventory_file(file_path, file_extension)
+            preview = build_preview(inventory_import, 0, app.config['INVENTORY_PREVIEW_LIMIT'])
             return jsonify({
                 'import_id': inventory_import.id,
                 'preview': preview
@@ -547,12 +982,16 @@ def create_app(config_name='default'):
         if not content.strip():
             return jsonify({'message': 'Content is required'}), 400
         
+        mode = data.get('mode', 'import')
+        if mode not in IMPORT_MODES:
+            return jsonify({'message': 'Mode must be import or sync'}), 400
+        
         # Save content to file
         inventory_dir = app.config['INVENTORY_FOLDER']
         os.makedirs(inventory_dir, exist_ok=True)
         
         filename = f"pasted_inventory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format_type}"
-        file_path = os.path.join(inventory_dir, filename)
+        file_path = os.path.join(inventory_dir, f"{uuid.uuid4().hex[:8]}_{filename}")
         
         with open(file_path, 'w') as f:
             f.write(content)
@@ -562,6 +1001,7 @@ def create_app(config_name='default'):
             filename=filename,
             file_path=file_path,
             format=format_type,
+            mode=mode,
             user_id=current_user.id
         )
         
@@ -570,7 +1010,7 @@ def create_app(config_name='default'):
         
         # Parse and preview
         try:
-            preview = parse_inventory_file(file_path, format_type)
+            preview = build_preview(inventory_import, 0, app.config['INVENTORY_PREVIEW_LIMIT'])
             return jsonify({
                 'import_id': inventory_import.id,
                 'preview': preview
@@ -581,96 +1021,85 @@ def create_app(config_name='default'):
             db.session.commit()
             return jsonify({'message': f'Failed to parse inventory: {str(e)}'}), 400
     
+    @app.route('/api/inventory/imports/<int:import_id>/preview')
+    @token_required
+    def preview_import(current_user, import_id):
+        inventory_import = InventoryImport.query.get_or_404(import_id)
+        
+        try:
+            offset = max(int(request.args.get('offset', 0)), 0)
+            limit = int(request.args.get('limit', app.config['INVENTORY_PREVIEW_LIMIT']))
+        except ValueError:
+            return jsonify({'message': 'Offset and limit must be integers'}), 400
+        limit = min(max(limit, 1), app.config['INVENTORY_PREVIEW_MAX_LIMIT'])
+        
+        try:
+            preview = build_preview(inventory_import, offset, limit)
+        except (OSError, ValueError) as e:
+            return jsonify({'message': f'Failed to parse inventory: {str(e)}'}), 400
+        
+        return jsonify({'import_id': import_id, 'preview': preview})
+    
     @app.route('/api/inventory/imports/<int:import_id>/execute', methods=['POST'])
     @token_required
     def execute_import(current_user, import_id):
         inventory_import = InventoryImport.query.get_or_404(import_id)
         
-        if inventory_import.status != 'pending':
+        if inventory_import.status not in ('pending', 'failed'):
             return jsonify({'message': 'Import already processed'}), 400
         
-        try:
-            # Parse inventory file
-            nodes_data, groups_data = parse_inventory_for_import(inventory_import.file_path, inventory_import.format)
-            
-            created_nodes = []
-            created_groups = []
-            
-            # Create groups first
-            for group_name, group_info in groups_data.items():
-                existing_group = NodeGroup.query.filter_by(name=group_name).first()
-                if not existing_group:
-                    group = NodeGroup(
-                        name=group_name,
-                        description=f'Imported from {inventory_import.filename}'
-                    )
-                    db.session.add(group)
-                    db.session.flush()  # Get the ID
-                    created_groups.append(group.id)
-            
-            # Create nodes
-            for node_info in nodes_data:
-                existing_node = Node.query.filter_by(hostname=node_info['hostname']).first()
-                if not existing_node:
-                    node = Node(
-                        name=node_info['name'],
-                        hostname=node_info['hostname'],
-                        username=node_info.get('username', 'root'),
-                        port=node_info.get('port', 22),
-                        description=f'Imported from {inventory_import.filename}'
-                    )
-                    db.session.add(node)
-                    db.session.flush()  # Get the ID
-                    created_nodes.append(node.id)
-                    
-                    # Add to groups
-                    for group_name in node_info.get('groups', []):
-                        group = NodeGroup.query.filter_by(name=group_name).first()
-                        if group:
-                            group.nodes.append(node)
-            
-            # Update import record
-            inventory_import.status = 'completed'
-            inventory_import.imported_at = datetime.utcnow()
-            inventory_import.total_nodes = len(created_nodes)
-            inventory_import.total_groups = len(created_groups)
-            inventory_import.created_nodes = created_nodes
-            inventory_import.created_groups = created_groups
-            
-            db.session.commit()
-            
-            return jsonify({
-                'message': 'Import completed successfully',
-                'created_nodes': len(created_nodes),
-                'created_groups': len(created_groups)
-            })
+        # Runs in the background; failed imports resume from their last checkpoint
+        if not import_jobs.start(import_id):
+            return jsonify({'message': 'Import is already running'}), 409
         
-        except Exception as e:
-            inventory_import.status = 'failed'
-            inventory_import.error_message = str(e)
-            db.session.commit()
-            return jsonify({'message': f'Import failed: {str(e)}'}), 500
+        return jsonify({
+            'message': 'Import started',
+            'import': inventory_import.to_dict()
+        }), 202
     
     @app.route('/api/inventory/imports/<int:import_id>/rollback', methods=['POST'])
     @token_required
     def rollback_import(current_user, import_id):
         inventory_import = InventoryImport.query.get_or_404(import_id)
         
-        if inventory_import.status != 'completed':
-            return jsonify({'message': 'Can only rollback completed imports'}), 400
+        if inventory_import.status not in ('completed', 'failed'):
+            return jsonify({'message': 'Can only rollback completed or failed imports'}), 400
+        
+        if inventory_import.mode == 'sync':
+            if not inventory_import.sync_delta:
+                return jsonify({'message': 'Sync made no changes to roll back'}), 400
+            try:
+                revert_delta(inventory_import.sync_delta, import_id, app.config['IMPORT_BATCH_SIZE'])
+                inventory_import.status = 'rolled_back'
+                inventory_import.rolled_back_at = datetime.utcnow()
+                bump('nodes', 'groups')
+                db.session.commit()
+                return jsonify({'message': 'Sync rolled back successfully'})
+            except Exception as e:
+                db.session.rollback()
+                return jsonify({'message': f'Rollback failed: {str(e)}'}), 500
         
         try:
-            # Delete created nodes
-            if inventory_import.created_nodes:
-                Node.query.filter(Node.id.in_(inventory_import.created_nodes)).delete(synchronize_session=False)
+            # Rows are tagged with their import; older imports only recorded ID lists
+            node_filter = Node.import_id == import_id
+            group_filter = NodeGroup.import_id == import_id
+            if inventory_import.created_nodes and not inventory_import.progress_total:
+                node_filter = db.or_(node_filter, Node.id.in_(inventory_import.created_nodes))
+            if inventory_import.created_groups and not inventory_import.progress_total:
+                group_filter = db.or_(group_filter, NodeGroup.id.in_(inventory_import.created_groups))
             
-            # Delete created groups
-            if inventory_import.created_groups:
-                NodeGroup.query.filter(NodeGroup.id.in_(inventory_import.created_groups)).delete(synchronize_session=False)
+            # Delete created nodes and groups along with their memberships
+            db.session.execute(node_group_members.delete().where(db.or_(
+                node_group_members.c.node_id.in_(db.select(Node.id).where(node_filter)),
+                node_group_members.c.group_id.in_(db.select(NodeGroup.id).where(group_filter))
+            )))
+            Node.query.filter(node_filter).delete(synchronize_session=False)
+            NodeGroup.query.filter(group_filter).delete(synchronize_session=False)
             
             inventory_import.status = 'rolled_back'
             inventory_import.rolled_back_at = datetime.utcnow()
             
+            bump('nodes', 'groups')
             db.session.commit()
             
             return jsonify({'message': 'Import rolled back successfully'})
@@ -678,240 +1107,6 @@ def create_app(config_name='default'):
         except Exception as e:
             return jsonify({'message': f'Rollback failed: {str(e)}'}), 500
     
-    def parse_inventory_file(file_path, file_format):
-        """Parse inventory file and return preview data"""
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        nodes = []
-        groups = {}
-        
-        try:
-            if file_format in ['yml', 'yaml']:
-                data = yaml.safe_load(content)
-                nodes, groups = parse_yaml_inventory(data)
-            elif file_format == 'ini':
-                nodes, groups = parse_ini_inventory(content)
-            elif file_format == 'json':
-                data = json.loads(content)
-                nodes, groups = parse_json_inventory(data)
-        except Exception as e:
-            raise Exception(f"Failed to parse {file_format} format: {str(e)}")
-        
-        return {
-            'nodes': nodes,
-            'groups': groups,
-            'total_nodes': len(nodes),
-            'total_groups': len(groups)
-        }
-    
-    def parse_inventory_for_import(file_path, file_format):
-        """Parse inventory file for actual import"""
-        with open(file_path, 'r') as f:
-            content = f.read()
-        
-        if file_format in ['yml', 'yaml']:
-            data = yaml.safe_load(content)
-            return parse_yaml_inventory_for_db(data)
-        elif file_format == 'ini':
-            return parse_ini_inventory_for_db(content)
-        elif file_format == 'json':
-            data = json.loads(content)
-            return parse_json_inventory_for_db(data)
-    
-    def parse_yaml_inventory(data):
-        """Parse YAML inventory for preview"""
-        nodes = []
-        groups = {}
-        
-        if 'all' in data and 'hosts' in data['all']:
-            for host_name, host_vars in data['all']['hosts'].items():
-                nodes.append({
-                    'name': host_name,
-                    'hostname': host_vars.get('ansible_host', host_name),
-                    'username': host_vars.get('ansible_user', 'root'),
-                    'port': host_vars.get('ansible_port', 22)
-                })
-        
-        if 'all' in data and 'children' in data['all']:
-            for group_name, group_data in data['all']['children'].items():
-                groups[group_name] = {
-                    'name': group_name,
-                    'nodes': list(group_data.get('hosts', {}).keys())
-                }
-        
-        return nodes, groups
-    
-    def parse_yaml_inventory_for_db(data):
-        """Parse YAML inventory for database import"""
-        nodes_data = []
-        groups_data = {}
-        
-        # Parse all hosts
-        if 'all' in data and 'hosts' in data['all']:
-            for host_name, host_vars in data['all']['hosts'].items():
-                nodes_data.append({
-                    'name': host_name,
-                    'hostname': host_vars.get('ansible_host', host_name),
-                    'username': host_vars.get('ansible_user', 'root'),
-                    'port': host_vars.get('ansible_port', 22),
-                    'groups': []
-                })
-        
-        # Parse groups
-        if 'all' in data and 'children' in data['all']:
-            for group_name, group_data in data['all']['children'].items():
-                groups_data[group_name] = {'hosts': []}
-                
-                if 'hosts' in group_data:
-                    for host_name, host_vars in group_data['hosts'].items():
-                        # Add host to nodes if not already exists
-                        existing_node = next((n for n in nodes_data if n['name'] == host_name), None)
-                        if existing_node:
-                            existing_node['groups'].append(group_name)
-                        else:
-                            nodes_data.append({
-                                'name': host_name,
-                                'hostname': host_vars.get('ansible_host', host_name),
-                                'username': host_vars.get('ansible_user', 'root'),
-                                'port': host_vars.get('ansible_port', 22),
-                                'groups': [group_name]
-                            })
-        
-        return nodes_data, groups_data
-    
-    def parse_ini_inventory(content):
-        """Parse INI inventory for preview"""
-        config = configparser.ConfigParser(allow_no_value=True)
-        config.read_string(content)
-        
-        nodes = []
-        groups = {}
-        
-        for section_name in config.sections():
-            if section_name == 'all':
-                for host_name in config[section_name]:
-                    nodes.append({
-                        'name': host_name,
-                        'hostname': host_name,
-                        'username': 'root',
-                        'port': 22
-                    })
-            else:
-                groups[section_name] = {
-                    'name': section_name,
-                    'nodes': list(config[section_name].keys())
-                }
-        
-        return nodes, groups
-    
-    def parse_ini_inventory_for_db(content):
-        """Parse INI inventory for database import"""
-        config = configparser.ConfigParser(allow_no_value=True)
-        config.read_string(content)
-        
-        nodes_data = []
-        groups_data = {}
-        
-        for section_name in config.sections():
-            if section_name == 'all':
-                for host_name in config[section_name]:
-                    nodes_data.append({
-                        'name': host_name,
-                        'hostname': host_name,
-                        'username': 'root',
-                        'port': 22,
-                        'groups': []
-                    })
-            else:
-                groups_data[section_name] = {'hosts': []}
-                for host_name in config[section_name]:
-                    existing_node = next((n for n in nodes_data if n['name'] == host_name), None)
-                    if existing_node:
-                        existing_node['groups'].append(section_name)
-                    else:
-                        nodes_data.append({
-                            'name': host_name,
-                            'hostname': host_name,
-                            'username': 'root',
-                            'port': 22,
-                            'groups': [section_name]
-                        })
-        
-        return nodes_data, groups_data
-    
-    def parse_json_inventory(data):
-        """Parse JSON inventory for preview"""
-        nodes = []
-        groups = {}
-        
-        # Handle Ansible dynamic inventory format
-        for key, value in data.items():
-            if key == '_meta':
-                continue
-            elif isinstance(value, dict) and 'hosts' in value:
-                # Group
-                groups[key] = {
-                    'name': key,
-                    'nodes': value['hosts']
-                }
-            elif isinstance(value, list):
-                # Simple group with host list
-                groups[key] = {
-                    'name': key,
-                    'nodes': value
-                }
-        
-        # Extract unique hosts
-        all_hosts = set()
-        for group_data in groups.values():
-            all_hosts.update(group_data['nodes'])
-        
-        for host in all_hosts:
-            nodes.append({
-                'name': host,
-                'hostname': host,
-                'username': 'root',
-                'port': 22
-            })
-        
-        return nodes, groups
-    
-    def parse_json_inventory_for_db(data):
-        """Parse JSON inventory for database import"""
-        nodes_data = []
-        groups_data = {}
-        
-        # Handle Ansible dynamic inventory format
-        for key, value in data.items():
-            if key == '_meta':
-                continue
-            elif isinstance(value, dict) and 'hosts' in value:
-                # Group
-                groups_data[key] = {'hosts': value['hosts']}
-            elif isinstance(value, list):
-                # Simple group with host list
-                groups_data[key] = {'hosts': value}
-        
-        # Extract unique hosts and assign to groups
-        all_hosts = {}
-        for group_name, group_data in groups_data.items():
-            for host in group_data['hosts']:
-                if host not in all_hosts:
-                    all_hosts[host] = {'groups': []}
-                all_hosts[host]['groups'].append(group_name)
-        
-        for host_name, host_info in all_hosts.items():
-            nodes_data.append({
-                'name': host_name,
-                'hostname': host_name,
-                'username': 'root',
-                'port': 22,
-                'groups': host_info['groups']
-            })
-        
-        return nodes_data, groups_data
-    
     # Socket events
     @socketio.on('connect')
     def handle_connect():
@@ -938,4 +1133,5 @@ def create_app(config_name='default'):
 
 if __name__ == '__main__':
     app, socketio = create_app()
-    socketio.run(app, host='0.0.0.0', port=5000, debug=True)
+    # Local development server; production serves wsgi.py under gunicorn
+    socketio.run(app, host='127.0.0.1', port=5000, debug=app.config['DEBUG'])
@@ -10,11 +10,12 @@ def token_required(f):
             verify_jwt_in_request()
             current_user_id = get_jwt_identity()
             current_user = User.query.get(current_user_id)
-            if not current_user:
-                return jsonify({'message': 'Invalid token'}), 401
-            return f(current_user, *args, **kwargs)
         except Exception as e:
             return jsonify({'message': 'Token is invalid'}), 401
+        if not current_user:
+            return jsonify({'message': 'Invalid token'}), 401
+        # Outside the try, so errors from the view (e.g. 413 on a large body) reach their handlers
+        return f(current_user, *args, **kwargs)
     return decorated
 
 def admin_required(f):
@@ -24,9 +25,9 @@ def admin_required(f):
             verify_jwt_in_request()
             current_user_id = get_jwt_identity()
             current_user = User.query.get(current_user_id)
-            if not current_user or not current_user.is_admin:
-                return jsonify({'message': 'Admin privileges required'}), 403
-            return f(current_user, *args, **kwargs)
         except Exception as e:
             return jsonify({'message': 'Access denied'}), 403
+        if not current_user or not current_user.is_admin:
+            return jsonify({'message': 'Admin privileges required'}), 403
+        return f(current_user, *args, **kwargs)
     return decorated
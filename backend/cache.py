@@ -0,0 +1,113 @@
+import redis
+from sqlalchemy import event
+from models import db
+
+
+class ResponseCache:
+    """Read-through Redis cache for serialized list responses.
+
+    Entries are grouped by collection. Committing a transaction that bumped a
+    collection's version drops that collection's entries, and every entry
+    also expires after CACHE_TTL seconds. Any Redis failure falls back to
+    building the response directly.
+    """
+
+    STATS_KEY = 'cache:stats'
+
+    def __init__(self):
+        self.enabled = False
+        self.ttl = 0
+        self.redis = None
+
+    def init_app(self, app):
+        self.enabled = app.config['CACHE_ENABLED']
+        self.ttl = app.config['CACHE_TTL']
+        if self.enabled:
+            self.redis = redis.Redis.from_url(app.config['REDIS_URL'], socket_timeout=0.5,
+                                              socket_connect_timeout=0.5)
+            event.listen(db.session, 'after_commit', self._after_commit)
+            event.listen(db.session, 'after_rollback', self._after_rollback)
+
+    def get_or_build(self, collection, key, build):
+        """Return the cached bytes for key, or build, store and return them"""
+        if not self.enabled:
+            return build()
+
+        cache_key = f'cache:{collection}:{key}'
+        try:
+            cached = self.redis.get(cache_key)
+        except redis.RedisError:
+            self._record(collection, 'errors')
+            return build()
+
+        if cached is not None:
+            self._record(collection, 'hits')
+            return cached
+
+        value = build()
+        try:
+            pipe = self.redis.pipeline()
+            pipe.set(cache_key, value, ex=self.ttl)
+            pipe.sadd(f'cache:{collection}:keys', cache_key)
+            pipe.expire(f'cache:{collection}:keys', self.ttl)
+            pipe.hincrby(self.STATS_KEY, f'{collection}:misses', 1)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+        return value
+
+    def invalidate(self, *collections):
+        if not self.enabled:
+            return
+        try:
+            for collection in collections:
+                index_key = f'cache:{collection}:keys'
+                keys = self.redis.smembers(index_key)
+                self.redis.delete(index_key, *keys)
+        except redis.RedisError:
+            pass  # Stale entries still expire with the TTL
+
+    def stats(self):
+        if not self.enabled:
+            return {'enabled': False}
+        try:
+            raw = self.redis.hgetall(self.STATS_KEY)
+        except redis.RedisError as e:
+            return {'enabled': True, 'error': str(e)}
+
+        collections = {}
+        for field, count in raw.items():
+            collection, metric = field.decode().split(':')
+            collections.setdefault(collection, {'hits': 0, 'misses': 0, 'errors': 0})[metric] = int(count)
+        for counts in collections.values():
+            lookups = counts['hits'] + counts['misses']
+            counts['hit_ratio'] = round(counts['hits'] / lookups, 3) if lookups else None
+        return {'enabled': True, 'ttl': self.ttl, 'collections': collections}
+
+    def clear(self):
+        """Drop every cached response and reset the metrics"""
+        if not self.enabled:
+            return
+        try:
+            keys = list(self.redis.scan_iter('cache:*'))
+            if keys:
+                self.redis.delete(*keys)
+        except redis.RedisError:
+            pass
+
+    def _record(self, collection, metric):
+        try:
+            self.redis.hincrby(self.STATS_KEY, f'{collection}:{metric}', 1)
+        except redis.RedisError:
+            pass
+
+    def _after_commit(self, session):
+        bumped = session.info.pop('bumped_collections', None)
+        if bumped:
+            self.invalidate(*bumped)
+
+    def _after_rollback(self, session):
+        session.info.pop('bumped_collections', None)
+
+
+response_cache = ResponseCache()
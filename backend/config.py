@@ -6,12 +6,57 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_TTL = int(os.environ.get('CACHE_TTL', 300))
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'true').lower() == 'true'
     JWT_SECRET_KEY = SECRET_KEY
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
-    UPLOAD_FOLDER = '/app/playbooks'
-    INVENTORY_FOLDER = '/app/inventory'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER') or '/app/playbooks'
+    PLAYBOOK_CATALOG_SCAN_INTERVAL = float(os.environ.get('PLAYBOOK_CATALOG_SCAN_INTERVAL', 5))  # Seconds between folder rescans
+    PLAYBOOK_SYNTAX_CHECK_WORKERS = int(os.environ.get('PLAYBOOK_SYNTAX_CHECK_WORKERS', 2))
+    PLAYBOOK_SYNTAX_CHECK_TIMEOUT = int(os.environ.get('PLAYBOOK_SYNTAX_CHECK_TIMEOUT', 60))
+    # Seconds before a failed check is run again; failures can come from roles or collections not yet installed
+    PLAYBOOK_SYNTAX_CHECK_INVALID_TTL = int(os.environ.get('PLAYBOOK_SYNTAX_CHECK_INVALID_TTL', 300))
+    INVENTORY_FOLDER = os.environ.get('INVENTORY_FOLDER') or '/app/inventory'
+    INVENTORY_CACHE_FOLDER = os.environ.get('INVENTORY_CACHE_FOLDER') or '/app/inventory/compiled'
+    INVENTORY_CACHE_SIZE = int(os.environ.get('INVENTORY_CACHE_SIZE', 32))
+    # Artifacts used within this many seconds, or leased by a running job, are never pruned
+    INVENTORY_CACHE_LEASE_SECONDS = int(os.environ.get('INVENTORY_CACHE_LEASE_SECONDS', 120))
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
+    # Inventory upload and paste only; matches the /api/inventory/ body limit in nginx.conf
+    INVENTORY_MAX_CONTENT_LENGTH = int(os.environ.get('INVENTORY_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))  # 512MB
+    INVENTORY_PREVIEW_LIMIT = 100
+    INVENTORY_PREVIEW_MAX_LIMIT = 1000
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_STALE_AFTER = int(os.environ.get('IMPORT_STALE_AFTER', 120))  # Seconds without a checkpoint before resuming
+    SSH_CONTROL_PATH_DIR = os.environ.get('SSH_CONTROL_PATH_DIR') or '/app/ssh_control'
+    SSH_CONTROL_PERSIST = int(os.environ.get('SSH_CONTROL_PERSIST', 300))  # Idle seconds before a master connection closes
+    SSH_PIPELINING = os.environ.get('SSH_PIPELINING', 'true').lower() == 'true'
+    FACT_CACHE_BACKEND = os.environ.get('FACT_CACHE_BACKEND', 'jsonfile')  # jsonfile or redis
+    FACT_CACHE_FOLDER = os.environ.get('FACT_CACHE_FOLDER') or '/app/facts'
+    FACT_CACHE_REDIS_URL = os.environ.get('FACT_CACHE_REDIS_URL') or REDIS_URL
+    FACT_CACHE_PREFIX = os.environ.get('FACT_CACHE_PREFIX', 'ansible_facts_')
+    FACT_CACHE_TTL = int(os.environ.get('FACT_CACHE_TTL', 86400))  # Seconds before facts are gathered again
     ALLOWED_EXTENSIONS = {'yml', 'yaml', 'ini', 'json'}
+    PING_FORKS = int(os.environ.get('PING_FORKS', 50))
+    PING_EMIT_BATCH_SIZE = int(os.environ.get('PING_EMIT_BATCH_SIZE', 100))
+    PROBE_CONCURRENCY = int(os.environ.get('PROBE_CONCURRENCY', 500))
+    PROBE_TIMEOUT = float(os.environ.get('PROBE_TIMEOUT', 3.0))
+    EXECUTION_MAX_CONCURRENT = int(os.environ.get('EXECUTION_MAX_CONCURRENT', 4))
+    EXECUTION_MAX_PER_USER = int(os.environ.get('EXECUTION_MAX_PER_USER', 2))
+    EXECUTION_POLL_INTERVAL = float(os.environ.get('EXECUTION_POLL_INTERVAL', 5))
+    EXECUTION_HEARTBEAT_INTERVAL = float(os.environ.get('EXECUTION_HEARTBEAT_INTERVAL', 5))
+    EXECUTION_STALE_AFTER = int(os.environ.get('EXECUTION_STALE_AFTER', 60))  # Seconds without a heartbeat
+    EXECUTION_FORKS = int(os.environ.get('EXECUTION_FORKS', 20))
+    EXECUTION_MAX_PARALLEL_PLAYBOOKS = int(os.environ.get('EXECUTION_MAX_PARALLEL_PLAYBOOKS', 4))
+    EXECUTION_MAX_SHARDS = int(os.environ.get('EXECUTION_MAX_SHARDS', 16))
+    EXECUTION_EVENT_BATCH_SIZE = int(os.environ.get('EXECUTION_EVENT_BATCH_SIZE', 200))
+    EXECUTION_EVENT_FLUSH_INTERVAL = float(os.environ.get('EXECUTION_EVENT_FLUSH_INTERVAL', 1.0))
+    EXECUTION_OUTPUT_FLUSH_BYTES = int(os.environ.get('EXECUTION_OUTPUT_FLUSH_BYTES', 64 * 1024))
+    EXECUTION_LOG_DEFAULT_LIMIT = 64 * 1024
+    EXECUTION_LOG_MAX_LIMIT = 1024 * 1024
+    EXECUTION_PAGE_MAX_LIMIT = 200
     
 class DevelopmentConfig(Config):
     DEBUG = True
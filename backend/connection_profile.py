@@ -0,0 +1,74 @@
+import os
+
+
+class ConnectionProfile:
+    """SSH settings applied to every Ansible run, with per-node overrides.
+
+    Master connections live in SSH_CONTROL_PATH_DIR rather than in a run's
+    temporary directory, so back-to-back playbooks and executions against a
+    host reuse one authenticated connection until it has been idle for
+    SSH_CONTROL_PERSIST seconds. Pipelining sends each module over that
+    connection instead of copying it to a remote temp file first.
+    """
+
+    def __init__(self, config):
+        self.control_path_dir = config['SSH_CONTROL_PATH_DIR']
+        self.control_persist = config['SSH_CONTROL_PERSIST']
+        self.pipelining = config['SSH_PIPELINING']
+
+    def ssh_args(self, control_persist=None):
+        """ssh_args for a ControlPersist in seconds; 0 turns multiplexing off"""
+        if control_persist is None:
+            control_persist = self.control_persist
+        if control_persist <= 0:
+            return '-o ControlMaster=no'
+        return f'-C -o ControlMaster=auto -o ControlPersist={control_persist}s'
+
+    def envvars(self):
+        os.makedirs(self.control_path_dir, mode=0o700, exist_ok=True)
+        return {
+            'ANSIBLE_SSH_ARGS': self.ssh_args(),
+            'ANSIBLE_SSH_CONTROL_PATH_DIR': self.control_path_dir,
+            'ANSIBLE_PIPELINING': str(self.pipelining)
+        }
+
+    def host_vars(self, node):
+        """Inventory vars for whichever settings the node overrides"""
+        host_vars = {}
+        if node.ssh_control_persist is not None:
+            host_vars['ansible_ssh_args'] = self.ssh_args(node.ssh_control_persist)
+        if node.ssh_pipelining is not None:
+            host_vars['ansible_pipelining'] = node.ssh_pipelining
+        if node.ssh_extra_args:
+            host_vars['ansible_ssh_extra_args'] = node.ssh_extra_args
+        return host_vars
+
+
+def parse_overrides(data):
+    """Validated override columns from a node payload; blank values reset a setting to the profile default.
+
+    Raises ValueError with a message suitable for the API response.
+    """
+    overrides = {}
+    if 'ssh_pipelining' in data:
+        value = data['ssh_pipelining']
+        if isinstance(value, str):
+            value = {'': None, 'true': True, 'false': False}.get(value.lower(), value)
+        if value is not None and not isinstance(value, bool):
+            raise ValueError('ssh_pipelining must be true, false or empty')
+        overrides['ssh_pipelining'] = value
+    if 'ssh_control_persist' in data:
+        value = data['ssh_control_persist']
+        if value in (None, ''):
+            value = None
+        else:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = -1
+            if value < 0:
+                raise ValueError('ssh_control_persist must be a number of seconds, 0 to disable')
+        overrides['ssh_control_persist'] = value
+    if 'ssh_extra_args' in data:
+        overrides['ssh_extra_args'] = (data['ssh_extra_args'] or '').strip() or None
+    return overrides
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+import redis
+
+
+class FactCache:
+    """Ansible's persistent fact cache, configured for playbook runs and readable by the API.
+
+    Runs use gathering=smart, so a host's facts are gathered once and reused
+    until FACT_CACHE_TTL expires them. The jsonfile backend keeps one file per
+    host in FACT_CACHE_FOLDER; the redis backend uses community.general.redis
+    against FACT_CACHE_REDIS_URL. Entries are keyed by inventory hostname.
+    """
+
+    KEYSET = 'ansible_cache_keys'  # community.general.redis default
+
+    def __init__(self, config):
+        self.backend = config['FACT_CACHE_BACKEND']
+        self.ttl = config['FACT_CACHE_TTL']
+        self.prefix = config['FACT_CACHE_PREFIX']
+        self.folder = config['FACT_CACHE_FOLDER']
+        self.redis_url = config['FACT_CACHE_REDIS_URL']
+        self._redis = None
+        if self.backend not in ('jsonfile', 'redis'):
+            raise ValueError(f"Unsupported FACT_CACHE_BACKEND {self.backend!r}")
+
+    def run_options(self):
+        """Keyword arguments for ansible_runner.run that turn on smart gathering and the shared cache.
+
+        ansible-runner points a jsonfile cache at each run's artifact directory
+        unless fact_cache_type is something else, which would discard the
+        facts with the temporary private_data_dir; None leaves our settings alone.
+        """
+        if self.backend == 'redis':
+            plugin, connection = 'community.general.redis', self._redis_connection()
+        else:
+            os.makedirs(self.folder, exist_ok=True)
+            plugin, connection = 'ansible.builtin.jsonfile', self.folder
+        return {
+            'fact_cache_type': None,
+            'envvars': {
+                'ANSIBLE_GATHERING': 'smart',
+                'ANSIBLE_CACHE_PLUGIN': plugin,
+                'ANSIBLE_CACHE_PLUGIN_CONNECTION': connection,
+                'ANSIBLE_CACHE_PLUGIN_TIMEOUT': str(self.ttl),
+                'ANSIBLE_CACHE_PLUGIN_PREFIX': self.prefix
+            }
+        }
+
+    def get(self, hostname):
+        """Return {'facts', 'cached_at', 'expires_at'} for a host, or None if nothing current is cached"""
+        if self.backend == 'redis':
+            client = self._client()
+            raw = client.get(self.prefix + hostname)
+            cached_at = client.zscore(self.KEYSET, hostname)
+        else:
+            path = os.path.join(self.folder, self.prefix + hostname)
+            try:
+                cached_at = os.path.getmtime(path)
+                with open(path) as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                return None
+            # The jsonfile plugin only drops stale files when they are next read by Ansible
+            if self.ttl and time.time() - cached_at > self.ttl:
+                return None
+
+        if raw is None:
+            return None
+        return {
+            'facts': json.loads(raw),
+            'cached_at': datetime.utcfromtimestamp(cached_at).isoformat() if cached_at else None,
+            'expires_at': datetime.utcfromtimestamp(cached_at + self.ttl).isoformat()
+            if cached_at and self.ttl else None
+        }
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url, socket_timeout=2, socket_connect_timeout=2)
+        return self._redis
+
+    def _redis_connection(self):
+        """The plugin takes host:port:db[:password] rather than a URL"""
+        url = urlparse(self.redis_url)
+        db_number = url.path.lstrip('/') or '0'
+        connection = f"{url.hostname or 'localhost'}:{url.port or 6379}:{db_number}"
+        if url.password:
+            connection += f':{url.password}'
+        if url.scheme == 'rediss':
+            connection = 'tls://' + connection
+        return connection
@@ -0,0 +1,7 @@
+# Web workers; see wsgi.py for why there is one worker per container
+bind = '0.0.0.0:5000'
+worker_class = 'gthread'
+workers = 1
+threads = 100  # Every open WebSocket holds a thread
+timeout = 120
+accesslog = '-'
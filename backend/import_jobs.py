@@ -0,0 +1,195 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from models import db, Node, NodeGroup, InventoryImport
+from inventory_parser import normalized_inventory
+from importer import BulkImporter
+from inventory_sync import compute_diff, apply_diff, source_import_ids
+from versioning import bump
+
+
+class ImportJobs:
+    """Runs inventory imports in background threads, committing a checkpoint after every batch.
+
+    A job whose heartbeat goes stale because its process died is claimed again
+    and resumes from the last checkpoint instead of starting over. Syncs apply
+    their diff in a single transaction, so a failed one simply runs again.
+    The heartbeat comes from an ImportLease held for the whole job, so a long
+    parse or sync is not mistaken for a dead worker.
+    """
+
+    def __init__(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+        self.batch_size = app.config['IMPORT_BATCH_SIZE']
+        self.stale_after = timedelta(seconds=app.config['IMPORT_STALE_AFTER'])
+        self._watcher = None
+
+    def start(self, import_id):
+        """Claim a pending, failed or stale import and run it in the background; False if it is running elsewhere"""
+        if not self._claim(import_id):
+            return False
+        thread = threading.Thread(target=self._run_in_context, args=(import_id,))
+        thread.start()
+        return True
+
+    def watch(self):
+        """Periodically resume imports whose worker stopped sending heartbeats"""
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_loop, daemon=True)
+            self._watcher.start()
+
+    def _watch_loop(self):
+        while True:
+            try:
+                with self.app.app_context():
+                    cutoff = datetime.utcnow() - self.stale_after
+                    stale = db.session.query(InventoryImport.id).filter(
+                        InventoryImport.status == 'running',
+                        InventoryImport.heartbeat_at < cutoff
+                    ).all()
+                    for (import_id,) in stale:
+                        if self.start(import_id):
+                            print(f"Resuming inventory import {import_id} from its last checkpoint")
+            except Exception as e:
+                print(f"Inventory import watcher error: {e}")
+            time.sleep(self.stale_after.total_seconds() / 2)
+
+    def _claim(self, import_id):
+        now = datetime.utcnow()
+        claimed = InventoryImport.query.filter(
+            InventoryImport.id == import_id,
+            db.or_(
+                InventoryImport.status.in_(('pending', 'failed')),
+                db.and_(InventoryImport.status == 'running', InventoryImport.heartbeat_at < now - self.stale_after)
+            )
+        ).update({'status': 'running', 'heartbeat_at': now, 'error_message': None}, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _run_in_context(self, import_id):
+        with self.app.app_context():
+            self._run(import_id)
+
+    def _run(self, import_id):
+        inventory_import = InventoryImport.query.get(import_id)
+
+        try:
+            with ImportLease(self.app, import_id, self.stale_after.total_seconds() / 4):
+                self._run_job(inventory_import)
+        except Exception as e:
+            db.session.rollback()
+            inventory_import.status = 'failed'
+            inventory_import.error_message = str(e)
+            db.session.commit()
+
+        self.socketio.emit('import_complete', {
+            'import_id': import_id,
+            'status': inventory_import.status,
+            'created_nodes': inventory_import.total_nodes,
+            'created_groups': inventory_import.total_groups,
+            'error': inventory_import.error_message
+        })
+
+    def _run_job(self, inventory_import):
+        # Reads the copy normalized at upload instead of parsing the file again
+        inventory = normalized_inventory(inventory_import.file_path, inventory_import.format)
+        if inventory_import.mode == 'sync':
+            self._run_sync(inventory_import, inventory)
+        else:
+            self._run_import(inventory_import, inventory)
+        self._record_created(inventory_import)
+        inventory_import.status = 'completed'
+        inventory_import.imported_at = datetime.utcnow()
+        db.session.commit()
+
+    def _run_import(self, inventory_import, inventory):
+        importer = BulkImporter(f'Imported from {inventory_import.filename}', inventory_import.id, self.batch_size)
+
+        # Groups are few; they are imported up front and re-checked on resume
+        importer.import_groups(inventory.columns['groups'])
+        inventory_import.progress_total = len(inventory)
+        self._checkpoint(inventory_import)
+
+        resumed_from = inventory_import.processed_nodes
+        started = time.monotonic()
+        for start in range(resumed_from, len(inventory), self.batch_size):
+            importer.import_nodes(inventory.nodes(start, start + self.batch_size))
+            inventory_import.processed_nodes = min(start + self.batch_size, len(inventory))
+            self._checkpoint(inventory_import)
+            self._emit_progress(inventory_import, resumed_from, started)
+
+    def _run_sync(self, inventory_import, inventory):
+        """Apply the diff in one transaction; it is recomputed here, so it reflects the data at apply time"""
+        inventory_import.progress_total = len(inventory)
+        # Committed up front: the sync transaction must not hold this row, or it blocks the lease's heartbeat
+        db.session.commit()
+        diff = compute_diff(inventory.nodes(), inventory.groups_data(), source_import_ids(inventory_import.filename))
+        inventory_import.sync_delta = apply_diff(diff, f'Synced from {inventory_import.filename}',
+                                                 inventory_import.id, self.batch_size)
+        inventory_import.processed_nodes = len(inventory)
+        inventory_import.heartbeat_at = datetime.utcnow()
+        bump('nodes', 'groups')
+
+    def _record_created(self, inventory_import):
+        inventory_import.created_nodes = [row.id for row in
+                                          db.session.query(Node.id).filter_by(import_id=inventory_import.id).order_by(Node.id)]
+        inventory_import.created_groups = [row.id for row in
+                                           db.session.query(NodeGroup.id).filter_by(import_id=inventory_import.id).order_by(NodeGroup.id)]
+        inventory_import.total_nodes = len(inventory_import.created_nodes)
+        inventory_import.total_groups = len(inventory_import.created_groups)
+
+    def _checkpoint(self, inventory_import):
+        """Commit the batch together with the progress that covers it"""
+        inventory_import.heartbeat_at = datetime.utcnow()
+        bump('nodes', 'groups')
+        db.session.commit()
+
+    def _emit_progress(self, inventory_import, resumed_from, started):
+        processed = inventory_import.processed_nodes
+        total = inventory_import.progress_total
+        elapsed = time.monotonic() - started
+        rate = (processed - resumed_from) / elapsed if elapsed > 0 else None
+        self.socketio.emit('import_progress', {
+            'import_id': inventory_import.id,
+            'processed': processed,
+            'total': total,
+            'rate': round(rate, 1) if rate else None,
+            'eta': round((total - processed) / rate, 1) if rate else None
+        })
+
+
+class ImportLease:
+    """Stamps heartbeat_at on a running import from a background thread while held.
+
+    Checkpoints only happen between batches; parsing, importing groups or
+    applying a sync can take longer than IMPORT_STALE_AFTER on their own.
+    """
+
+    def __init__(self, app, import_id, interval):
+        self.app = app
+        self.import_id = import_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat_loop, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    db.session.execute(
+                        db.update(InventoryImport)
+                        .where(InventoryImport.id == self.import_id, InventoryImport.status == 'running')
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+                    db.session.commit()
+            except Exception as e:
+                print(f"Inventory import {self.import_id} heartbeat error: {e}")
@@ -0,0 +1,83 @@
+from models import db, Node, NodeGroup, node_group_members
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class BulkImporter:
+    """Creates missing groups and nodes with set-based statements.
+
+    Existing groups are matched by name and existing nodes by hostname and left
+    untouched, as are repeated hostnames within the inventory after the first.
+    New nodes join every group they are listed under. Rows are tagged with
+    import_id so a rollback can find them; the caller commits.
+    """
+
+    def __init__(self, description, import_id=None, batch_size=1000):
+        self.description = description
+        self.import_id = import_id
+        self.batch_size = batch_size
+        self.group_ids = dict(db.session.query(NodeGroup.name, NodeGroup.id))
+        self.existing_hostnames = {row.hostname for row in db.session.query(Node.hostname)}
+
+    def import_groups(self, groups_data):
+        """Insert groups that do not exist yet and return their IDs"""
+        new_groups = [
+            {'name': name, 'description': self.description, 'import_id': self.import_id}
+            for name in groups_data if name not in self.group_ids
+        ]
+        created = []
+        for chunk in _chunks(new_groups, self.batch_size):
+            rows = db.session.execute(
+                db.insert(NodeGroup).returning(NodeGroup.id, NodeGroup.name, sort_by_parameter_order=True),
+                chunk
+            )
+            for group_id, name in rows:
+                self.group_ids[name] = group_id
+                created.append(group_id)
+        return created
+
+    def import_nodes(self, nodes_data):
+        """Insert nodes whose hostname is new, with their memberships, and return their IDs"""
+        new_nodes = []
+        for node_info in nodes_data:
+            if node_info['hostname'] in self.existing_hostnames:
+                continue
+            self.existing_hostnames.add(node_info['hostname'])
+            new_nodes.append(node_info)
+
+        created = []
+        memberships = []
+        for chunk in _chunks(new_nodes, self.batch_size):
+            node_ids = db.session.scalars(
+                db.insert(Node).returning(Node.id, sort_by_parameter_order=True),
+                [{
+                    'name': node_info['name'],
+                    'hostname': node_info['hostname'],
+                    'username': node_info.get('username', 'root'),
+                    'port': node_info.get('port', 22),
+                    'description': self.description,
+                    'import_id': self.import_id
+                } for node_info in chunk]
+            ).all()
+            created.extend(node_ids)
+            for node_id, node_info in zip(node_ids, chunk):
+                memberships.extend(
+                    {'node_id': node_id, 'group_id': self.group_ids[group_name]}
+                    for group_name in node_info.get('groups', []) if group_name in self.group_ids
+                )
+
+        for chunk in _chunks(memberships, self.batch_size):
+            db.session.execute(node_group_members.insert(), chunk)
+
+        return created
+
+
+def bulk_import(nodes_data, groups_data, description, batch_size=1000):
+    """Import everything in one go; return (node_ids, group_ids) created"""
+    importer = BulkImporter(description, batch_size=batch_size)
+    created_groups = importer.import_groups(groups_data)
+    created_nodes = importer.import_nodes(nodes_data)
+    return created_nodes, created_groups
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from models import db, Node, NodeGroup, node_group_members
+from versioning import current_version
+
+
+class InventoryCache:
+    """Compiled JSON inventories for execution targets, kept in memory and on disk.
+
+    Artifacts are named by a hash of their content, so any change to the
+    targeted nodes or memberships produces a new file. The in-memory index is
+    keyed by the targets and the nodes/groups collection versions, so while
+    neither collection changes a repeat lookup runs no host queries at all.
+
+    Runs hold a lease on their artifact. Leased files have their mtime
+    refreshed every lease_seconds / 3, and pruning skips any file modified in
+    the last lease_seconds, so an artifact in use by a run in this or any other
+    process is never deleted under it.
+    """
+
+    def __init__(self, folder, max_entries, host_vars, lease_seconds=120):
+        self.folder = folder
+        self.max_entries = max_entries
+        self.host_vars = host_vars
+        self.lease_seconds = lease_seconds
+        self.entries = OrderedDict()
+        self.leases = Counter()
+        self.lock = threading.Lock()
+        self._refresher = None
+
+    def get(self, target_nodes, target_groups):
+        """Return (inventory_path, host_names) for the targets, compiling on a miss"""
+        targets = (tuple(sorted(target_nodes or [])), tuple(sorted(target_groups or [])))
+        key = (targets, current_version('nodes'), current_version('groups'))
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and os.path.exists(entry[0]):
+                self.entries.move_to_end(key)
+                os.utime(entry[0])
+                return entry
+
+        inventory = self._compile(*targets)
+        content = json.dumps(inventory, sort_keys=True, separators=(',', ':'))
+        path = os.path.join(self.folder, hashlib.sha256(content.encode()).hexdigest() + '.json')
+
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            self._write(path, content)
+            self._prune()
+
+        entry = (path, sorted(inventory['all']['hosts']))
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    @contextmanager
+    def lease(self, target_nodes, target_groups):
+        """get() the artifact for the targets and keep it from being pruned until the block exits"""
+        entry = self.get(target_nodes, target_groups)
+        with self.lock:
+            self.leases[entry[0]] += 1
+            if self._refresher is None:
+                self._refresher = threading.Thread(target=self._refresh_leases, daemon=True)
+                self._refresher.start()
+        try:
+            yield entry
+        finally:
+            with self.lock:
+                self.leases[entry[0]] -= 1
+                if not self.leases[entry[0]]:
+                    del self.leases[entry[0]]
+
+    def _refresh_leases(self):
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self.lock:
+                paths = list(self.leases)
+            for path in paths:
+                try:
+                    os.utime(path)
+                except OSError:
+                    pass
+
+    def _compile(self, target_nodes, target_groups):
+        """Render each host's vars once under all, with groups referencing hosts by name"""
+        filters = []
+        if target_nodes:
+            filters.append(Node.id.in_(target_nodes))
+        if target_groups:
+            filters.append(Node.id.in_(
+                db.select(node_group_members.c.node_id)
+                .where(node_group_members.c.group_id.in_(target_groups))
+            ))
+
+        hosts = {}
+        children = {}
+        if filters:
+            rows = db.session.query(Node.id, Node.hostname, Node.username, Node.port, Node.ssh_pipelining,
+                                    Node.ssh_control_persist, Node.ssh_extra_args) \
+                .filter(db.or_(*filters)).order_by(Node.id).all()
+            hosts = {row.hostname: self.host_vars(row) for row in rows}
+
+        if target_groups:
+            children = {group.name: {'hosts': {}} for group in
+                        db.session.query(NodeGroup.name).filter(NodeGroup.id.in_(target_groups))}
+            members = db.session.query(Node.hostname, NodeGroup.name) \
+                .join(node_group_members, node_group_members.c.node_id == Node.id) \
+                .join(NodeGroup, NodeGroup.id == node_group_members.c.group_id) \
+                .filter(NodeGroup.id.in_(target_groups))
+            for hostname, group_name in members:
+                children[group_name]['hosts'][hostname] = {}
+
+        return {'all': {'hosts': hosts, 'children': children}}
+
+    def _write(self, path, content):
+        """Write atomically so concurrent runs never read a partial file"""
+        os.makedirs(self.folder, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def _prune(self):
+        """Delete the least recently used artifacts beyond max_entries, sparing leased ones"""
+        try:
+            paths = [os.path.join(self.folder, name) for name in os.listdir(self.folder) if name.endswith('.json')]
+            paths.sort(key=os.path.getmtime, reverse=True)
+            cutoff = time.time() - self.lease_seconds
+            with self.lock:
+                leased = set(self.leases)
+            for path in paths[self.max_entries:]:
+                if path in leased or os.path.getmtime(path) > cutoff:
+                    continue  # In use here, or recently used or refreshed by a run elsewhere
+                os.remove(path)
+        except OSError:
+            pass  # Another process pruned concurrently
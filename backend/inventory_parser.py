@@ -0,0 +1,355 @@
+import marshal
+import os
+import shlex
+import tempfile
+import yaml
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# Connection variables mapped onto Node columns
+HOST_FIELDS = (('ansible_host', 'hostname'), ('ansible_user', 'username'), ('ansible_port', 'port'))
+
+
+def iter_inventory(file_path, file_format):
+    """Stream ('group', name) and ('host', name, fields, group) records from an inventory file.
+
+    fields holds the host's connection settings, or None when this occurrence
+    sets none; group is None for hosts listed directly under all. Records are
+    produced while the file is read, so memory does not grow with its size.
+    JSON is read by the YAML event parser, which accepts it as a subset.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            if file_format == 'ini':
+                yield from _iter_ini(f)
+            elif file_format in ('yml', 'yaml', 'json'):
+                yield from _iter_yaml(f)
+            else:
+                raise ValueError('unsupported format')
+    except (yaml.YAMLError, ValueError) as e:
+        raise ValueError(f"Failed to parse {file_format} format: {str(e)}")
+
+
+def load_inventory(file_path, file_format):
+    """Collect (nodes_data, groups_data) for an import, merging repeated hosts by name"""
+    nodes = {}
+    groups_data = {}
+
+    for record in iter_inventory(file_path, file_format):
+        if record[0] == 'group':
+            groups_data.setdefault(record[1], {'hosts': []})
+            continue
+
+        _, name, fields, group = record
+        node = nodes.get(name)
+        if node is None:
+            node = nodes[name] = dict(_default_node(name), groups=[])
+            node['_explicit'] = False
+        # The first occurrence that sets connection variables wins
+        if fields and not node['_explicit']:
+            node.update(fields, _explicit=True)
+        if group and group not in node['groups']:
+            node['groups'].append(group)
+            groups_data.setdefault(group, {'hosts': []})['hosts'].append(name)
+
+    nodes_data = []
+    for node in nodes.values():
+        del node['_explicit']
+        nodes_data.append(node)
+    return nodes_data, groups_data
+
+
+class NormalizedInventory:
+    """Columnar form of a parsed inventory, written next to the upload and read by preview and import.
+
+    Hosts keep the order they first appear in the file; each host's groups are
+    stored as indexes into the group list. The file is a marshal dump of plain
+    lists, so loading it costs far less than parsing the inventory again.
+    The size and mtime of the source file it was built from are stored with
+    it, so a copy left behind by an earlier file at the same path is ignored.
+    """
+
+    VERSION = 2
+    SUFFIX = '.normalized'
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_parsed(cls, nodes_data, groups_data, source=None):
+        group_names = list(groups_data)
+        group_index = {name: index for index, name in enumerate(group_names)}
+        return cls({
+            'version': cls.VERSION,
+            'source': source,
+            'groups': group_names,
+            'names': [node['name'] for node in nodes_data],
+            'hostnames': [node['hostname'] for node in nodes_data],
+            'usernames': [node['username'] for node in nodes_data],
+            'ports': [node['port'] for node in nodes_data],
+            'members': [[group_index[group] for group in node['groups']] for node in nodes_data]
+        })
+
+    @classmethod
+    def read(cls, path, source=None):
+        """Load a normalized copy; ValueError if it is outdated or was built from a different source"""
+        with open(path, 'rb') as f:
+            columns = marshal.load(f)
+        if not isinstance(columns, dict) or columns.get('version') != cls.VERSION:
+            raise ValueError('outdated normalized inventory')
+        if source is not None and columns.get('source') != source:
+            raise ValueError('normalized inventory does not match its source file')
+        return cls(columns)
+
+    def write(self, path):
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump(self.columns, f)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def __len__(self):
+        return len(self.columns['names'])
+
+    def nodes(self, start=0, stop=None):
+        """Hosts in [start, stop) in the shape load_inventory returns"""
+        c = self.columns
+        groups = c['groups']
+        return [
+            {'name': name, 'hostname': hostname, 'username': username, 'port': port,
+             'groups': [groups[index] for index in members]}
+            for name, hostname, username, port, members in zip(
+                c['names'][start:stop], c['hostnames'][start:stop], c['usernames'][start:stop],
+                c['ports'][start:stop], c['members'][start:stop])
+        ]
+
+    def groups_data(self):
+        groups_data = {name: {'hosts': []} for name in self.columns['groups']}
+        for name, members in zip(self.columns['names'], self.columns['members']):
+            for index in members:
+                groups_data[self.columns['groups'][index]]['hosts'].append(name)
+        return groups_data
+
+    def preview(self, offset=0, limit=100):
+        """Counts plus one page of hosts"""
+        counts = [0] * len(self.columns['groups'])
+        for members in self.columns['members']:
+            for index in members:
+                counts[index] += 1
+        return {
+            'nodes': [{k: v for k, v in node.items() if k != 'groups'}
+                      for node in self.nodes(offset, offset + limit)],
+            'groups': {name: {'name': name, 'node_count': count}
+                       for name, count in zip(self.columns['groups'], counts)},
+            'total_nodes': len(self),
+            'total_groups': len(self.columns['groups']),
+            'offset': offset,
+            'limit': limit
+        }
+
+
+def normalized_inventory(file_path, file_format):
+    """The NormalizedInventory for an uploaded file, parsing the file only when no current copy exists"""
+    normalized_path = file_path + NormalizedInventory.SUFFIX
+    # Taken before parsing, so a write during the parse leaves a copy that fails the next check
+    stat = os.stat(file_path)
+    source = [stat.st_size, stat.st_mtime_ns]
+    try:
+        return NormalizedInventory.read(normalized_path, source)
+    except (OSError, ValueError, EOFError, TypeError):
+        pass  # Missing, stale, or written by an older version; parse again
+    inventory = NormalizedInventory.from_parsed(*load_inventory(file_path, file_format), source=source)
+    inventory.write(normalized_path)
+    return inventory
+
+
+def _default_node(name):
+    return {'name': name, 'hostname': name, 'username': 'root', 'port': 22}
+
+
+def _node_fields(host_vars):
+    """Node columns set by a host's inventory variables, or None if it sets none"""
+    if not isinstance(host_vars, dict):
+        return None
+    fields = {column: host_vars[var] for var, column in HOST_FIELDS if host_vars.get(var) not in (None, '')}
+    if 'port' in fields:
+        try:
+            fields['port'] = int(fields['port'])
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid ansible_port {fields['port']!r}")
+    return fields or None
+
+
+def _iter_ini(f):
+    kind = 'hosts'
+    group = None
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+
+        if line.startswith('['):
+            if not line.endswith(']'):
+                raise ValueError(f'line {line_number}: malformed section header')
+            name, _, suffix = line[1:-1].strip().partition(':')
+            kind = suffix or 'hosts'
+            group = None if name in ('all', 'ungrouped') else name
+            if group:
+                yield ('group', group)
+            continue
+
+        if kind == 'hosts':
+            if '"' in line or "'" in line:
+                try:
+                    parts = shlex.split(line, comments=True)
+                except ValueError as e:
+                    raise ValueError(f'line {line_number}: {e}')
+            else:
+                parts = line.split('#', 1)[0].split()  # shlex is far slower and rarely needed
+            host_vars = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+            yield ('host', parts[0], _node_fields(host_vars), group)
+        elif kind == 'children':
+            yield ('group', line.split()[0])
+        # [group:vars] sections carry no hosts
+
+
+class _Events:
+    """Cursor over a YAML event stream with one event of lookahead"""
+
+    def __init__(self, stream):
+        self.events = yaml.parse(stream, Loader=YamlLoader)
+        self.current = next(self.events, None)
+
+    def peek(self, *event_types):
+        return isinstance(self.current, event_types)
+
+    def next(self):
+        event = self.current
+        self.current = next(self.events, None)
+        return event
+
+    def expect(self, event_type):
+        if not self.peek(event_type):
+            raise ValueError(f'expected {event_type.__name__[:-5]}, found {type(self.current).__name__[:-5]}')
+        return self.next()
+
+    def scalar(self):
+        return str(self.expect(yaml.ScalarEvent).value)
+
+    def compose(self):
+        """Build the next node as plain Python values; used for one host's vars at a time"""
+        event = self.next()
+        if isinstance(event, yaml.ScalarEvent):
+            if event.implicit[0] and event.value in ('', '~', 'null', 'Null', 'NULL'):
+                return None
+            return event.value
+        if isinstance(event, yaml.SequenceStartEvent):
+            items = []
+            while not self.peek(yaml.SequenceEndEvent):
+                items.append(self.compose())
+            self.next()
+            return items
+        if isinstance(event, yaml.MappingStartEvent):
+            mapping = {}
+            while not self.peek(yaml.MappingEndEvent):
+                key = self.compose()
+                mapping[key if isinstance(key, str) else str(key)] = self.compose()
+            self.next()
+            return mapping
+        return None  # Aliases are not resolved
+
+    def skip(self):
+        depth = 0
+        while True:
+            event = self.next()
+            if isinstance(event, (yaml.SequenceStartEvent, yaml.MappingStartEvent)):
+                depth += 1
+            elif isinstance(event, (yaml.SequenceEndEvent, yaml.MappingEndEvent)):
+                depth -= 1
+            if depth == 0:
+                return
+
+
+def _iter_yaml(f):
+    """Walk YAML inventories and JSON in either the static or the dynamic inventory layout"""
+    events = _Events(f)
+    events.expect(yaml.StreamStartEvent)
+    if events.peek(yaml.StreamEndEvent):
+        return
+    events.expect(yaml.DocumentStartEvent)
+    if events.peek(yaml.ScalarEvent) and events.current.value == '':
+        return  # Empty document
+    events.expect(yaml.MappingStartEvent)
+
+    while not events.peek(yaml.MappingEndEvent):
+        name = events.scalar()
+        if name == '_meta':
+            yield from _yaml_hostvars(events)
+        else:
+            yield from _yaml_group(events, None if name == 'all' else name)
+    events.next()
+
+
+def _yaml_group(events, group):
+    if group:
+        yield ('group', group)
+
+    if events.peek(yaml.ScalarEvent):
+        events.next()  # Group with no body
+        return
+    if events.peek(yaml.SequenceStartEvent):
+        yield from _yaml_host_list(events, group)  # Dynamic inventory shorthand: a bare host list
+        return
+
+    events.expect(yaml.MappingStartEvent)
+    while not events.peek(yaml.MappingEndEvent):
+        key = events.scalar()
+        if key == 'hosts' and events.peek(yaml.MappingStartEvent):
+            events.next()
+            while not events.peek(yaml.MappingEndEvent):
+                host = events.scalar()
+                yield ('host', host, _node_fields(events.compose()), group)
+            events.next()
+        elif key == 'hosts' and events.peek(yaml.SequenceStartEvent):
+            yield from _yaml_host_list(events, group)
+        elif key == 'children' and events.peek(yaml.MappingStartEvent):
+            events.next()
+            while not events.peek(yaml.MappingEndEvent):
+                yield from _yaml_group(events, events.scalar())
+            events.next()
+        elif key == 'children' and events.peek(yaml.SequenceStartEvent):
+            events.next()
+            while not events.peek(yaml.SequenceEndEvent):
+                yield ('group', events.scalar())
+            events.next()
+        else:
+            events.skip()
+    events.next()
+
+
+def _yaml_host_list(events, group):
+    events.expect(yaml.SequenceStartEvent)
+    while not events.peek(yaml.SequenceEndEvent):
+        yield ('host', events.scalar(), None, group)
+    events.next()
+
+
+def _yaml_hostvars(events):
+    """Dynamic inventory _meta.hostvars: connection settings for hosts listed in groups"""
+    events.expect(yaml.MappingStartEvent)
+    while not events.peek(yaml.MappingEndEvent):
+        if events.scalar() == 'hostvars' and events.peek(yaml.MappingStartEvent):
+            events.next()
+            while not events.peek(yaml.MappingEndEvent):
+                host = events.scalar()
+                yield ('host', host, _node_fields(events.compose()), None)
+            events.next()
+        else:
+            events.skip()
+    events.next()
@@ -0,0 +1,211 @@
+import hashlib
+from datetime import datetime
+from models import db, Node, NodeGroup, InventoryImport, node_group_members
+from importer import BulkImporter, _chunks
+
+# Node columns an inventory sync keeps in step with the file; hosts are matched by hostname
+SYNC_FIELDS = ('name', 'username', 'port')
+
+NODE_COLUMNS = tuple(Node.__table__.columns)
+DATETIME_COLUMNS = {column.name for column in NODE_COLUMNS if isinstance(column.type, db.DateTime)}
+
+
+def _row_hash(row):
+    return hashlib.sha1('\x1f'.join(str(row[field]) for field in SYNC_FIELDS).encode()).hexdigest()
+
+
+def source_import_ids(filename):
+    """IDs of the imports and syncs of an inventory file whose nodes a new sync of it manages"""
+    return [row.id for row in db.session.query(InventoryImport.id).filter(
+        InventoryImport.filename == filename, InventoryImport.status != 'rolled_back')]
+
+
+def compute_diff(nodes_data, groups_data, owner_import_ids=()):
+    """Compare parsed inventory against the database, treating the file as the source of truth.
+
+    Hosts are matched by hostname and compared by a hash of their synced
+    columns. Nodes missing from the file are removed only if one of
+    owner_import_ids created them; nodes added by hand or from other files
+    are left alone. Memberships are only reconciled for groups the file
+    mentions; other groups are left alone.
+    """
+    owners = set(owner_import_ids)
+    wanted = {}
+    for node_info in nodes_data:
+        node = {'hostname': node_info['hostname'], 'name': node_info['name'],
+                'username': node_info.get('username', 'root'), 'port': node_info.get('port', 22),
+                'groups': node_info.get('groups', [])}
+        wanted.setdefault(node['hostname'], node)
+
+    current = {}
+    duplicates = set()
+    owned = set()
+    for row in db.session.query(Node.id, Node.hostname, Node.name, Node.username, Node.port, Node.import_id) \
+            .order_by(Node.id):
+        if row.hostname in current:
+            duplicates.add(row.id)  # Only the oldest node per hostname takes part in the sync
+            continue
+        current[row.hostname] = {field: getattr(row, field) for field in ('id', 'hostname') + SYNC_FIELDS}
+        if row.import_id in owners:
+            owned.add(row.hostname)
+
+    diff = {'added': [], 'changed': [], 'removed': [], 'groups_added': [],
+            'memberships_added': [], 'memberships_removed': []}
+
+    for hostname, node in wanted.items():
+        existing = current.get(hostname)
+        if existing is None:
+            diff['added'].append(node)
+        elif _row_hash(existing) != _row_hash(node):
+            diff['changed'].append({
+                'id': existing['id'],
+                'hostname': hostname,
+                'before': {field: existing[field] for field in SYNC_FIELDS},
+                'after': {field: node[field] for field in SYNC_FIELDS}
+            })
+
+    diff['removed'] = [existing for hostname, existing in current.items()
+                       if hostname not in wanted and hostname in owned]
+
+    group_names = list(groups_data)
+    existing_groups = dict(db.session.query(NodeGroup.name, NodeGroup.id).filter(NodeGroup.name.in_(group_names))) \
+        if group_names else {}
+    diff['groups_added'] = [name for name in group_names if name not in existing_groups]
+
+    current_pairs = set()
+    if existing_groups:
+        current_pairs = set(db.session.query(node_group_members.c.node_id, node_group_members.c.group_id)
+                            .filter(node_group_members.c.group_id.in_(existing_groups.values())))
+
+    wanted_pairs = set()
+    for hostname, node in wanted.items():
+        existing = current.get(hostname)
+        if existing is None:
+            continue  # New nodes get their memberships when inserted
+        for group_name in node['groups']:
+            if group_name in existing_groups:
+                pair = (existing['id'], existing_groups[group_name])
+                wanted_pairs.add(pair)
+                if pair not in current_pairs:
+                    diff['memberships_added'].append({'node_id': pair[0], 'group_id': pair[1],
+                                                      'hostname': hostname, 'group': group_name})
+            else:
+                diff['memberships_added'].append({'node_id': existing['id'], 'group_id': None,
+                                                  'hostname': hostname, 'group': group_name})
+
+    removed_ids = {node['id'] for node in diff['removed']}
+    group_name_by_id = {group_id: name for name, group_id in existing_groups.items()}
+    diff['memberships_removed'] = [
+        {'node_id': node_id, 'group_id': group_id, 'group': group_name_by_id[group_id]}
+        for node_id, group_id in sorted(current_pairs - wanted_pairs)
+        if node_id not in removed_ids and node_id not in duplicates
+    ]
+    return diff
+
+
+def diff_preview(diff, offset=0, limit=100):
+    """Counts for every kind of change plus one page of each list"""
+    return {
+        'sync': True,
+        'totals': {key: len(rows) for key, rows in diff.items()},
+        **{key: rows[offset:offset + limit] for key, rows in diff.items()},
+        'offset': offset,
+        'limit': limit
+    }
+
+
+def _snapshot_nodes(node_ids, batch_size):
+    """Every column of the given nodes, JSON-serializable so the delta can be stored"""
+    rows = []
+    for chunk in _chunks(node_ids, batch_size):
+        for row in db.session.execute(db.select(*NODE_COLUMNS).where(Node.id.in_(chunk))):
+            rows.append({name: value.isoformat() if name in DATETIME_COLUMNS and value else value
+                         for name, value in row._mapping.items()})
+    return rows
+
+
+def _restore_rows(rows):
+    """Inverse of _snapshot_nodes: parse datetimes back so rows can be written"""
+    return [{name: datetime.fromisoformat(value) if name in DATETIME_COLUMNS and value else value
+             for name, value in row.items()} for row in rows]
+
+
+def apply_diff(diff, description, import_id, batch_size=1000):
+    """Apply a diff with bulk statements and return the delta needed to revert it; the caller commits"""
+    importer = BulkImporter(description, import_id, batch_size)
+    importer.import_groups(diff['groups_added'])
+
+    # Changed and removed nodes are captured in full, removed ones with their memberships,
+    # so rollback restores status, connection overrides, import ownership and timestamps too
+    changed_nodes = _snapshot_nodes([change['id'] for change in diff['changed']], batch_size)
+    removed_ids = [node['id'] for node in diff['removed']]
+    removed_nodes = _snapshot_nodes(removed_ids, batch_size)
+    removed_memberships = []
+    for chunk in _chunks(removed_ids, batch_size):
+        removed_memberships.extend(
+            [node_id, group_id] for node_id, group_id in
+            db.session.query(node_group_members.c.node_id, node_group_members.c.group_id)
+            .filter(node_group_members.c.node_id.in_(chunk))
+        )
+        db.session.execute(node_group_members.delete().where(node_group_members.c.node_id.in_(chunk)))
+        db.session.execute(db.delete(Node).where(Node.id.in_(chunk)))
+
+    if diff['changed']:
+        db.session.execute(db.update(Node), [dict(change['after'], id=change['id']) for change in diff['changed']])
+
+    memberships_added = [
+        [m['node_id'], m['group_id'] if m['group_id'] is not None else importer.group_ids[m['group']]]
+        for m in diff['memberships_added']
+    ]
+    for chunk in _chunks(memberships_added, batch_size):
+        db.session.execute(node_group_members.insert(), [{'node_id': n, 'group_id': g} for n, g in chunk])
+
+    memberships_removed = [[m['node_id'], m['group_id']] for m in diff['memberships_removed']]
+    for chunk in _chunks(memberships_removed, batch_size):
+        db.session.execute(node_group_members.delete().where(
+            db.tuple_(node_group_members.c.node_id, node_group_members.c.group_id).in_([tuple(pair) for pair in chunk])))
+
+    importer.import_nodes(diff['added'])
+
+    return {
+        'changed': [{'id': node['id'], 'before': node} for node in changed_nodes],
+        'removed': removed_nodes,
+        'removed_memberships': removed_memberships,
+        'memberships_added': memberships_added,
+        'memberships_removed': memberships_removed
+    }
+
+
+def revert_delta(delta, import_id, batch_size=1000):
+    """Undo an applied sync: drop what it created and restore what it changed or removed"""
+    created_nodes = db.select(Node.id).where(Node.import_id == import_id)
+    created_groups = db.select(NodeGroup.id).where(NodeGroup.import_id == import_id)
+    db.session.execute(node_group_members.delete().where(db.or_(
+        node_group_members.c.node_id.in_(created_nodes),
+        node_group_members.c.group_id.in_(created_groups)
+    )))
+    db.session.execute(db.delete(Node).where(Node.import_id == import_id))
+
+    for chunk in _chunks(delta['memberships_added'], batch_size):
+        db.session.execute(node_group_members.delete().where(
+            db.tuple_(node_group_members.c.node_id, node_group_members.c.group_id).in_([tuple(pair) for pair in chunk])))
+    db.session.execute(db.delete(NodeGroup).where(NodeGroup.import_id == import_id))
+
+    # Core statements, so updated_at is restored rather than bumped by the ORM's onupdate
+    changed = _restore_rows([dict(change['before'], id=change['id']) for change in delta['changed']])
+    if changed:
+        restore_node = db.update(Node.__table__).where(Node.id == db.bindparam('b_id')) \
+            .values({name: db.bindparam(f'b_{name}') for name in changed[0] if name != 'id'})
+        for chunk in _chunks(changed, batch_size):
+            db.session.execute(restore_node, [{f'b_{name}': value for name, value in row.items()} for row in chunk])
+
+    for chunk in _chunks(_restore_rows(delta['removed']), batch_size):
+        db.session.execute(Node.__table__.insert(), chunk)
+
+    # Memberships only come back where both ends still exist
+    restore = delta['memberships_removed'] + delta['removed_memberships']
+    if restore:
+        group_ids = {row.id for row in db.session.query(NodeGroup.id)}
+        rows = [{'node_id': n, 'group_id': g} for n, g in restore if g in group_ids]
+        for chunk in _chunks(rows, batch_size):
+            db.session.execute(node_group_members.insert(), chunk)
@@ -0,0 +1,302 @@
+"""Versioned schema migrations, applied in order at startup.
+
+Each migration runs in its own transaction and is recorded in the
+schema_migration table. Migrations are written to be safe on databases that
+already have part of the schema: deployments that predate this module were
+built with create_all. A fresh database gets the tables as they stood when
+migrations were introduced from the first one, and the rest from later ones.
+Run `python migrations.py` to apply pending migrations by hand.
+"""
+from datetime import datetime
+from sqlalchemy import inspect, text
+from models import db
+
+# Arbitrary constant shared by every process that migrates this database
+ADVISORY_LOCK_KEY = 724_311_019
+
+schema_migration = db.Table(
+    'schema_migration', db.MetaData(),
+    db.Column('version', db.Integer, primary_key=True),
+    db.Column('name', db.String(100), nullable=False),
+    db.Column('applied_at', db.DateTime, nullable=False)
+)
+
+MIGRATIONS = []
+
+# Tables as the migrations that create them first shipped. These are frozen copies,
+# not the models: later model changes must come with a new migration instead.
+# Defaults live in the models (applied by the ORM on insert), so none are needed here.
+initial_schema_tables = db.MetaData()
+
+db.Table(
+    'user', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('username', db.String(80), unique=True, nullable=False),
+    db.Column('email', db.String(120), unique=True, nullable=False),
+    db.Column('password_hash', db.String(128)),
+    db.Column('is_admin', db.Boolean),
+    db.Column('created_at', db.DateTime),
+    db.Column('last_login', db.DateTime)
+)
+
+db.Table(
+    'inventory_import', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('filename', db.String(255), nullable=False),
+    db.Column('file_path', db.String(500), nullable=False),
+    db.Column('format', db.String(20), nullable=False),
+    db.Column('total_nodes', db.Integer),
+    db.Column('total_groups', db.Integer),
+    db.Column('status', db.String(20)),
+    db.Column('mode', db.String(20), nullable=False),
+    db.Column('sync_delta', db.JSON),
+    db.Column('processed_nodes', db.Integer, nullable=False),
+    db.Column('progress_total', db.Integer, nullable=False),
+    db.Column('heartbeat_at', db.DateTime),
+    db.Column('created_at', db.DateTime),
+    db.Column('imported_at', db.DateTime),
+    db.Column('rolled_back_at', db.DateTime),
+    db.Column('created_nodes', db.JSON),
+    db.Column('created_groups', db.JSON),
+    db.Column('error_message', db.Text),
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
+    db.Index('ix_inventory_import_created_at', 'created_at'),
+    db.Index('ix_inventory_import_status_heartbeat', 'status', 'heartbeat_at')
+)
+
+db.Table(
+    'node', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('name', db.String(100), nullable=False),
+    db.Column('hostname', db.String(255), nullable=False),
+    db.Column('username', db.String(100), nullable=False),
+    db.Column('port', db.Integer),
+    db.Column('description', db.Text),
+    db.Column('status', db.String(20)),
+    db.Column('last_checked', db.DateTime),
+    db.Column('latency_ms', db.Float),
+    db.Column('import_id', db.Integer, db.ForeignKey('inventory_import.id')),
+    db.Column('created_at', db.DateTime),
+    db.Column('updated_at', db.DateTime),
+    db.Index('ix_node_hostname', 'hostname'),
+    db.Index('ix_node_import_id', 'import_id')
+)
+
+db.Table(
+    'node_group', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('name', db.String(100), nullable=False, unique=True),
+    db.Column('description', db.Text),
+    db.Column('import_id', db.Integer, db.ForeignKey('inventory_import.id')),
+    db.Column('created_at', db.DateTime),
+    db.Column('updated_at', db.DateTime),
+    db.Index('ix_node_group_import_id', 'import_id')
+)
+
+db.Table(
+    'node_group_members', initial_schema_tables,
+    db.Column('node_id', db.Integer, db.ForeignKey('node.id'), primary_key=True),
+    db.Column('group_id', db.Integer, db.ForeignKey('node_group.id'), primary_key=True),
+    db.Index('ix_node_group_members_group_id', 'group_id', 'node_id')
+)
+
+db.Table(
+    'playbook_execution', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('playbooks', db.JSON, nullable=False),
+    db.Column('target_nodes', db.JSON),
+    db.Column('target_groups', db.JSON),
+    db.Column('mode', db.String(20), nullable=False),
+    db.Column('dependencies', db.JSON),
+    db.Column('playbook_results', db.JSON),
+    db.Column('shard_count', db.Integer, nullable=False),
+    db.Column('batch_size', db.Integer),
+    db.Column('max_fail_percentage', db.Float),
+    db.Column('status', db.String(20)),
+    db.Column('priority', db.Integer, nullable=False),
+    db.Column('queued_at', db.DateTime),
+    db.Column('started_at', db.DateTime),
+    db.Column('completed_at', db.DateTime),
+    db.Column('output', db.Text),
+    db.Column('error_output', db.Text),
+    db.Column('log_size', db.Integer, nullable=False),
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
+    db.Index('ix_playbook_execution_started', 'started_at', 'id'),
+    db.Index('ix_playbook_execution_status_started', 'status', 'started_at'),
+    db.Index('ix_playbook_execution_user_started', 'user_id', 'started_at'),
+    db.Index('ix_playbook_execution_queue', 'status', 'priority', 'queued_at')
+)
+
+db.Table(
+    'execution_log_chunk', initial_schema_tables,
+    db.Column('id', db.Integer, primary_key=True),
+    db.Column('execution_id', db.Integer, db.ForeignKey('playbook_execution.id'), nullable=False),
+    db.Column('seq', db.Integer, nullable=False),
+    db.Column('start_offset', db.Integer, nullable=False),
+    db.Column('length', db.Integer, nullable=False),
+    db.Column('content', db.Text, nullable=False),
+    db.Column('created_at', db.DateTime),
+    db.UniqueConstraint('execution_id', 'seq'),
+    db.Index('ix_execution_log_chunk_offset', 'execution_id', 'start_offset')
+)
+
+db.Table(
+    'collection_version', initial_schema_tables,
+    db.Column('name', db.String(50), primary_key=True),
+    db.Column('version', db.Integer, nullable=False)
+)
+
+playbook_syntax_check_table = db.Table(
+    'playbook_syntax_check', db.MetaData(),
+    db.Column('content_hash', db.String(64), primary_key=True),
+    db.Column('status', db.String(20), nullable=False),
+    db.Column('error', db.Text),
+    db.Column('checked_at', db.DateTime)
+)
+
+
+def migration(version, name):
+    def register(func):
+        MIGRATIONS.append((version, name, func))
+        return func
+    return register
+
+
+def _add_column(conn, table, name, column_type, default=None, references=None):
+    """ALTER TABLE ... ADD COLUMN unless the column is already there"""
+    if name in {column['name'] for column in inspect(conn).get_columns(table)}:
+        return
+    ddl = f'ALTER TABLE {table} ADD COLUMN {name} {column_type.compile(dialect=conn.dialect)}'
+    if default is not None:
+        ddl += f' NOT NULL DEFAULT {default}'
+    if references:
+        ddl += f' REFERENCES {references}'
+    conn.execute(text(ddl))
+
+
+def _create_index(conn, name, table, *columns):
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+@migration(1, 'initial_schema')
+def initial_schema(conn):
+    # Creates only what is missing, so pre-migration databases keep their data
+    initial_schema_tables.create_all(bind=conn, checkfirst=True)
+
+
+@migration(2, 'execution_columns')
+def execution_columns(conn):
+    _add_column(conn, 'node', 'latency_ms', db.Float())
+    _add_column(conn, 'playbook_execution', 'mode', db.String(20), default="'sequential'")
+    _add_column(conn, 'playbook_execution', 'dependencies', db.JSON())
+    _add_column(conn, 'playbook_execution', 'playbook_results', db.JSON())
+    _add_column(conn, 'playbook_execution', 'shard_count', db.Integer(), default=1)
+    _add_column(conn, 'playbook_execution', 'batch_size', db.Integer())
+    _add_column(conn, 'playbook_execution', 'max_fail_percentage', db.Float())
+    _add_column(conn, 'playbook_execution', 'priority', db.Integer(), default=0)
+    _add_column(conn, 'playbook_execution', 'queued_at', db.DateTime())
+    _add_column(conn, 'playbook_execution', 'log_size', db.Integer(), default=0)
+    conn.execute(text('UPDATE playbook_execution SET queued_at = started_at WHERE queued_at IS NULL'))
+
+
+@migration(3, 'inventory_import_columns')
+def inventory_import_columns(conn):
+    _add_column(conn, 'node', 'import_id', db.Integer(), references='inventory_import (id)')
+    _add_column(conn, 'node_group', 'import_id', db.Integer(), references='inventory_import (id)')
+    _add_column(conn, 'inventory_import', 'mode', db.String(20), default="'import'")
+    _add_column(conn, 'inventory_import', 'sync_delta', db.JSON())
+    _add_column(conn, 'inventory_import', 'processed_nodes', db.Integer(), default=0)
+    _add_column(conn, 'inventory_import', 'progress_total', db.Integer(), default=0)
+    _add_column(conn, 'inventory_import', 'heartbeat_at', db.DateTime())
+
+
+@migration(4, 'query_indexes')
+def query_indexes(conn):
+    # Import matching and sync diffs look nodes up by hostname; rollback finds rows by import
+    _create_index(conn, 'ix_node_hostname', 'node', 'hostname')
+    _create_index(conn, 'ix_node_import_id', 'node', 'import_id')
+    _create_index(conn, 'ix_node_group_import_id', 'node_group', 'import_id')
+    # The membership primary key leads with node_id; group-side lookups need their own index
+    _create_index(conn, 'ix_node_group_members_group_id', 'node_group_members', 'group_id', 'node_id')
+    # Execution history listing, its filters and the scheduler's pending queue
+    _create_index(conn, 'ix_playbook_execution_started', 'playbook_execution', 'started_at', 'id')
+    _create_index(conn, 'ix_playbook_execution_status_started', 'playbook_execution', 'status', 'started_at')
+    _create_index(conn, 'ix_playbook_execution_user_started', 'playbook_execution', 'user_id', 'started_at')
+    _create_index(conn, 'ix_playbook_execution_queue', 'playbook_execution', 'status', 'priority', 'queued_at')
+    _create_index(conn, 'ix_execution_log_chunk_offset', 'execution_log_chunk', 'execution_id', 'start_offset')
+    # Import history listing and the stale-job watcher
+    _create_index(conn, 'ix_inventory_import_created_at', 'inventory_import', 'created_at')
+    _create_index(conn, 'ix_inventory_import_status_heartbeat', 'inventory_import', 'status', 'heartbeat_at')
+
+
+@migration(5, 'playbook_syntax_check')
+def playbook_syntax_check(conn):
+    playbook_syntax_check_table.create(bind=conn, checkfirst=True)
+
+
+@migration(6, 'node_connection_overrides')
+def node_connection_overrides(conn):
+    _add_column(conn, 'node', 'ssh_pipelining', db.Boolean())
+    _add_column(conn, 'node', 'ssh_control_persist', db.Integer())
+    _add_column(conn, 'node', 'ssh_extra_args', db.String(500))
+
+
+@migration(7, 'execution_heartbeat')
+def execution_heartbeat(conn):
+    _add_column(conn, 'playbook_execution', 'heartbeat_at', db.DateTime())
+    # started_at used to default to the creation time; queued rows have not started
+    conn.execute(text("UPDATE playbook_execution SET started_at = NULL WHERE status = 'pending'"))
+    # History is listed by queued_at, which unlike started_at is set on every row
+    _create_index(conn, 'ix_playbook_execution_queued', 'playbook_execution', 'queued_at', 'id')
+    _create_index(conn, 'ix_playbook_execution_status_queued', 'playbook_execution', 'status', 'queued_at')
+    _create_index(conn, 'ix_playbook_execution_user_queued', 'playbook_execution', 'user_id', 'queued_at')
+    conn.execute(text('DROP INDEX IF EXISTS ix_playbook_execution_started'))
+    conn.execute(text('DROP INDEX IF EXISTS ix_playbook_execution_status_started'))
+
+
+def applied_versions(conn):
+    return {row.version for row in conn.execute(db.select(schema_migration.c.version))}
+
+
+def run_migrations(engine):
+    """Apply pending migrations and return the names of those applied.
+
+    On PostgreSQL an advisory lock keeps concurrently starting web and worker
+    processes from migrating at the same time.
+    """
+    applied = []
+    with engine.connect() as conn:
+        locked = conn.dialect.name == 'postgresql'
+        if locked:
+            conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            conn.commit()
+        try:
+            schema_migration.create(conn, checkfirst=True)
+            conn.commit()
+            done = applied_versions(conn)
+            conn.commit()
+            for version, name, func in sorted(MIGRATIONS, key=lambda m: m[0]):
+                if version in done:
+                    continue
+                with conn.begin():
+                    func(conn)
+                    conn.execute(schema_migration.insert().values(
+                        version=version, name=name, applied_at=datetime.utcnow()))
+                applied.append(name)
+        finally:
+            if locked:
+                conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                conn.commit()
+    return applied
+
+
+if __name__ == '__main__':
+    from flask import Flask
+    from config import config
+
+    app = Flask(__name__)
+    app.config.from_object(config['default'])
+    db.init_app(app)
+    with app.app_context():
+        names = run_migrations(db.engine)
+    print('Applied: ' + ', '.join(names) if names else 'Schema is up to date')
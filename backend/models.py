@@ -8,7 +8,8 @@ db = SQLAlchemy()
 # Association table for many-to-many relationship between nodes and groups
 node_group_members = db.Table('node_group_members',
     db.Column('node_id', db.Integer, db.ForeignKey('node.id'), primary_key=True),
-    db.Column('group_id', db.Integer, db.ForeignKey('node_group.id'), primary_key=True)
+    db.Column('group_id', db.Integer, db.ForeignKey('node_group.id'), primary_key=True),
+    db.Index('ix_node_group_members_group_id', 'group_id', 'node_id')
 )
 
 class User(db.Model):
@@ -39,12 +40,18 @@ class User(db.Model):
 class Node(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    hostname = db.Column(db.String(255), nullable=False)
+    hostname = db.Column(db.String(255), nullable=False, index=True)
     username = db.Column(db.String(100), nullable=False)
     port = db.Column(db.Integer, default=22)
     description = db.Column(db.Text)
     status = db.Column(db.String(20), default='unknown')  # reachable, unreachable, unknown
     last_checked = db.Column(db.DateTime)
+    latency_ms = db.Column(db.Float)  # SSH banner round trip from the last probe
+    # Connection profile overrides; NULL uses the SSH_* defaults
+    ssh_pipelining = db.Column(db.Boolean)
+    ssh_control_persist = db.Column(db.Integer)  # Seconds, 0 disables multiplexing
+    ssh_extra_args = db.Column(db.String(500))
+    import_id = db.Column(db.Integer, db.ForeignKey('inventory_import.id'), nullable=True, index=True)  # Creating import
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -52,7 +59,10 @@ class Node(db.Model):
     groups = db.relationship('NodeGroup', secondary=node_group_members, 
                            back_populates='nodes', lazy='dynamic')
 
-    def to_dict(self):
+    def to_dict(self, groups=None):
+        """Serialize the node; pass preloaded group names to avoid a membership query"""
+        if groups is None:
+            groups = [g.name for g in self.groups]
         return {
             'id': self.id,
             'name': self.name,
@@ -62,15 +72,20 @@ class Node(db.Model):
             'description': self.description,
             'status': self.status,
             'last_checked': self.last_checked.isoformat() if self.last_checked else None,
+            'latency_ms': self.latency_ms,
+            'ssh_pipelining': self.ssh_pipelining,
+            'ssh_control_persist': self.ssh_control_persist,
+            'ssh_extra_args': self.ssh_extra_args,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'groups': [g.name for g in self.groups]
+            'groups': groups
         }
 
 class NodeGroup(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
     description = db.Column(db.Text)
+    import_id = db.Column(db.Integer, db.ForeignKey('inventory_import.id'), nullable=True, index=True)  # Creating import
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
@@ -78,15 +93,18 @@ class NodeGroup(db.Model):
     nodes = db.relationship('Node', secondary=node_group_members, 
                           back_populates='groups', lazy='dynamic')
 
-    def to_dict(self):
+    def to_dict(self, nodes=None):
+        """Serialize the group; pass preloaded member dicts to avoid per-node queries"""
+        if nodes is None:
+            nodes = [n.to_dict() for n in self.nodes]
         return {
             'id': self.id,
             'name': self.name,
             'description': self.description,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'node_count': self.nodes.count(),
-            'nodes': [n.to_dict() for n in self.nodes]
+            'node_count': len(nodes),
+            'nodes': nodes
         }
 
 class PlaybookExecution(db.Model):
@@ -94,27 +112,69 @@ class PlaybookExecution(db.Model):
     playbooks = db.Column(db.JSON, nullable=False)  # List of playbook names
     target_nodes = db.Column(db.JSON, nullable=True)  # List of node IDs
     target_groups = db.Column(db.JSON, nullable=True)  # List of group IDs
-    status = db.Column(db.String(20), default='pending')  # pending, running, completed, failed, cancelled
-    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    mode = db.Column(db.String(20), default='sequential', nullable=False)  # sequential, parallel
+    dependencies = db.Column(db.JSON, nullable=True)  # Parallel mode: playbook name -> names it waits for
+    playbook_results = db.Column(db.JSON, nullable=True)  # Playbook name -> status, timing and error
+    shard_count = db.Column(db.Integer, default=1, nullable=False)  # Parallel runner processes per batch
+    batch_size = db.Column(db.Integer, nullable=True)  # Hosts per rolling batch; None runs all hosts at once
+    max_fail_percentage = db.Column(db.Float, nullable=True)  # Abort later batches above this failure rate
+    status = db.Column(db.String(20), default='pending')  # pending, running, cancelling, completed, failed, cancelled
+    priority = db.Column(db.Integer, default=0, nullable=False)  # Higher runs first
+    queued_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)  # Set when the scheduler claims the execution
+    heartbeat_at = db.Column(db.DateTime)  # Last sign of life from the run; stale runs are reaped
     completed_at = db.Column(db.DateTime)
-    output = db.Column(db.Text)
+    output = db.Column(db.Text)  # Legacy single-blob output; new runs write ExecutionLogChunk rows
     error_output = db.Column(db.Text)
+    log_size = db.Column(db.Integer, default=0, nullable=False)  # Characters stored in log chunks
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     
+    # Evaluated in SQL so summaries can flag output without loading the text columns
+    has_output = db.column_property(db.or_(log_size > 0, output.isnot(None)))
+    has_errors = db.column_property(error_output.isnot(None))
+    
     user = db.relationship('User', backref='executions')
-
+    
+    __table_args__ = (
+        db.Index('ix_playbook_execution_queued', 'queued_at', 'id'),
+        db.Index('ix_playbook_execution_status_queued', 'status', 'queued_at'),
+        db.Index('ix_playbook_execution_user_queued', 'user_id', 'queued_at'),
+        db.Index('ix_playbook_execution_user_started', 'user_id', 'started_at'),
+        db.Index('ix_playbook_execution_queue', 'status', 'priority', 'queued_at'),
+    )
+    
     def to_dict(self):
+        data = self.to_summary_dict()
+        data['output'] = self.output
+        data['error_output'] = self.error_output
+        data['wait_time'] = self._get_wait_time()
+        return data
+    
+    def to_summary_dict(self):
+        """Listing representation; never touches the output text columns"""
         return {
             'id': self.id,
             'playbooks': self.playbooks,
             'target_nodes': self.target_nodes,
             'target_groups': self.target_groups,
+            'mode': self.mode,
+            'dependencies': self.dependencies,
+            'playbook_results': self.playbook_results,
+            'shard_count': self.shard_count,
+            'batch_size': self.batch_size,
+            'max_fail_percentage': self.max_fail_percentage,
             'status': self.status,
+            'priority': self.priority,
+            'queued_at': self.queued_at.isoformat() if self.queued_at else None,
             'started_at': self.started_at.isoformat() if self.started_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None,
-            'output': self.output,
-            'error_output': self.error_output,
-            'duration': self._get_duration()
+            'user_id': self.user_id,
+            'log_size': self.log_size,
+            'has_output': self.has_output,
+            'has_errors': self.has_errors,
+            'duration': self._get_duration(),
+            # Summaries are cached by ETag, so pending rows leave the running clock to the client
+            'wait_time': self._get_wait_time(live=False)
         }
     
     def _get_duration(self):
@@ -122,15 +182,90 @@ class PlaybookExecution(db.Model):
             delta = self.completed_at - self.started_at
             return str(delta)
         return None
+    
+    def _get_wait_time(self, live=True):
+        """Seconds spent queued; while pending this keeps counting unless live is False"""
+        if not self.queued_at:
+            return None
+        if self.status == 'pending':
+            if not live:
+                return None
+            end = datetime.utcnow()
+        elif self.started_at:
+            end = self.started_at
+        else:
+            return None
+        return max((end - self.queued_at).total_seconds(), 0)
+
+class ExecutionLogChunk(db.Model):
+    """Append-only slice of an execution's output, addressed by character offset"""
+    __table_args__ = (
+        db.UniqueConstraint('execution_id', 'seq'),
+        db.Index('ix_execution_log_chunk_offset', 'execution_id', 'start_offset'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    execution_id = db.Column(db.Integer, db.ForeignKey('playbook_execution.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    start_offset = db.Column(db.Integer, nullable=False)
+    length = db.Column(db.Integer, nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    @classmethod
+    def read(cls, execution_id, offset, limit):
+        """Return the text between offset and offset + limit, loading only overlapping chunks"""
+        end = offset + limit
+        chunks = cls.query.filter(
+            cls.execution_id == execution_id,
+            cls.start_offset < end,
+            cls.start_offset + cls.length > offset
+        ).order_by(cls.seq).all()
+        
+        parts = []
+        for chunk in chunks:
+            start = max(offset - chunk.start_offset, 0)
+            stop = min(end - chunk.start_offset, chunk.length)
+            parts.append(chunk.content[start:stop])
+        return ''.join(parts)
+
+class CollectionVersion(db.Model):
+    """Change counter per API collection, bumped in the same transaction as each mutation"""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+class PlaybookSyntaxCheck(db.Model):
+    """Result of `ansible-playbook --syntax-check` for one playbook content, keyed by its sha256"""
+    content_hash = db.Column(db.String(64), primary_key=True)
+    status = db.Column(db.String(20), nullable=False)  # valid, invalid
+    error = db.Column(db.Text)
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'status': self.status,
+            'error': self.error,
+            'checked_at': self.checked_at.isoformat() if self.checked_at else None
+        }
 
 class InventoryImport(db.Model):
+    __table_args__ = (
+        db.Index('ix_inventory_import_created_at', 'created_at'),
+        db.Index('ix_inventory_import_status_heartbeat', 'status', 'heartbeat_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(255), nullable=False)
     file_path = db.Column(db.String(500), nullable=False)
     format = db.Column(db.String(20), nullable=False)  # yaml, ini, json, paste
     total_nodes = db.Column(db.Integer, default=0)
     total_groups = db.Column(db.Integer, default=0)
-    status = db.Column(db.String(20), default='pending')  # pending, completed, failed, rolled_back
+    status = db.Column(db.String(20), default='pending')  # pending, running, completed, failed, rolled_back
+    mode = db.Column(db.String(20), default='import', nullable=False)  # import (add new hosts) or sync (apply a diff)
+    sync_delta = db.Column(db.JSON)  # What a sync changed, kept so rollback can reverse it
+    processed_nodes = db.Column(db.Integer, default=0, nullable=False)  # Checkpoint: parsed hosts already imported
+    progress_total = db.Column(db.Integer, default=0, nullable=False)  # Parsed hosts in the file
+    heartbeat_at = db.Column(db.DateTime)  # Last checkpoint of a running job; stale jobs are resumed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     imported_at = db.Column(db.DateTime)
     rolled_back_at = db.Column(db.DateTime)
@@ -149,6 +284,9 @@ class InventoryImport(db.Model):
             'total_nodes': self.total_nodes,
             'total_groups': self.total_groups,
             'status': self.status,
+            'mode': self.mode,
+            'processed_nodes': self.processed_nodes,
+            'progress_total': self.progress_total,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'imported_at': self.imported_at.isoformat() if self.imported_at else None,
             'rolled_back_at': self.rolled_back_at.isoformat() if self.rolled_back_at else None,
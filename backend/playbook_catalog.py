@@ -0,0 +1,250 @@
+import fcntl
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import yaml
+from playbook_validation import content_hash, load_yaml
+
+PLAYBOOK_EXTENSIONS = ('.yml', '.yaml')
+TASK_SECTIONS = ('pre_tasks', 'tasks', 'post_tasks', 'handlers')
+
+
+class PlaybookCatalog:
+    """In-memory index of the playbooks folder with parsed metadata per playbook.
+
+    A background thread rescans the folder every scan_interval seconds and
+    re-parses only files whose size or mtime changed; API writes refresh their
+    file immediately. Requests read an immutable snapshot, so listing and
+    filtering never touch the filesystem.
+    """
+
+    def __init__(self, folder, scan_interval=5, on_change=None):
+        self.folder = folder
+        self.scan_interval = scan_interval
+        self.on_change = on_change  # Called with (name, content hash) for new or changed content
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._snapshot = self._build_snapshot({})
+        self._thread = None
+
+    def start(self):
+        """Index the folder now and keep watching it in the background"""
+        self.scan()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._scan_loop, daemon=True)
+            self._thread.start()
+
+    @property
+    def fingerprint(self):
+        """Changes whenever any playbook is added, removed or modified; identical across processes"""
+        return self._snapshot['fingerprint']
+
+    def list(self, query=None, host=None, role=None):
+        """Playbooks sorted by name, optionally narrowed by a search term, host pattern or role"""
+        snapshot = self._snapshot
+        if host is None and role is None and not query:
+            return snapshot['entries']
+
+        names = None
+        if host is not None:
+            names = snapshot['by_host'].get(host, set())
+        if role is not None:
+            by_role = snapshot['by_role'].get(role, set())
+            names = by_role if names is None else names & by_role
+        entries = snapshot['entries'] if names is None else [e for e in snapshot['entries'] if e['name'] in names]
+        if query:
+            query = query.lower()
+            entries = [e for e in entries if query in snapshot['search_text'][e['name']]]
+        return entries
+
+    def get(self, name):
+        return self._snapshot['by_name'].get(name)
+
+    def current(self, name):
+        """Entry for a playbook, re-indexed first if the file changed since the last scan"""
+        entry = self.get(name)
+        try:
+            stat = os.stat(os.path.join(self.folder, name))
+        except FileNotFoundError:
+            if entry is not None:
+                self.refresh(name)
+            return None
+        if entry is None or (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            self.refresh(name)
+            entry = self.get(name)
+        return entry
+
+    def scan(self):
+        """Stat every playbook and re-parse the ones whose size or mtime changed"""
+        try:
+            files = {
+                entry.name: entry.stat()
+                for entry in os.scandir(self.folder)
+                if entry.name.endswith(PLAYBOOK_EXTENSIONS) and entry.is_file()
+            }
+        except FileNotFoundError:
+            files = {}
+
+        with self._lock:
+            entries = {}
+            for name, stat in files.items():
+                entry = self._entries.get(name)
+                if entry is None or (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+                    entry = self._index(name, stat, entry)
+                entries[name] = entry
+            if entries.keys() != self._entries.keys() or any(entries[n] is not self._entries[n] for n in entries):
+                self._publish(entries)
+
+    def refresh(self, name):
+        """Re-index one playbook after the API wrote or deleted it"""
+        path = os.path.join(self.folder, name)
+        with self._lock:
+            entries = dict(self._entries)
+            try:
+                entries[name] = self._index(name, os.stat(path), entries.get(name))
+            except FileNotFoundError:
+                entries.pop(name, None)
+            self._publish(entries)
+
+    def _scan_loop(self):
+        while True:
+            time.sleep(self.scan_interval)
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"Playbook catalog scan error: {e}")
+
+    def _publish(self, entries):
+        self._entries = entries
+        self._snapshot = self._build_snapshot(entries)
+
+    def _build_snapshot(self, entries):
+        ordered = [entries[name] for name in sorted(entries)]
+        by_host, by_role, search_text = {}, {}, {}
+        for entry in ordered:
+            for pattern in entry['hosts']:
+                by_host.setdefault(pattern, set()).add(entry['name'])
+            for role in entry['roles']:
+                by_role.setdefault(role, set()).add(entry['name'])
+            search_text[entry['name']] = ' '.join([entry['name']] + entry['play_names']).lower()
+        fingerprint = hashlib.sha1(''.join(e['name'] + e['hash'] for e in ordered).encode()).hexdigest()
+        return {
+            'entries': ordered,
+            'by_name': {entry['name']: entry for entry in ordered},
+            'by_host': by_host,
+            'by_role': by_role,
+            'search_text': search_text,
+            'fingerprint': fingerprint
+        }
+
+    def _index(self, name, stat, previous=None):
+        with open(os.path.join(self.folder, name), 'rb') as f:
+            content = f.read()
+        digest = content_hash(content)
+        if previous and previous['hash'] == digest:
+            # Touched but unchanged: keep the parsed metadata
+            return dict(previous, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                        modified=datetime.fromtimestamp(stat.st_mtime).isoformat())
+
+        entry = {
+            'name': name,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            'hash': digest,
+            'plays': 0,
+            'play_names': [],
+            'hosts': [],
+            'roles': [],
+            'task_count': 0,
+            'role_count': 0,
+            'error': None
+        }
+        try:
+            entry.update(parse_playbook(load_yaml(content)))
+        except (yaml.YAMLError, ValueError) as e:
+            entry['error'] = str(e)
+        if self.on_change and not entry['error']:
+            self.on_change(name, digest)
+        return entry
+
+    @staticmethod
+    def summary(entry):
+        """API representation, without internal bookkeeping"""
+        return {key: value for key, value in entry.items() if key != 'mtime_ns'}
+
+
+@contextmanager
+def write_lock(folder):
+    """Serialise playbook writes across threads and processes sharing the folder"""
+    with open(os.path.join(folder, '.write.lock'), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def atomic_write(path, data):
+    """Write bytes through a temp file and rename, so readers see the old or the new file, never a partial one"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def parse_playbook(document):
+    """Plays, target host patterns, roles and task counts of a parsed playbook"""
+    if document is None:
+        document = []
+    if not isinstance(document, list):
+        raise ValueError('a playbook must be a list of plays')
+
+    plays = [play for play in document if isinstance(play, dict) and 'hosts' in play]
+    hosts, roles = [], []
+    task_count = 0
+    for play in plays:
+        patterns = play['hosts']
+        if isinstance(patterns, str):
+            patterns = patterns.replace(',', ':').split(':')
+        for pattern in patterns or []:
+            pattern = str(pattern).strip()
+            if pattern and pattern not in hosts:
+                hosts.append(pattern)
+        for role in play.get('roles') or []:
+            role = role.get('role', role.get('name')) if isinstance(role, dict) else role
+            if role and str(role) not in roles:
+                roles.append(str(role))
+        for section in TASK_SECTIONS:
+            task_count += _count_tasks(play.get(section))
+
+    return {
+        'plays': len(plays),
+        'play_names': [str(play['name']) for play in plays if play.get('name')],
+        'hosts': hosts,
+        'roles': roles,
+        'task_count': task_count,
+        'role_count': len(roles)
+    }
+
+
+def _count_tasks(tasks):
+    """Tasks in a list, counting inside block/rescue/always rather than the block itself"""
+    count = 0
+    for task in tasks or []:
+        if not isinstance(task, dict):
+            continue
+        if 'block' in task:
+            count += sum(_count_tasks(task.get(section)) for section in ('block', 'rescue', 'always'))
+        else:
+            count += 1
+    return count
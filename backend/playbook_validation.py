@@ -0,0 +1,150 @@
+import hashlib
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import yaml
+from models import db, PlaybookSyntaxCheck
+from versioning import bump
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+_parsed = OrderedDict()
+_parsed_lock = threading.Lock()
+PARSE_CACHE_SIZE = 256
+
+
+def content_hash(content):
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
+
+
+def load_yaml(content):
+    """Parse YAML with the libyaml loader when available, caching the result by content hash.
+
+    Parse errors are cached too and raised again as yaml.YAMLError.
+    """
+    key = content_hash(content)
+    with _parsed_lock:
+        if key in _parsed:
+            _parsed.move_to_end(key)
+            document, error = _parsed[key]
+            if error:
+                raise yaml.YAMLError(error)
+            return document
+
+    try:
+        document, error = yaml.load(content, Loader=YamlLoader), None
+    except yaml.YAMLError as e:
+        document, error = None, str(e)
+
+    with _parsed_lock:
+        _parsed[key] = (document, error)
+        while len(_parsed) > PARSE_CACHE_SIZE:
+            _parsed.popitem(last=False)
+    if error:
+        raise yaml.YAMLError(error)
+    return document
+
+
+class SyntaxChecker:
+    """Runs `ansible-playbook --syntax-check` in a small worker pool and stores results by content hash.
+
+    Results live in the database, so every process shares them. A 'valid'
+    result is final for its content; an 'invalid' one may come from the
+    environment (a role or collection not installed yet), so it is checked
+    again once it is older than invalid_ttl seconds. A check whose file
+    changed while it ran is discarded; the change submits a check of its own.
+    """
+
+    def __init__(self, app, folder, workers=2, timeout=60, invalid_ttl=300):
+        self.app = app
+        self.folder = folder
+        self.timeout = timeout
+        self.invalid_ttl = timedelta(seconds=invalid_ttl)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='syntax-check')
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def submit(self, name, expected_hash):
+        """Queue a check of a playbook unless its content has a current result or is being checked"""
+        with self._lock:
+            if expected_hash in self._in_flight:
+                return
+            self._in_flight.add(expected_hash)
+        self._executor.submit(self._check_in_context, name, expected_hash)
+
+    def results(self, hashes):
+        """Stored results for these content hashes, as {hash: {'status', 'error', 'checked_at'}}"""
+        hashes = list(hashes)
+        if not hashes:
+            return {}
+        return {
+            row.content_hash: row.to_dict()
+            for row in PlaybookSyntaxCheck.query.filter(PlaybookSyntaxCheck.content_hash.in_(hashes))
+        }
+
+    def status(self, expected_hash, name=None):
+        """Result for one content hash; given the playbook name, an expired 'invalid' result is checked again"""
+        row = PlaybookSyntaxCheck.query.get(expected_hash)
+        if row is not None and not (name and self._expired(row)):
+            return row.to_dict()
+        if row is not None:
+            self.submit(name, expected_hash)
+        with self._lock:
+            pending = expected_hash in self._in_flight
+        return {'status': 'pending' if pending else 'unchecked', 'error': None, 'checked_at': None}
+
+    def _check_in_context(self, name, expected_hash):
+        try:
+            with self.app.app_context():
+                row = PlaybookSyntaxCheck.query.get(expected_hash)
+                if row is None or self._expired(row):
+                    self._check(name, expected_hash)
+        except Exception as e:
+            print(f"Syntax check of {name} failed to run: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard(expected_hash)
+
+    def _check(self, name, expected_hash):
+        path = os.path.join(self.folder, name)
+        if self._file_hash(path) != expected_hash:
+            return
+
+        result = subprocess.run(
+            ['ansible-playbook', '--syntax-check', '-i', 'localhost,', path],
+            capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=self.timeout,
+            cwd=self.folder
+        )
+        if self._file_hash(path) != expected_hash:
+            return  # Edited while checking; the result belongs to neither version
+
+        error = None
+        if result.returncode != 0:
+            error = (result.stderr.strip() or result.stdout.strip())[-4000:]
+        db.session.merge(PlaybookSyntaxCheck(
+            content_hash=expected_hash,
+            status='invalid' if error else 'valid',
+            error=error,
+            checked_at=datetime.utcnow()
+        ))
+        bump('playbooks')
+        db.session.commit()
+
+    def _expired(self, row):
+        return row.status == 'invalid' and row.checked_at < datetime.utcnow() - self.invalid_ttl
+
+    @staticmethod
+    def _file_hash(path):
+        try:
+            with open(path, 'rb') as f:
+                return content_hash(f.read())
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import groupby
+import redis
+from models import db, PlaybookExecution
+from versioning import bump
+
+
+class ExecutionScheduler:
+    """Dispatches pending executions under a global and a per-user concurrency cap.
+
+    Pending executions are served highest priority first. Within a priority
+    level, users take turns so a single user's burst cannot starve everyone else.
+    All scheduling state lives in the database, and when several processes run a
+    scheduler a Redis lock makes their dispatch passes take turns.
+
+    A running or cancelling execution holds its slot until its run exits. Runs
+    send heartbeats; one whose process died stops sending them and is failed
+    after EXECUTION_STALE_AFTER seconds, releasing the slot.
+    """
+
+    ACTIVE_STATUSES = ('running', 'cancelling')
+
+    def __init__(self, app, runner):
+        self.app = app
+        self.runner = runner
+        self.max_concurrent = app.config['EXECUTION_MAX_CONCURRENT']
+        self.max_per_user = app.config['EXECUTION_MAX_PER_USER']
+        self.poll_interval = app.config['EXECUTION_POLL_INTERVAL']
+        self.stale_after = timedelta(seconds=app.config['EXECUTION_STALE_AFTER'])
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.redis = None
+        if app.config['SOCKETIO_MESSAGE_QUEUE']:
+            self.redis = redis.Redis.from_url(app.config['REDIS_URL'])
+
+    WAKEUP_CHANNEL = 'scheduler:wakeup'
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self._thread.start()
+            if self.redis is not None:
+                threading.Thread(target=self._listen_for_wakeups, daemon=True).start()
+
+    def notify(self, *args):
+        """Wake the dispatcher after a submission, cancellation or completion"""
+        self._wakeup.set()
+        if self.redis is not None:
+            try:
+                self.redis.publish(self.WAKEUP_CHANNEL, 1)
+            except redis.RedisError:
+                pass  # The dispatcher still polls
+
+    def _listen_for_wakeups(self):
+        """Relay notifications published by other processes to this dispatcher"""
+        while True:
+            try:
+                pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.WAKEUP_CHANNEL)
+                for _ in pubsub.listen():
+                    self._wakeup.set()
+            except redis.RedisError as e:
+                print(f"Execution scheduler wakeup listener error: {e}")
+                time.sleep(self.poll_interval)
+
+    def _dispatch_loop(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                with self.app.app_context():
+                    self._locked_dispatch()
+            except Exception as e:
+                print(f"Execution scheduler error: {e}")
+
+    def _locked_dispatch(self):
+        if self.redis is None:
+            self._dispatch()
+            return
+
+        lock = self.redis.lock('scheduler:dispatch', timeout=60)
+        if not lock.acquire(blocking=False):
+            return  # Another process is dispatching; the next poll retries
+        try:
+            self._dispatch()
+        finally:
+            try:
+                lock.release()
+            except redis.exceptions.LockError:
+                pass
+
+    def _dispatch(self):
+        self._reap_stale()
+        running = self._running_counts()
+        total_running = sum(running.values())
+        served = self._last_served()
+        dispatched = 0
+
+        while total_running < self.max_concurrent:
+            execution = self._pick_next(self._pending(), running, served)
+            if execution is None:
+                return
+
+            if not self._claim(execution.id):
+                continue  # Cancelled or claimed elsewhere in the meantime
+
+            dispatched += 1
+            served[execution.user_id] = (1, dispatched)
+            running[execution.user_id] = running.get(execution.user_id, 0) + 1
+            total_running += 1
+
+            self.runner.execute_playbooks(execution.id, on_complete=self.notify)
+
+    def _reap_stale(self):
+        """Fail active executions whose run stopped sending heartbeats"""
+        cutoff = datetime.utcnow() - self.stale_after
+        last_seen = db.func.coalesce(PlaybookExecution.heartbeat_at, PlaybookExecution.started_at)
+        stale = PlaybookExecution.query \
+            .filter(PlaybookExecution.status.in_(self.ACTIVE_STATUSES), last_seen < cutoff) \
+            .with_entities(PlaybookExecution.id, PlaybookExecution.status).all()
+
+        for execution_id, status in stale:
+            final = 'cancelled' if status == 'cancelling' else 'failed'
+            error = f"No heartbeat for {int(self.stale_after.total_seconds())}s; the worker running it likely exited"
+            # Re-checked in the update, in case a heartbeat or the run's own finish landed meanwhile
+            reaped = PlaybookExecution.query \
+                .filter(PlaybookExecution.id == execution_id, PlaybookExecution.status == status, last_seen < cutoff) \
+                .update({'status': final, 'error_output': error, 'completed_at': datetime.utcnow()},
+                        synchronize_session=False)
+            if not reaped:
+                continue  # Finished or heartbeat handled in the meantime
+            bump('executions')
+            db.session.commit()
+            self.runner.socketio.emit('execution_complete', {
+                'execution_id': execution_id,
+                'status': final,
+                'errors': error
+            })
+        db.session.commit()
+
+    def _running_counts(self):
+        rows = db.session.query(PlaybookExecution.user_id, db.func.count(PlaybookExecution.id)) \
+            .filter(PlaybookExecution.status.in_(self.ACTIVE_STATUSES)) \
+            .group_by(PlaybookExecution.user_id).all()
+        return {user_id: count for user_id, count in rows}
+
+    def _last_served(self):
+        """Sort key per user for when they last had an execution started"""
+        rows = db.session.query(PlaybookExecution.user_id, db.func.max(PlaybookExecution.started_at)) \
+            .filter(PlaybookExecution.started_at.isnot(None)) \
+            .group_by(PlaybookExecution.user_id).all()
+        return {user_id: (0, started_at) for user_id, started_at in rows}
+
+    def _pending(self):
+        return PlaybookExecution.query \
+            .filter(PlaybookExecution.status == 'pending') \
+            .order_by(PlaybookExecution.priority.desc(), PlaybookExecution.queued_at, PlaybookExecution.id) \
+            .all()
+
+    def _pick_next(self, pending, running, served):
+        """Return the next execution to start, or None if nothing is eligible"""
+        eligible = [e for e in pending if running.get(e.user_id, 0) < self.max_per_user]
+        return self._next_in_turn(eligible, served)
+
+    def _next_in_turn(self, pending, served):
+        """Within the top priority level, pick the least recently served user's oldest execution"""
+        if not pending:
+            return None
+
+        top_priority = pending[0].priority
+        heads = {}
+        for execution in pending:
+            if execution.priority != top_priority:
+                break
+            heads.setdefault(execution.user_id, execution)
+
+        return min(heads.values(), key=lambda e: served.get(e.user_id, (0, datetime.min)))
+
+    def _claim(self, execution_id):
+        """Atomically move an execution from pending to running"""
+        now = datetime.utcnow()
+        claimed = PlaybookExecution.query \
+            .filter_by(id=execution_id, status='pending') \
+            .update({'status': 'running', 'started_at': now, 'heartbeat_at': now}, synchronize_session=False)
+        if claimed:
+            bump('executions')
+        db.session.commit()
+        return claimed == 1
+
+    def queue_positions(self):
+        """Map each pending execution ID to its 1-based position in dispatch order.
+
+        Concurrency caps are ignored, so the order is what the queue would be
+        served in if slots were available.
+        """
+        served = self._last_served()
+        positions = {}
+
+        # Users keep their turn order within a level: each one served moves to the back
+        for _, level in groupby(self._pending(), key=lambda e: e.priority):
+            queues = {}
+            for execution in level:
+                queues.setdefault(execution.user_id, deque()).append(execution)
+            turns = deque(sorted(queues, key=lambda user_id: served.get(user_id, (0, datetime.min))))
+            while turns:
+                user_id = turns.popleft()
+                execution = queues[user_id].popleft()
+                served[user_id] = (1, len(positions))
+                positions[execution.id] = len(positions) + 1
+                if queues[user_id]:
+                    turns.append(user_id)
+
+        return positions
@@ -0,0 +1,57 @@
+from collections import defaultdict
+from models import db, Node, NodeGroup, node_group_members
+
+
+def _memberships(node_filter=None):
+    """Load (node_id, group_id, group_name) membership rows in a single query"""
+    query = db.session.query(
+        node_group_members.c.node_id,
+        node_group_members.c.group_id,
+        NodeGroup.name
+    ).join(NodeGroup, NodeGroup.id == node_group_members.c.group_id)
+    if node_filter is not None:
+        query = query.filter(node_group_members.c.node_id.in_(node_filter))
+    return query.order_by(node_group_members.c.group_id).all()
+
+
+def serialize_nodes(nodes, all_nodes=False):
+    """Serialize nodes with their group names using one membership query.
+
+    Set all_nodes when the list is the whole table so the membership query
+    needs no ID filter.
+    """
+    node_filter = None if all_nodes else [node.id for node in nodes]
+    group_names = defaultdict(list)
+    for node_id, _, group_name in _memberships(node_filter):
+        group_names[node_id].append(group_name)
+
+    return [node.to_dict(groups=group_names[node.id]) for node in nodes]
+
+
+def serialize_groups(groups):
+    """Serialize groups with their member nodes in two queries regardless of size"""
+    if not groups:
+        return []
+
+    group_ids = [group.id for group in groups]
+    member_ids = db.select(node_group_members.c.node_id) \
+        .where(node_group_members.c.group_id.in_(group_ids)) \
+        .scalar_subquery()
+
+    nodes = Node.query.filter(Node.id.in_(member_ids)).order_by(Node.id).all()
+
+    group_names = defaultdict(list)
+    members = defaultdict(list)
+    for node_id, group_id, group_name in _memberships(member_ids):
+        group_names[node_id].append(group_name)
+        members[group_id].append(node_id)
+
+    serialized = {node.id: node.to_dict(groups=group_names[node.id]) for node in nodes}
+    return [
+        group.to_dict(nodes=[serialized[node_id] for node_id in sorted(members[group.id])])
+        for group in groups
+    ]
+
+
+def serialize_group(group):
+    return serialize_groups([group])[0]
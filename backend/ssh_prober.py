@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+
+class SSHProber:
+    """Fast reachability check that only waits for a host's SSH identification string"""
+
+    # RFC 4253 allows a server to send other lines before the identification string,
+    # and limits the identification line, CR LF included, to 255 bytes
+    MAX_PREAMBLE_LINES = 5
+    MAX_LINE_LENGTH = 255
+
+    def __init__(self, concurrency=500, timeout=3.0):
+        self.concurrency = concurrency
+        self.timeout = timeout
+
+    def probe(self, targets, on_result=None):
+        """Probe (node_id, hostname, port) targets and return a result dict per target.
+
+        on_result, if given, is called with each result as soon as its host finishes.
+        """
+        return asyncio.run(self._probe_all(targets, on_result))
+
+    async def _probe_all(self, targets, on_result):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.ensure_future(self._probe_one(semaphore, node_id, hostname, port))
+            for node_id, hostname, port in targets
+        ]
+
+        results = []
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+    async def _probe_one(self, semaphore, node_id, hostname, port):
+        result = {
+            'node_id': node_id,
+            'success': False,
+            'latency_ms': None,
+            'banner': None,
+            'error': None
+        }
+
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                banner = await asyncio.wait_for(self._read_banner(hostname, port), self.timeout)
+            except asyncio.TimeoutError:
+                result['error'] = 'timeout'
+                return result
+            except OSError as e:
+                result['error'] = e.strerror or str(e)
+                return result
+            except Exception as e:
+                # Anything else (bad hostname encoding, protocol garbage) fails this host, not the batch
+                result['error'] = str(e) or type(e).__name__
+                return result
+
+        if banner:
+            result['success'] = True
+            result['latency_ms'] = round((time.monotonic() - started) * 1000, 2)
+            result['banner'] = banner
+        else:
+            result['error'] = 'no SSH banner'
+        return result
+
+    async def _read_banner(self, hostname, port):
+        reader, writer = await asyncio.open_connection(hostname, port, limit=self.MAX_LINE_LENGTH)
+        try:
+            for _ in range(self.MAX_PREAMBLE_LINES):
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial  # Connection closed; an unterminated last line still counts
+                except asyncio.LimitOverrunError:
+                    raise ValueError(f'line longer than {self.MAX_LINE_LENGTH} bytes') from None
+                if line.startswith(b'SSH-'):
+                    return line.strip().decode('ascii', errors='replace')
+                if reader.at_eof():
+                    break
+            return None
+        finally:
+            writer.close()
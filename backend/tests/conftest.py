@@ -0,0 +1,25 @@
+import pytest
+import support
+
+WORK_DIR = support.configure()
+
+
+@pytest.fixture(scope='session')
+def app_and_socketio():
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture(scope='session')
+def app(app_and_socketio):
+    return app_and_socketio[0]
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    return support.login(client)
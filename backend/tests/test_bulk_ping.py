@@ -0,0 +1,35 @@
+import ansible_runner
+from ansible_runner import AnsibleRunner
+from models import db, Node
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.messages = []
+
+    def emit(self, name, data=None, **kwargs):
+        self.messages.append((name, data))
+
+
+def test_a_broken_ping_run_marks_nodes_unknown_not_unreachable(app, monkeypatch):
+    def broken_run(**kwargs):
+        raise RuntimeError('ansible-playbook not found')
+
+    monkeypatch.setattr(ansible_runner, 'run', broken_run)
+    socket = RecordingSocket()
+    runner = AnsibleRunner(socket, app)
+    with app.app_context():
+        node = Node(name='ping-broken', hostname='ping-broken.example.com', username='root', status='reachable')
+        db.session.add(node)
+        db.session.commit()
+
+        runner._run_bulk_ping([node.id], None)
+
+        db.session.expire_all()
+        assert db.session.get(Node, node.id).status == 'unknown'
+        (name, data), = socket.messages
+        assert name == 'node_ping_result'
+        assert data['results'][0]['status'] == 'unknown'
+        assert 'ansible-playbook not found' in data['results'][0]['error']
+        db.session.delete(db.session.get(Node, node.id))
+        db.session.commit()
@@ -0,0 +1,58 @@
+import threading
+
+from ansible_runner import ExecutionEventStream
+from models import db, ExecutionLogChunk, PlaybookExecution
+
+
+class RecordingSocket:
+    def __init__(self):
+        self.emitted = threading.Event()
+        self.messages = []
+
+    def emit(self, name, data=None, **kwargs):
+        self.messages.append((name, data))
+        self.emitted.set()
+
+
+def test_buffered_events_are_flushed_without_a_new_event(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'EXECUTION_EVENT_FLUSH_INTERVAL', 0.1)
+    with app.app_context():
+        execution = PlaybookExecution(playbooks=['site.yml'], status='running')
+        db.session.add(execution)
+        db.session.commit()
+        execution_id = execution.id
+
+        socket = RecordingSocket()
+        with ExecutionEventStream(socket, execution_id, app) as stream:
+            stream.handler_for('site.yml')({
+                'event': 'playbook_on_task_start',
+                'stdout': 'TASK [wait] ***',
+                'event_data': {'play': 'all', 'task': 'wait'}
+            })
+            # The task runs quietly; the ticker must send what is buffered
+            assert socket.emitted.wait(2)
+
+        assert socket.messages[0] == ('execution_events', {
+            'execution_id': execution_id,
+            'events': [{'type': 'task_start', 'playbook': 'site.yml', 'play': 'all', 'task': 'wait'}]
+        })
+        assert ExecutionLogChunk.read(execution_id, 0, 100) == 'TASK [wait] ***\n'
+        ExecutionLogChunk.query.filter_by(execution_id=execution_id).delete()
+        db.session.delete(db.session.get(PlaybookExecution, execution_id))
+        db.session.commit()
+
+
+def test_log_of_a_cancelling_execution_is_not_complete(app, client, auth_headers):
+    with app.app_context():
+        execution = PlaybookExecution(playbooks=['site.yml'], status='cancelling')
+        db.session.add(execution)
+        db.session.commit()
+        execution_id = execution.id
+
+    response = client.get(f'/api/executions/{execution_id}/log', headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['complete'] is False
+
+    with app.app_context():
+        db.session.delete(db.session.get(PlaybookExecution, execution_id))
+        db.session.commit()
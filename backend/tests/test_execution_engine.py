@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+# Runs in its own process: importing app with a message queue configured used to
+# monkey-patch the whole interpreter, which cannot be undone inside the test session
+EXECUTION_SCRIPT = textwrap.dedent('''
+    import json, os, sys, threading
+    import support
+    support.configure(sys.argv[1], SOCKETIO_MESSAGE_QUEUE='redis://127.0.0.1:1/0')
+
+    import select
+    from app import create_app
+    from ansible_runner import AnsibleRunner
+    from models import db, Node, PlaybookExecution
+
+    app, socketio = create_app()
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'ok.yml'), 'w') as f:
+        f.write('- hosts: all\\n  gather_facts: false\\n  tasks:\\n    - command: /bin/true\\n')
+
+    runner = AnsibleRunner(socketio, app)
+    with app.app_context():
+        node = Node(name='local', hostname='localhost', username='test')
+        db.session.add(node)
+        db.session.commit()
+        execution = PlaybookExecution(playbooks=['ok.yml'], target_nodes=[node.id], status='pending')
+        db.session.add(execution)
+        db.session.commit()
+        execution_id, node_id = execution.id, node.id
+
+    done = threading.Event()
+    runner.execute_playbooks(execution_id, on_complete=lambda _: done.set())
+    finished = done.wait(60)
+    with app.app_context():
+        runner._run_bulk_ping([node_id], None)
+        execution = db.session.get(PlaybookExecution, execution_id)
+        print(json.dumps({
+            'finished': finished,
+            'status': execution.status,
+            'error': execution.error_output,
+            'node_status': db.session.get(Node, node_id).status,
+            'select_has_poll': hasattr(select, 'poll')
+        }))
+''')
+
+
+def test_execution_completes_with_message_queue_configured(tmp_path):
+    result = subprocess.run(
+        [sys.executable, '-c', EXECUTION_SCRIPT, str(tmp_path)],
+        cwd=os.path.dirname(__file__), capture_output=True, text=True, timeout=180
+    )
+    assert result.returncode == 0, result.stderr
+    outcome = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert outcome['select_has_poll']
+    assert outcome['finished']
+    assert outcome['status'] == 'completed', outcome['error']
+    assert outcome['node_status'] == 'reachable'
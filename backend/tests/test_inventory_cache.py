@@ -0,0 +1,40 @@
+import os
+import time
+
+from inventory_cache import InventoryCache
+from models import db, Node
+
+
+def host_vars(row):
+    return {'ansible_host': row.hostname}
+
+
+def age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_prune_spares_leased_and_recently_used_artifacts(app, tmp_path):
+    cache = InventoryCache(str(tmp_path), 1, host_vars, lease_seconds=60)
+    with app.app_context():
+        nodes = [Node(name=f'cache{i}', hostname=f'cache{i}.example.com', username='root') for i in range(3)]
+        db.session.add_all(nodes)
+        db.session.commit()
+        first, second, third = (node.id for node in nodes)
+
+        with cache.lease([first], []) as (leased_path, _):
+            age(leased_path, 3600)
+            unleased_path, _ = cache.get([second], [])
+            age(unleased_path, 3600)
+            recent_path, _ = cache.get([third], [])  # Writing a new artifact prunes
+
+            assert os.path.exists(leased_path)
+            assert not os.path.exists(unleased_path)
+            assert os.path.exists(recent_path)
+
+        cache.get([second], [])  # Lease released: now only the age rule protects it
+        assert not os.path.exists(leased_path)
+
+        for node in nodes:
+            db.session.delete(node)
+        db.session.commit()
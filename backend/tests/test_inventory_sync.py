@@ -0,0 +1,116 @@
+from datetime import datetime
+
+from models import db, Node, NodeGroup, InventoryImport, node_group_members
+from inventory_sync import compute_diff, apply_diff, revert_delta, source_import_ids
+
+NODE_FIELDS = ('name', 'hostname', 'username', 'port', 'description', 'status', 'last_checked', 'latency_ms',
+               'ssh_pipelining', 'ssh_control_persist', 'ssh_extra_args', 'import_id', 'created_at', 'updated_at')
+
+
+def snapshot(node_id):
+    node = db.session.get(Node, node_id)
+    return {field: getattr(node, field) for field in NODE_FIELDS}
+
+
+def memberships(node_id):
+    return {row.group_id for row in db.session.query(node_group_members.c.group_id)
+            .filter(node_group_members.c.node_id == node_id)}
+
+
+def test_sync_removes_only_owned_nodes_and_rollback_restores_every_column(app):
+    with app.app_context():
+        source = InventoryImport(filename='site.yml', file_path='/tmp/site.yml', format='yaml', status='completed')
+        sync = InventoryImport(filename='site.yml', file_path='/tmp/site2.yml', format='yaml', mode='sync')
+        db.session.add_all([source, sync])
+        db.session.commit()
+
+        group = NodeGroup(name='sync-web')
+        checked = datetime(2024, 5, 1, 12, 30)
+        dropped = Node(name='dropped', hostname='dropped.sync', username='root', import_id=source.id,
+                       status='reachable', last_checked=checked, latency_ms=3.5, ssh_pipelining=False,
+                       ssh_control_persist=0, ssh_extra_args='-o Foo=bar', description='db host')
+        kept = Node(name='kept', hostname='kept.sync', username='root', import_id=source.id,
+                    status='unreachable', ssh_extra_args='-o Baz=1')
+        manual = Node(name='manual', hostname='manual.sync', username='root')
+        db.session.add_all([group, dropped, kept, manual])
+        db.session.commit()
+        db.session.execute(node_group_members.insert(), [{'node_id': dropped.id, 'group_id': group.id}])
+        db.session.commit()
+        before = {node.id: snapshot(node.id) for node in (dropped, kept, manual)}
+
+        diff = compute_diff([{'hostname': 'kept.sync', 'name': 'renamed', 'username': 'admin'}], {},
+                            source_import_ids('site.yml'))
+        assert [node['hostname'] for node in diff['removed']] == ['dropped.sync']
+
+        delta = apply_diff(diff, 'Synced from site.yml', sync.id)
+        sync.sync_delta = delta
+        db.session.commit()
+        assert db.session.get(Node, dropped.id) is None
+        assert db.session.get(Node, manual.id) is not None
+
+        revert_delta(db.session.get(InventoryImport, sync.id).sync_delta, sync.id)
+        db.session.commit()
+        db.session.expire_all()
+        for node_id, fields in before.items():
+            assert snapshot(node_id) == fields
+        assert memberships(dropped.id) == {group.id}
+
+
+def test_normalized_copy_is_rebuilt_when_the_source_changes(tmp_path):
+    from inventory_parser import normalized_inventory
+
+    path = tmp_path / 'hosts.ini'
+    path.write_text('[web]\nweb1 ansible_host=10.0.0.1\n')
+    assert [node['name'] for node in normalized_inventory(str(path), 'ini').nodes()] == ['web1']
+
+    # Same path, new content: the copy left by the first file must not be reused
+    path.write_text('[db]\ndb1 ansible_host=10.0.0.2\ndb2 ansible_host=10.0.0.3\n')
+    inventory = normalized_inventory(str(path), 'ini')
+    assert [node['name'] for node in inventory.nodes()] == ['db1', 'db2']
+    assert list(inventory.groups_data()) == ['db']
+
+
+def test_long_running_import_keeps_its_heartbeat(app, tmp_path, monkeypatch):
+    import threading
+    import time
+    from datetime import timedelta
+    import import_jobs
+
+    path = tmp_path / 'slow.ini'
+    path.write_text('[slow]\nslow1 ansible_host=10.0.1.1\n')
+    release = threading.Event()
+    parse = import_jobs.normalized_inventory
+
+    def slow_parse(file_path, file_format):
+        release.wait(10)  # A parse that outlasts IMPORT_STALE_AFTER
+        return parse(file_path, file_format)
+
+    monkeypatch.setattr(import_jobs, 'normalized_inventory', slow_parse)
+
+    class Silent:
+        def emit(self, *args, **kwargs):
+            pass
+
+    jobs = import_jobs.ImportJobs(app, Silent())
+    jobs.stale_after = timedelta(seconds=1)
+    with app.app_context():
+        job = InventoryImport(filename='slow.ini', file_path=str(path), format='ini')
+        db.session.add(job)
+        db.session.commit()
+        assert jobs.start(job.id)
+
+        time.sleep(2.5)
+        assert not jobs._claim(job.id)  # The watcher would find it alive
+        release.set()
+        for _ in range(100):
+            db.session.expire_all()
+            if db.session.get(InventoryImport, job.id).status != 'running':
+                break
+            time.sleep(0.05)
+        assert db.session.get(InventoryImport, job.id).status == 'completed'
+
+        for node in Node.query.filter_by(import_id=job.id):
+            db.session.delete(node)
+        for group in NodeGroup.query.filter_by(import_id=job.id):
+            db.session.delete(group)
+        db.session.commit()
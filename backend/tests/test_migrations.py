@@ -0,0 +1,15 @@
+from sqlalchemy import create_engine, inspect
+
+from migrations import run_migrations
+from models import db
+
+
+def test_migrations_build_the_schema_the_models_expect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    run_migrations(engine)
+    inspector = inspect(engine)
+
+    for name, table in db.metadata.tables.items():
+        assert {column['name'] for column in inspector.get_columns(name)} == set(table.columns.keys()), name
+        migrated = {index['name'] for index in inspector.get_indexes(name)}
+        assert {index.name for index in table.indexes} <= migrated, name
@@ -0,0 +1,68 @@
+import os
+import time
+
+
+def test_create_execution_checks_the_playbook_as_it_is_on_disk(app, client, auth_headers):
+    path = os.path.join(app.config['UPLOAD_FOLDER'], 'edited.yml')
+    with open(path, 'w') as f:
+        f.write('- hosts: all\n  tasks: []\n')
+    info = client.get('/api/playbooks/edited.yml/info', headers=auth_headers)
+    assert info.status_code == 200  # Now indexed as valid
+
+    # Broken behind the catalog's back, before its next scan
+    with open(path, 'w') as f:
+        f.write('- hosts: all\n  tasks: [\n')
+
+    response = client.post('/api/executions', headers=auth_headers,
+                           json={'playbooks': ['edited.yml'], 'target_nodes': [1]})
+    assert response.status_code == 400
+    assert 'edited.yml is invalid' in response.get_json()['message']
+
+
+def test_create_execution_rejects_paths_outside_the_playbook_folder(client, auth_headers):
+    response = client.post('/api/executions', headers=auth_headers,
+                           json={'playbooks': ['../config.py'], 'target_nodes': [1]})
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'Playbook not found: ../config.py'
+
+
+def test_failed_syntax_checks_expire_and_are_run_again(app, client, auth_headers):
+    from datetime import datetime, timedelta
+    from models import db, PlaybookExecution, PlaybookSyntaxCheck
+    from playbook_validation import content_hash
+
+    content = '- hosts: all\n  roles: [later_installed]\n'
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'needs_role.yml'), 'w') as f:
+        f.write(content)
+    with app.app_context():
+        db.session.merge(PlaybookSyntaxCheck(content_hash=content_hash(content), status='invalid',
+                                             error="the role 'later_installed' was not found",
+                                             checked_at=datetime.utcnow()))
+        db.session.commit()
+
+    def submit():
+        return client.post('/api/executions', headers=auth_headers,
+                           json={'playbooks': ['needs_role.yml'], 'target_nodes': [1]})
+
+    assert 'failed syntax check' in submit().get_json()['message']
+
+    with app.app_context():
+        expired = datetime.utcnow() - timedelta(seconds=app.config['PLAYBOOK_SYNTAX_CHECK_INVALID_TTL'] + 1)
+        db.session.get(PlaybookSyntaxCheck, content_hash(content)).checked_at = expired
+        db.session.commit()
+
+    # The role may be installed by now: the stale failure no longer blocks, and a new check is queued
+    response = submit()
+    assert 'failed syntax check' not in (response.get_json().get('message') or '')
+    # Wait for the new check, so its queries do not land in a later test
+    for _ in range(300):
+        syntax = client.get('/api/playbooks/needs_role.yml/info', headers=auth_headers).get_json()['syntax']
+        if syntax['status'] != 'pending':
+            break
+        time.sleep(0.1)
+    assert syntax['status'] != 'invalid' or syntax['checked_at'] > expired.isoformat()
+
+    if response.status_code == 201:
+        with app.app_context():
+            db.session.delete(db.session.get(PlaybookExecution, response.get_json()['id']))
+            db.session.commit()
@@ -0,0 +1,23 @@
+import gzip
+import os
+
+
+def test_editor_can_save_with_the_etag_of_the_raw_download(app, client, auth_headers):
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'editor.yml'), 'w') as f:
+        f.write('- hosts: all\n  tasks: []\n')
+
+    raw = client.get('/api/playbooks/editor.yml/raw', headers=dict(auth_headers, **{'Accept-Encoding': 'gzip'}))
+    assert raw.status_code == 200
+    assert raw.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(raw.data) == b'- hosts: all\n  tasks: []\n'
+    etag = raw.headers['ETag']
+    assert etag.endswith('-gzip"')
+
+    saved = client.put('/api/playbooks/editor.yml', headers=dict(auth_headers, **{'If-Match': etag}),
+                       json={'content': '- hosts: all\n  gather_facts: false\n  tasks: []\n'})
+    assert saved.status_code == 200, saved.get_json()
+
+    # The ETag now names old content, so a second save from the same editor is refused
+    stale = client.put('/api/playbooks/editor.yml', headers=dict(auth_headers, **{'If-Match': etag}),
+                       json={'content': '- hosts: all\n  tasks: []\n'})
+    assert stale.status_code == 412
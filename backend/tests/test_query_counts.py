@@ -0,0 +1,69 @@
+"""The node and group endpoints issue a fixed number of statements regardless of data size"""
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Node, NodeGroup, node_group_members
+
+SIZES = (5, 50)
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def seed(size):
+    """size nodes, each in two of size // 5 groups, plus one empty group last; returns (group IDs, node IDs)"""
+    db.session.execute(node_group_members.delete())
+    db.session.execute(db.delete(Node))
+    db.session.execute(db.delete(NodeGroup))
+    db.session.execute(db.insert(Node), [
+        {'name': f'count{i}', 'hostname': f'count{i}.example.com', 'username': 'root'} for i in range(size)
+    ])
+    db.session.execute(db.insert(NodeGroup), [{'name': f'count-group{g}'} for g in range(size // 5 + 1)])
+    node_ids = [row.id for row in db.session.query(Node.id).order_by(Node.id)]
+    group_ids = [row.id for row in db.session.query(NodeGroup.id).order_by(NodeGroup.id)]
+    filled = group_ids[:-1]
+    db.session.execute(node_group_members.insert(), [
+        {'node_id': node_id, 'group_id': filled[(i + offset) % len(filled)]}
+        for i, node_id in enumerate(node_ids) for offset in {0, 1 % len(filled)}
+    ])
+    db.session.commit()
+    return group_ids, node_ids
+
+
+def statements_for(app, client, auth_headers, request, size):
+    with app.app_context():
+        group_ids, node_ids = seed(size)
+        db.session.remove()  # Nothing cached in the identity map from seeding
+        with count_statements() as statements:
+            response = request(client, auth_headers, group_ids, node_ids)
+        assert response.status_code == 200
+        return len(statements)
+
+
+REQUESTS = {
+    'list_nodes': lambda client, headers, group_ids, node_ids: client.get('/api/nodes', headers=headers),
+    'list_groups': lambda client, headers, group_ids, node_ids: client.get('/api/groups', headers=headers),
+    'get_group': lambda client, headers, group_ids, node_ids:
+        client.get(f'/api/groups/{group_ids[0]}', headers=headers),
+    'add_nodes_to_group': lambda client, headers, group_ids, node_ids:
+        client.post(f'/api/groups/{group_ids[-1]}/nodes', headers=headers, json={'node_ids': node_ids}),
+}
+
+
+@pytest.mark.parametrize('endpoint', list(REQUESTS))
+def test_statement_count_does_not_grow_with_data(app, client, auth_headers, endpoint):
+    counts = [statements_for(app, client, auth_headers, REQUESTS[endpoint], size) for size in SIZES]
+    assert counts[0] == counts[1], f'{endpoint}: {counts[0]} statements for {SIZES[0]} nodes, {counts[1]} for {SIZES[1]}'
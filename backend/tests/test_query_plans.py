@@ -0,0 +1,121 @@
+"""The hot list and lookup queries are served by indexes.
+
+A throwaway SQLite database is built through the migrations, seeded with
+QUERY_PLAN_ROWS nodes and executions (2000 by default, enough for the
+planner to prefer the indexes) and analyzed; each hot query is then
+EXPLAINed. Seed fixed IDs into a separate database, never the test one.
+Run with QUERY_PLAN_ROWS=100000 to check the plans at production scale.
+"""
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+from models import (db, User, Node, NodeGroup, PlaybookExecution, ExecutionLogChunk, InventoryImport,
+                    node_group_members)
+from migrations import run_migrations
+
+ROWS = int(os.environ.get('QUERY_PLAN_ROWS', 2000))
+
+
+def hot_queries():
+    """(description, query, index the plan must use)"""
+    since = datetime(2024, 6, 1)
+    return [
+        ('node by hostname',
+         db.select(Node.id).where(Node.hostname == 'host1000.example.com'),
+         'ix_node_hostname'),
+        ('nodes created by an import',
+         db.select(Node.id).where(Node.import_id == 7),
+         'ix_node_import_id'),
+        ('members of a group',
+         db.select(node_group_members.c.node_id).where(node_group_members.c.group_id == 3),
+         'ix_node_group_members_group_id'),
+        ('execution history page',
+         db.select(PlaybookExecution.id)
+         .order_by(PlaybookExecution.queued_at.desc(), PlaybookExecution.id.desc()).limit(50),
+         'ix_playbook_execution_queued'),
+        ('executions by status',
+         db.select(PlaybookExecution.id).where(PlaybookExecution.status == 'failed')
+         .order_by(PlaybookExecution.queued_at.desc()).limit(50),
+         'ix_playbook_execution_status_queued'),
+        ('executions by user',
+         db.select(PlaybookExecution.id).where(PlaybookExecution.user_id == 5, PlaybookExecution.queued_at >= since)
+         .order_by(PlaybookExecution.queued_at.desc()).limit(50),
+         'ix_playbook_execution_user_queued'),
+        ('scheduler pending queue',
+         db.select(PlaybookExecution.id).where(PlaybookExecution.status == 'pending')
+         .order_by(PlaybookExecution.priority.desc(), PlaybookExecution.queued_at),
+         'ix_playbook_execution_queue'),
+        ('log chunks in a range',
+         db.select(ExecutionLogChunk.id).where(ExecutionLogChunk.execution_id == 10,
+                                               ExecutionLogChunk.start_offset < 4096),
+         'ix_execution_log_chunk_offset'),
+        ('import history',
+         db.select(InventoryImport.id).order_by(InventoryImport.created_at.desc()).limit(50),
+         'ix_inventory_import_created_at'),
+        ('stale running imports',
+         db.select(InventoryImport.id).where(InventoryImport.status == 'running',
+                                             InventoryImport.heartbeat_at < since),
+         'ix_inventory_import_status_heartbeat'),
+    ]
+
+
+def seed(rows, batch=5000):
+    start = datetime(2024, 1, 1)
+    db.session.execute(db.insert(User), [
+        {'username': f'user{i}', 'email': f'user{i}@example.com'} for i in range(1, 21)
+    ])
+    imports = max(rows // 100, 1)
+    db.session.execute(db.insert(InventoryImport), [
+        {'filename': f'inv{i}.yml', 'file_path': f'/tmp/inv{i}.yml', 'format': 'yaml',
+         'status': 'completed' if i % 50 else 'running', 'created_at': start + timedelta(minutes=i),
+         'heartbeat_at': start + timedelta(minutes=i)}
+        for i in range(1, imports + 1)
+    ])
+    db.session.execute(db.insert(NodeGroup), [{'name': f'group{g}'} for g in range(1, 51)])
+    for offset in range(0, rows, batch):
+        chunk = range(offset + 1, min(offset + batch, rows) + 1)
+        db.session.execute(db.insert(Node), [
+            {'id': i, 'name': f'host{i}', 'hostname': f'host{i}.example.com', 'username': 'root',
+             'import_id': i % imports + 1}
+            for i in chunk
+        ])
+        db.session.execute(node_group_members.insert(), [{'node_id': i, 'group_id': i % 50 + 1} for i in chunk])
+        db.session.execute(db.insert(PlaybookExecution), [
+            {'id': i, 'playbooks': ['site.yml'], 'status': ('completed', 'failed', 'pending', 'running')[i % 4],
+             'priority': i % 3, 'user_id': i % 20 + 1, 'started_at': start + timedelta(seconds=i * 60),
+             'queued_at': start + timedelta(seconds=i * 60)}
+            for i in chunk
+        ])
+        db.session.execute(db.insert(ExecutionLogChunk), [
+            {'execution_id': i, 'seq': 0, 'start_offset': 0, 'length': 5, 'content': 'hello'} for i in chunk
+        ])
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def explain(query):
+    compiled = query.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    return '\n'.join(' '.join(str(part) for part in row)
+                     for row in db.session.execute(text('EXPLAIN QUERY PLAN ' + str(compiled))))
+
+
+@pytest.fixture(scope='module')
+def seeded(tmp_path_factory):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    db.init_app(app)
+    with app.app_context():
+        run_migrations(db.engine)
+        seed(ROWS)
+        yield
+
+
+@pytest.mark.parametrize('description, query, index', hot_queries(), ids=[query[0] for query in hot_queries()])
+def test_hot_query_uses_its_index(seeded, description, query, index):
+    plan = explain(query)
+    assert index in plan, f"{description} does not use {index}:\n{plan}"
@@ -0,0 +1,126 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from ansible_runner import AnsibleRunner
+from models import db, Node, PlaybookExecution
+from scheduler import ExecutionScheduler
+
+
+@pytest.fixture
+def runner(app_and_socketio):
+    app, socketio = app_and_socketio
+    return AnsibleRunner(socketio, app)
+
+
+@pytest.fixture
+def scheduler(app, runner):
+    return ExecutionScheduler(app, runner)
+
+
+@pytest.fixture(autouse=True)
+def no_executions(app):
+    yield
+    with app.app_context():
+        PlaybookExecution.query.delete()
+        db.session.commit()
+
+
+def add_execution(playbooks=('missing.yml',), **values):
+    execution = PlaybookExecution(playbooks=list(playbooks), **values)
+    db.session.add(execution)
+    db.session.commit()
+    return execution.id
+
+
+def status_of(execution_id):
+    db.session.expire_all()
+    return db.session.get(PlaybookExecution, execution_id).status
+
+
+def test_pending_execution_has_no_start_time(app):
+    with app.app_context():
+        execution_id = add_execution(status='pending')
+        assert db.session.get(PlaybookExecution, execution_id).started_at is None
+
+
+def test_stale_runs_are_reaped(app, scheduler):
+    with app.app_context():
+        long_ago = datetime.utcnow() - timedelta(hours=1)
+        stale = add_execution(status='running', started_at=long_ago, heartbeat_at=long_ago)
+        stopping = add_execution(status='cancelling', started_at=long_ago, heartbeat_at=long_ago)
+        alive = add_execution(status='running', started_at=long_ago, heartbeat_at=datetime.utcnow())
+
+        scheduler._reap_stale()
+
+        assert status_of(stale) == 'failed'
+        assert status_of(stopping) == 'cancelled'
+        assert status_of(alive) == 'running'
+        assert scheduler._running_counts() == {None: 1}
+
+
+def test_finish_never_overwrites_a_terminal_status(app, runner):
+    with app.app_context():
+        execution_id = add_execution(status='cancelled', completed_at=datetime.utcnow())
+
+    done = threading.Event()
+    runner.execute_playbooks(execution_id, on_complete=lambda _: done.set())
+    assert done.wait(10)
+
+    with app.app_context():
+        runner._finish_execution(execution_id, 'completed', None)
+        assert status_of(execution_id) == 'cancelled'
+
+
+def test_cancel_stops_the_run_and_holds_its_slot(app, client, auth_headers, runner, scheduler, monkeypatch):
+    monkeypatch.setitem(app.config, 'EXECUTION_HEARTBEAT_INTERVAL', 0.2)
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'slow.yml'), 'w') as f:
+        f.write('- hosts: all\n  gather_facts: false\n  tasks:\n    - command: sleep 60\n')
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'after.yml'), 'w') as f:
+        f.write('- hosts: all\n  gather_facts: false\n  tasks:\n    - command: /bin/true\n')
+    with app.app_context():
+        node = Node(name='cancel-local', hostname='localhost', username='test')
+        db.session.add(node)
+        db.session.commit()
+        node_id = node.id
+        execution_id = add_execution(playbooks=['slow.yml', 'after.yml'], target_nodes=[node_id], status='pending')
+
+    done = threading.Event()
+    runner.execute_playbooks(execution_id, on_complete=lambda _: done.set())
+    with app.app_context():
+        for _ in range(100):
+            if status_of(execution_id) == 'running':
+                break
+            done.wait(0.1)
+
+    response = client.post(f'/api/executions/{execution_id}/cancel', headers=auth_headers)
+    assert response.get_json()['status'] == 'cancelling'
+    with app.app_context():
+        assert scheduler._running_counts() == {None: 1}
+
+    assert done.wait(30)
+    with app.app_context():
+        assert status_of(execution_id) == 'cancelled'
+        results = db.session.get(PlaybookExecution, execution_id).playbook_results
+        assert results['slow.yml']['status'] == 'cancelled'
+        assert results['after.yml']['status'] == 'skipped'
+        assert scheduler._running_counts() == {}
+        db.session.delete(db.session.get(Node, node_id))
+        db.session.commit()
+
+
+def test_queue_positions_take_turns_between_users_within_a_priority(app, scheduler):
+    with app.app_context():
+        queued = datetime.utcnow() - timedelta(minutes=10)
+        urgent = add_execution(status='pending', user_id=1, priority=5, queued_at=queued + timedelta(seconds=5))
+        first = add_execution(status='pending', user_id=1, queued_at=queued)
+        second = add_execution(status='pending', user_id=1, queued_at=queued + timedelta(seconds=1))
+        other_first = add_execution(status='pending', queued_at=queued + timedelta(seconds=2))
+        other_second = add_execution(status='pending', queued_at=queued + timedelta(seconds=3))
+
+        # User 1 was just served by the urgent run, so the other user goes first at priority 0
+        assert scheduler.queue_positions() == {
+            urgent: 1, other_first: 2, first: 3, other_second: 4, second: 5
+        }
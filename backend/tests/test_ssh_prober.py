@@ -0,0 +1,37 @@
+import socket
+import threading
+
+from ssh_prober import SSHProber
+
+
+def serve(payload):
+    """Listen on a loopback port, send payload to each client and close; returns the port"""
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    listener.listen()
+
+    def accept():
+        while True:
+            conn, _ = listener.accept()
+            with conn:
+                conn.sendall(payload)
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener.getsockname()[1]
+
+
+def test_one_misbehaving_host_does_not_abort_the_batch():
+    ssh = serve(b'SSH-2.0-OpenSSH_9.0\r\n')
+    flood = serve(b'x' * 70000)
+    results = []
+
+    SSHProber(timeout=2).probe([
+        (1, '127.0.0.1', ssh),
+        (2, '127.0.0.1', flood),
+        (3, 'a' * 64 + '.example', 22),  # Label too long for IDNA: UnicodeError
+    ], on_result=results.append)
+
+    by_node = {result['node_id']: result for result in results}
+    assert by_node[1]['success'] and by_node[1]['banner'] == 'SSH-2.0-OpenSSH_9.0'
+    assert not by_node[2]['success'] and 'longer than 255 bytes' in by_node[2]['error']
+    assert not by_node[3]['success'] and by_node[3]['error']
@@ -0,0 +1,19 @@
+import io
+
+
+def test_large_bodies_are_only_accepted_on_inventory_uploads(app, client, auth_headers, monkeypatch):
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    monkeypatch.setitem(app.config, 'INVENTORY_MAX_CONTENT_LENGTH', 64 * 1024)
+    body = b'# padding\n' * 500 + b'all:\n  hosts:\n    limits.example.com:\n'
+
+    playbook = client.post('/api/playbooks', headers=auth_headers,
+                           data={'file': (io.BytesIO(body), 'big.yml')})
+    assert playbook.status_code == 413
+
+    inventory = client.post('/api/inventory/upload', headers=auth_headers,
+                            data={'file': (io.BytesIO(body), 'big.yml')})
+    assert inventory.status_code == 200, inventory.get_json()
+
+    too_large = client.post('/api/inventory/upload', headers=auth_headers,
+                            data={'file': (io.BytesIO(body * 20), 'bigger.yml')})
+    assert too_large.status_code == 413
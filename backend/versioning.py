@@ -0,0 +1,52 @@
+import hashlib
+from flask import request, current_app
+from models import db, CollectionVersion
+from cache import response_cache
+
+COLLECTIONS = ('nodes', 'groups', 'playbooks', 'executions')
+
+
+def ensure_collection_versions():
+    """Create a counter row for every collection that does not have one yet"""
+    existing = {row.name for row in CollectionVersion.query.all()}
+    for name in COLLECTIONS:
+        if name not in existing:
+            db.session.add(CollectionVersion(name=name, version=0))
+    db.session.commit()
+
+
+def bump(*collections):
+    """Increment collection counters; the caller's commit makes the bump visible.
+
+    Cached responses for these collections are dropped once that commit succeeds.
+    """
+    db.session.info.setdefault('bumped_collections', set()).update(collections)
+    db.session.execute(
+        db.update(CollectionVersion)
+        .where(CollectionVersion.name.in_(collections))
+        .values(version=CollectionVersion.version + 1)
+    )
+
+
+def current_version(collection):
+    return db.session.query(CollectionVersion.version).filter_by(name=collection).scalar() or 0
+
+
+def conditional_json(collection, build, extra=''):
+    """Respond with build()'s JSON, or 304 when the client's ETag is still current.
+
+    The version is read before building so a body is never older than its ETag,
+    and the serialized body is shared through the response cache under the same key.
+    """
+    key = f"{collection}:{current_version(collection)}:{extra}:{request.full_path}"
+    etag = hashlib.sha1(key.encode()).hexdigest()
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        body = response_cache.get_or_build(collection, etag, lambda: current_app.json.dumps(build()))
+        response = current_app.response_class(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,16 @@
+"""Runs the execution scheduler without serving HTTP.
+
+Events emitted here reach browsers through the Socket.IO message queue, so
+SOCKETIO_MESSAGE_QUEUE must point at the same Redis as the web workers.
+"""
+from app import create_app
+
+if __name__ == '__main__':
+    app, socketio = create_app()
+    if not app.config['SCHEDULER_ENABLED']:
+        raise SystemExit("SCHEDULER_ENABLED is false, nothing for the worker to do")
+    if not app.config['SOCKETIO_MESSAGE_QUEUE']:
+        print("Warning: SOCKETIO_MESSAGE_QUEUE is not set, execution events will not reach browsers")
+    print("Execution worker started")
+    while True:
+        socketio.sleep(60)
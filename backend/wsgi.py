@@ -0,0 +1,10 @@
+"""Entry point for the web workers: gunicorn --config gunicorn.conf.py wsgi:app
+
+Socket.IO runs in threading mode, so each gunicorn worker serves requests and
+WebSocket connections from a thread pool (gthread). Browsers must keep
+talking to the same worker, which is why a container runs a single worker
+and nginx pins clients with ip_hash; scale with more backend containers.
+"""
+from app import create_app
+
+app, socketio = create_app('production')
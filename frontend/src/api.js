@@ -8,6 +8,11 @@ export const API = axios.create({
     timeout: 30000
 });
 
+// Last response per GET URL, revalidated with If-None-Match
+const responseCache = new Map();
+
+const cacheKey = config => `${config.url}?${new URLSearchParams(config.params || {}).toString()}`;
+
 // Request interceptor
 API.interceptors.request.use(
     config => {
@@ -15,6 +20,14 @@ API.interceptors.request.use(
         if (token) {
             config.headers.Authorization = `Bearer ${token}`;
         }
+
+        if (config.method === 'get') {
+            const cached = responseCache.get(cacheKey(config));
+            if (cached) {
+                config.headers['If-None-Match'] = cached.etag;
+                config.validateStatus = status => (status >= 200 && status < 300) || status === 304;
+            }
+        }
         return config;
     },
     error => {
@@ -24,9 +37,23 @@ API.interceptors.request.use(
 
 // Response interceptor
 API.interceptors.response.use(
-    response => response,
+    response => {
+        if (response.config.method !== 'get') {
+            return response;
+        }
+
+        const key = cacheKey(response.config);
+        if (response.status === 304) {
+            response.data = responseCache.get(key).data;
+            response.status = 200;
+        } else if (response.headers.etag) {
+            responseCache.set(key, { etag: response.headers.etag, data: response.data });
+        }
+        return response;
+    },
     error => {
         if (error.response?.status === 401) {
+            responseCache.clear();
             Auth.logout();
             showToast('Session expired. Please login again.', 'warning');
             window.location.reload();
@@ -47,7 +74,8 @@ export const api = {
     getCurrentUser: () => API.get('/auth/me'),
 
     // Playbooks
-    getPlaybooks: () => API.get('/playbooks'),
+    getPlaybooks: (params = {}) => API.get('/playbooks', { params }),
+    getPlaybookFacets: () => API.get('/playbooks/facets'),
     uploadPlaybook: (file) => {
         const formData = new FormData();
         formData.append('file', file);
@@ -57,7 +85,13 @@ export const api = {
     },
     createPlaybook: (filename) => API.post('/playbooks/create', { filename }),
     getPlaybook: (filename) => API.get(`/playbooks/${filename}`),
-    updatePlaybook: (filename, content) => API.put(`/playbooks/${filename}`, { content }),
+    getPlaybookRaw: (filename) => API.get(`/playbooks/${filename}/raw`, {
+        responseType: 'text',
+        transformResponse: [(data) => data]
+    }),
+    updatePlaybook: (filename, content, etag = null) => API.put(`/playbooks/${filename}`, { content }, {
+        headers: etag ? { 'If-Match': etag } : {}
+    }),
     deletePlaybook: (filename) => API.delete(`/playbooks/${filename}`),
 
     // Nodes
@@ -67,6 +101,10 @@ export const api = {
     updateNode: (id, nodeData) => API.put(`/nodes/${id}`, nodeData),
     deleteNode: (id) => API.delete(`/nodes/${id}`),
     pingNode: (id) => API.post(`/nodes/${id}/ping`),
+    pingNodes: (target) => API.post('/nodes/ping', target),
+    probeNodes: (target) => API.post('/nodes/probe', target),
+    getNodeFacts: (id, keys) => API.get(`/nodes/${id}/facts` + (keys ? `?keys=${encodeURIComponent(keys.join(','))}` : '')),
+    refreshNodeFacts: (target) => API.post('/nodes/facts/refresh', target),
 
     // Groups
     getGroups: () => API.get('/groups'),
@@ -78,21 +116,24 @@ export const api = {
     removeNodeFromGroup: (groupId, nodeId) => API.delete(`/groups/${groupId}/nodes/${nodeId}`),
 
     // Executions
-    getExecutions: () => API.get('/executions'),
+    getExecutions: (params = {}) => API.get('/executions', { params }),
     createExecution: (executionData) => API.post('/executions', executionData),
     getExecution: (id) => API.get(`/executions/${id}`),
+    getExecutionLog: (id, offset = 0, limit) => API.get(`/executions/${id}/log`, { params: { offset, limit } }),
     cancelExecution: (id) => API.post(`/executions/${id}/cancel`),
 
     // Inventory
     getImports: () => API.get('/inventory/imports'),
-    uploadInventory: (file) => {
+    uploadInventory: (file, mode = 'import') => {
         const formData = new FormData();
         formData.append('file', file);
+        formData.append('mode', mode);
         return API.post('/inventory/upload', formData, {
             headers: { 'Content-Type': 'multipart/form-data' }
         });
     },
-    pasteInventory: (content, format) => API.post('/inventory/paste', { content, format }),
+    pasteInventory: (content, format, mode = 'import') => API.post('/inventory/paste', { content, format, mode }),
+    getImportPreview: (importId, offset, limit) => API.get(`/inventory/imports/${importId}/preview`, { params: { offset, limit } }),
     executeImport: (importId) => API.post(`/inventory/imports/${importId}/execute`),
     rollbackImport: (importId) => API.post(`/inventory/imports/${importId}/rollback`)
 };
@@ -6,6 +6,8 @@ export class ExecutionsComponent {
     constructor() {
         this.executions = [];
         this.currentExecution = null;
+        this.nextCursor = null;
+        this.statusFilter = '';
     }
 
     async render() {
@@ -14,6 +16,15 @@ export class ExecutionsComponent {
                 <div class="card-header">
                     <h3 class="card-title">Execution History</h3>
                     <div class="d-flex gap-2">
+                        <select class="form-control" onchange="executionsComponent.filterByStatus(this.value)">
+                            <option value="">All statuses</option>
+                            <option value="pending">Pending</option>
+                            <option value="running">Running</option>
+                            <option value="cancelling">Cancelling</option>
+                            <option value="completed">Completed</option>
+                            <option value="failed">Failed</option>
+                            <option value="cancelled">Cancelled</option>
+                        </select>
                         <button class="btn btn-primary" onclick="executionsComponent.showExecutionModal()">
                             <i class="fas fa-play"></i> New Execution
                         </button>
@@ -48,6 +59,11 @@ export class ExecutionsComponent {
                             </tbody>
                         </table>
                     </div>
+                    <div class="text-center">
+                        <button id="executionsLoadMore" class="btn btn-secondary hidden" onclick="executionsComponent.loadMoreExecutions()">
+                            Load More
+                        </button>
+                    </div>
                 </div>
             </div>
         `;
@@ -60,8 +76,9 @@ export class ExecutionsComponent {
 
     async loadExecutions() {
         try {
-            const response = await api.getExecutions();
-            this.executions = response.data;
+            const response = await api.getExecutions(this.listParams());
+            this.executions = response.data.executions;
+            this.nextCursor = response.data.next_cursor;
             this.renderExecutions();
         } catch (error) {
             showToast('Failed to load executions', 'error');
@@ -69,8 +86,32 @@ export class ExecutionsComponent {
         }
     }
 
+    async loadMoreExecutions() {
+        if (!this.nextCursor) return;
+
+        try {
+            const response = await api.getExecutions({ ...this.listParams(), cursor: this.nextCursor });
+            this.executions = this.executions.concat(response.data.executions);
+            this.nextCursor = response.data.next_cursor;
+            this.renderExecutions();
+        } catch (error) {
+            showToast('Failed to load executions', 'error');
+            console.error(error);
+        }
+    }
+
+    listParams() {
+        return this.statusFilter ? { status: this.statusFilter } : {};
+    }
+
+    async filterByStatus(status) {
+        this.statusFilter = status;
+        await this.loadExecutions();
+    }
+
     renderExecutions() {
         const tbody = document.getElementById('executionsTableBody');
+        document.getElementById('executionsLoadMore').classList.toggle('hidden', !this.nextCursor);
         
         if (this.executions.length === 0) {
             tbody.innerHTML = `
@@ -105,7 +146,7 @@ export class ExecutionsComponent {
                 <td>${this.formatDate(execution.started_at)}</td>
                 <td>
                     <span id="executionDuration-${execution.id}">
-                        ${execution.duration || (execution.status === 'running' ? 'Running...' : '-')}
+                        ${execution.duration || this.formatPendingState(execution)}
                     </span>
                 </td>
                 <td>
@@ -118,12 +159,12 @@ export class ExecutionsComponent {
                                 <i class="fas fa-stop"></i>
                             </button>
                         ` : ''}
-                        ${execution.status === 'completed' && execution.output ? `
+                        ${execution.status === 'completed' && execution.has_output ? `
                             <button class="btn btn-sm btn-success" onclick="executionsComponent.showOutput(${execution.id})" title="View Output">
                                 <i class="fas fa-terminal"></i>
                             </button>
                         ` : ''}
-                        ${execution.error_output ? `
+                        ${execution.has_errors ? `
                             <button class="btn btn-sm btn-warning" onclick="executionsComponent.showErrors(${execution.id})" title="View Errors">
                                 <i class="fas fa-exclamation-triangle"></i>
                             </button>
@@ -137,17 +178,29 @@ export class ExecutionsComponent {
     setupSocketListeners() {
         Socket.on('execution_status', (data) => {
             this.updateExecutionStatus(data.execution_id, data.status);
-            showToast(data.message, data.status === 'running' ? 'info' : 'success');
+            showToast(data.message, data.status === 'running' || data.status === 'cancelling' ? 'info' : 'success');
         });
 
         Socket.on('execution_progress', (data) => {
-            showToast(`Executing: ${data.current_playbook}`, 'info');
+            const level = data.playbook_status === 'failed' || data.playbook_status === 'skipped' ? 'warning' : 'info';
+            showToast(data.message, level);
+        });
+
+        Socket.on('execution_events', (data) => {
+            const log = document.getElementById(`liveEvents-${data.execution_id}`);
+            if (!log) return;
+            log.textContent += data.events.map(event => this.formatEvent(event)).join('\n') + '\n';
+            log.scrollTop = log.scrollHeight;
         });
 
         Socket.on('execution_complete', (data) => {
             this.updateExecutionStatus(data.execution_id, data.status);
-            const message = data.status === 'completed' ? 'Execution completed successfully' : 'Execution failed';
-            const type = data.status === 'completed' ? 'success' : 'error';
+            const messages = {
+                completed: 'Execution completed successfully',
+                cancelled: 'Execution cancelled'
+            };
+            const message = messages[data.status] || 'Execution failed';
+            const type = data.status === 'completed' ? 'success' : data.status === 'cancelled' ? 'warning' : 'error';
             showToast(message, type);
             
             // Reload to get updated data
@@ -161,6 +214,21 @@ export class ExecutionsComponent {
         });
     }
 
+    formatEvent(event) {
+        if (event.type === 'task_start') {
+            return `TASK [${event.task}] (${event.playbook} / ${event.play})`;
+        }
+        if (event.type === 'host_result') {
+            return `  ${event.status}: [${event.host}]${event.msg ? ` ${event.msg}` : ''}`;
+        }
+        if (event.type === 'recap') {
+            return `RECAP ${event.playbook}\n` + Object.entries(event.stats).map(([host, counts]) =>
+                `  ${host}: ` + Object.entries(counts).map(([key, value]) => `${key}=${value}`).join(' ')
+            ).join('\n');
+        }
+        return '';
+    }
+
     updateExecutionStatus(executionId, status) {
         const statusElement = document.getElementById(`executionStatus-${executionId}`);
         if (statusElement) {
@@ -169,8 +237,18 @@ export class ExecutionsComponent {
         }
     }
 
+    formatPendingState(execution) {
+        if (execution.status === 'running') return 'Running...';
+        if (execution.status === 'cancelling') return 'Stopping...';
+        if (execution.status === 'pending' && execution.queue_position) {
+            const waited = Math.max(Math.round((Date.now() - new Date(`${execution.queued_at}Z`)) / 1000), 0);
+            return `Queued #${execution.queue_position} (${waited}s)`;
+        }
+        return '-';
+    }
+
     formatDate(dateString) {
-        return new Date(dateString).toLocaleString();
+        return dateString ? new Date(dateString).toLocaleString() : '-';
     }
 
     async showExecutionModal(selectedPlaybooks = [], selectedNodes = [], selectedGroups = []) {
@@ -240,6 +318,34 @@ export class ExecutionsComponent {
                             ${groups.length === 0 ? '<p class="text-muted">No groups available</p>' : ''}
                         </div>
 
+                        <div class="form-group">
+                            <label for="executionPriority">Priority:</label>
+                            <input type="number" id="executionPriority" name="priority" class="form-control" value="0">
+                        </div>
+
+                        <div class="form-group">
+                            <label for="executionMode">Mode:</label>
+                            <select id="executionMode" name="mode" class="form-control">
+                                <option value="sequential">Sequential (one playbook at a time)</option>
+                                <option value="parallel">Parallel (all playbooks at once)</option>
+                            </select>
+                        </div>
+
+                        <div class="form-group">
+                            <label for="executionShards">Shards per batch:</label>
+                            <input type="number" id="executionShards" name="shard_count" class="form-control" value="1" min="1">
+                        </div>
+
+                        <div class="form-group">
+                            <label for="executionBatchSize">Rolling batch size (hosts, blank for all):</label>
+                            <input type="number" id="executionBatchSize" name="batch_size" class="form-control" min="1">
+                        </div>
+
+                        <div class="form-group">
+                            <label for="executionMaxFail">Max fail percentage per batch:</label>
+                            <input type="number" id="executionMaxFail" name="max_fail_percentage" class="form-control" min="0" max="100">
+                        </div>
+
                         <div class="modal-footer">
                             <button type="button" class="btn btn-secondary" onclick="this.closest('.modal').remove()">Cancel</button>
                             <button type="submit" class="btn btn-success">
@@ -274,11 +380,16 @@ export class ExecutionsComponent {
                     const executionData = {
                         playbooks,
                         target_nodes: nodeIds.length > 0 ? nodeIds : null,
-                        target_groups: groupIds.length > 0 ? groupIds : null
+                        target_groups: groupIds.length > 0 ? groupIds : null,
+                        priority: parseInt(formData.get('priority')) || 0,
+                        mode: formData.get('mode'),
+                        shard_count: parseInt(formData.get('shard_count')) || 1,
+                        batch_size: parseInt(formData.get('batch_size')) || null,
+                        max_fail_percentage: formData.get('max_fail_percentage') !== '' ? parseFloat(formData.get('max_fail_percentage')) : null
                     };
 
                     await api.createExecution(executionData);
-                    showToast('Execution started successfully', 'success');
+                    showToast('Execution queued successfully', 'success');
                     modal.remove();
                     await this.loadExecutions();
                 } catch (error) {
@@ -313,6 +424,12 @@ export class ExecutionsComponent {
                                         <label>Status:</label>
                                         <span class="status ${execution.status}">${execution.status}</span>
                                     </div>
+                                    ${execution.queue_position ? `
+                                        <div class="detail-row">
+                                            <label>Queue Position:</label>
+                                            <span>#${execution.queue_position}</span>
+                                        </div>
+                                    ` : ''}
                                     <div class="detail-row">
                                         <label>Started:</label>
                                         <span>${this.formatDate(execution.started_at)}</span>
@@ -337,6 +454,20 @@ export class ExecutionsComponent {
                                 <div class="playbook-tags">
                                     ${execution.playbooks.map(pb => `<span class="badge">${pb}</span>`).join('')}
                                 </div>
+                                ${execution.playbook_results ? `
+                                    <div class="detail-grid">
+                                        ${execution.playbooks.filter(pb => execution.playbook_results[pb]).map(pb => {
+                                            const result = execution.playbook_results[pb];
+                                            return `
+                                                <div class="detail-row">
+                                                    <label>${pb}:</label>
+                                                    <span class="status ${result.status}">${result.status}</span>
+                                                    ${result.duration != null ? `<span>${result.duration}s</span>` : ''}
+                                                </div>
+                                            `;
+                                        }).join('')}
+                                    </div>
+                                ` : ''}
                             </div>
 
                             ${execution.target_nodes ? `
@@ -353,10 +484,19 @@ export class ExecutionsComponent {
                                 </div>
                             ` : ''}
 
-                            ${execution.output ? `
+                            ${['pending', 'running'].includes(execution.status) ? `
+                                <div class="detail-section">
+                                    <h4>Live Events</h4>
+                                    <pre class="execution-output" id="liveEvents-${execution.id}"></pre>
+                                </div>
+                            ` : ''}
+
+                            ${execution.has_output ? `
                                 <div class="detail-section">
                                     <h4>Output</h4>
-                                    <pre class="execution-output">${execution.output}</pre>
+                                    <button class="btn btn-sm btn-secondary" onclick="executionsComponent.showOutput(${execution.id})">
+                                        <i class="fas fa-terminal"></i> View Output
+                                    </button>
                                 </div>
                             ` : ''}
 
@@ -389,8 +529,10 @@ export class ExecutionsComponent {
         if (!confirm('Are you sure you want to cancel this execution?')) return;
 
         try {
-            await api.cancelExecution(executionId);
-            showToast('Execution cancelled', 'success');
+            const response = await api.cancelExecution(executionId);
+            // A running execution stops asynchronously; execution_cancelled follows once it has
+            const cancelling = response.data.status === 'cancelling';
+            showToast(cancelling ? 'Cancelling execution...' : 'Execution cancelled', cancelling ? 'info' : 'success');
             await this.loadExecutions();
         } catch (error) {
             showToast(error.response?.data?.message || 'Failed to cancel execution', 'error');
@@ -399,27 +541,52 @@ export class ExecutionsComponent {
 
     async showOutput(executionId) {
         try {
-            const response = await api.getExecution(executionId);
-            const execution = response.data;
+            const response = await api.getExecutionLog(executionId);
+            const log = response.data;
 
             const modal = document.createElement('div');
             modal.className = 'modal';
             modal.innerHTML = `
                 <div class="modal-content large">
                     <div class="modal-header">
-                        <h3 class="modal-title">Execution Output #${execution.id}</h3>
+                        <h3 class="modal-title">Execution Output #${executionId}</h3>
                         <button class="modal-close" onclick="this.closest('.modal').remove()">×</button>
                     </div>
                     <div class="modal-body">
-                        <pre class="execution-output">${execution.output || 'No output available'}</pre>
+                        <pre class="execution-output" id="executionLog-${executionId}"></pre>
                     </div>
                     <div class="modal-footer">
+                        <button class="btn btn-secondary hidden" id="executionLogMore-${executionId}">Load More</button>
                         <button class="btn btn-secondary" onclick="this.closest('.modal').remove()">Close</button>
                     </div>
                 </div>
             `;
 
             document.body.appendChild(modal);
+
+            const output = document.getElementById(`executionLog-${executionId}`);
+            const moreButton = document.getElementById(`executionLogMore-${executionId}`);
+            let nextOffset = 0;
+
+            const appendPage = (page) => {
+                output.textContent += page.content;
+                nextOffset = page.next_offset;
+                moreButton.classList.toggle('hidden', page.next_offset >= page.size);
+            };
+
+            appendPage(log);
+            if (!output.textContent) {
+                output.textContent = 'No output available';
+            }
+
+            moreButton.addEventListener('click', async () => {
+                try {
+                    const page = await api.getExecutionLog(executionId, nextOffset);
+                    appendPage(page.data);
+                } catch (error) {
+                    showToast('Failed to load more output', 'error');
+                }
+            });
         } catch (error) {
             showToast('Failed to load execution output', 'error');
         }
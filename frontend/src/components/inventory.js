@@ -1,5 +1,6 @@
 import { api } from '../api.js';
 import { showToast } from '../utils/notifications.js';
+import { Socket } from '../utils/socket.js';
 
 export class InventoryComponent {
     constructor() {
@@ -71,6 +72,26 @@ export class InventoryComponent {
 
     async init() {
         await this.loadImports();
+        this.setupSocketListeners();
+    }
+
+    setupSocketListeners() {
+        Socket.on('import_progress', (data) => {
+            const status = document.getElementById(`importStatus-${data.import_id}`);
+            if (!status) return;
+            const percent = data.total ? Math.floor(data.processed / data.total * 100) : 0;
+            const eta = data.eta != null ? `, ETA ${Math.ceil(data.eta)}s` : '';
+            status.textContent = `running ${percent}% (${data.processed}/${data.total}${eta})`;
+        });
+
+        Socket.on('import_complete', async (data) => {
+            if (data.status === 'completed') {
+                showToast(`Import completed: ${data.created_nodes} nodes, ${data.created_groups} groups created`, 'success');
+            } else {
+                showToast(`Import failed: ${data.error}`, 'error');
+            }
+            await this.loadImports();
+        });
     }
 
     async loadImports() {
@@ -103,21 +124,23 @@ export class InventoryComponent {
                 <td><strong>${imp.filename}</strong></td>
                 <td>
                     <span class="badge">${imp.format.toUpperCase()}</span>
+                    ${imp.mode === 'sync' ? '<span class="badge">SYNC</span>' : ''}
                 </td>
                 <td>${imp.total_nodes}</td>
                 <td>${imp.total_groups}</td>
                 <td>
-                    <span class="status ${imp.status}">${imp.status}</span>
+                    <span class="status ${imp.status}" id="importStatus-${imp.id}">${imp.status}</span>
                 </td>
                 <td>${this.formatDate(imp.created_at)}</td>
                 <td>
                     <div class="d-flex gap-2">
-                        ${imp.status === 'pending' ? `
-                            <button class="btn btn-sm btn-success" onclick="inventoryComponent.executeImport(${imp.id})" title="Execute Import">
+                        ${imp.status === 'pending' || imp.status === 'failed' ? `
+                            <button class="btn btn-sm btn-success" onclick="inventoryComponent.executeImport(${imp.id})"
+                                    title="${imp.status === 'failed' ? 'Resume Import' : 'Execute Import'}">
                                 <i class="fas fa-play"></i>
                             </button>
                         ` : ''}
-                        ${imp.status === 'completed' ? `
+                        ${imp.status === 'completed' || imp.status === 'failed' ? `
                             <button class="btn btn-sm btn-warning" onclick="inventoryComponent.rollbackImport(${imp.id})" title="Rollback">
                                 <i class="fas fa-undo"></i>
                             </button>
@@ -154,6 +177,13 @@ export class InventoryComponent {
                     <h3 class="modal-title">Upload Inventory File</h3>
                     <button class="modal-close" onclick="this.closest('.modal').remove()">×</button>
                 </div>
+                <div class="form-group">
+                    <label for="inventoryUploadMode">Mode:</label>
+                    <select id="inventoryUploadMode" name="mode" class="form-control">
+                        <option value="import">Import - add new hosts only</option>
+                        <option value="sync">Sync - make nodes match this inventory</option>
+                    </select>
+                </div>
                 <div class="file-upload" id="inventoryFileUpload">
                     <input type="file" id="inventoryFileInput" accept=".yml,.yaml,.ini,.json">
                     <div class="file-upload-icon">
@@ -205,7 +235,8 @@ export class InventoryComponent {
         uploadStatus.textContent = 'Uploading and parsing...';
 
         try {
-            const response = await api.uploadInventory(file);
+            const mode = document.getElementById('inventoryUploadMode').value;
+            const response = await api.uploadInventory(file, mode);
             const data = response.data;
 
             showToast('Inventory file uploaded successfully', 'success');
@@ -240,6 +271,13 @@ export class InventoryComponent {
                             <option value="json">JSON</option>
                         </select>
                     </div>
+                    <div class="form-group">
+                        <label for="inventoryPasteMode">Mode:</label>
+                        <select id="inventoryPasteMode" name="mode" class="form-control">
+                            <option value="import">Import - add new hosts only</option>
+                            <option value="sync">Sync - make nodes match this inventory</option>
+                        </select>
+                    </div>
                     <div class="form-group">
                         <label for="inventoryContent">Content:</label>
                         <textarea id="inventoryContent" name="content" class="form-control code-editor" 
@@ -260,9 +298,10 @@ export class InventoryComponent {
             const formData = new FormData(e.target);
             const content = formData.get('content');
             const format = formData.get('format');
+            const mode = formData.get('mode');
 
             try {
-                const response = await api.pasteInventory(content, format);
+                const response = await api.pasteInventory(content, format, mode);
                 const data = response.data;
 
                 showToast('Inventory content parsed successfully', 'success');
@@ -287,6 +326,11 @@ export class InventoryComponent {
         previewTab.disabled = false;
         previewTab.click();
 
+        if (data.preview.sync) {
+            previewContent.innerHTML = this.renderSyncPreview(data);
+            return;
+        }
+
         previewContent.innerHTML = `
             <div class="preview-header">
                 <h4>Import Preview</h4>
@@ -298,7 +342,7 @@ export class InventoryComponent {
             
             <div class="preview-sections">
                 <div class="preview-section">
-                    <h5>Nodes (${data.preview.nodes.length})</h5>
+                    <h5>Nodes (showing <span id="previewNodeCount">${data.preview.nodes.length}</span> of ${data.preview.total_nodes})</h5>
                     ${data.preview.nodes.length > 0 ? `
                         <div class="table-responsive">
                             <table class="table table-sm">
@@ -310,18 +354,17 @@ export class InventoryComponent {
                                         <th>Port</th>
                                     </tr>
                                 </thead>
-                                <tbody>
-                                    ${data.preview.nodes.map(node => `
-                                        <tr>
-                                            <td>${node.name}</td>
-                                            <td>${node.hostname}</td>
-                                            <td>${node.username}</td>
-                                            <td>${node.port}</td>
-                                        </tr>
-                                    `).join('')}
+                                <tbody id="previewNodeRows">
+                                    ${this.renderPreviewRows(data.preview.nodes)}
                                 </tbody>
                             </table>
                         </div>
+                        ${data.preview.nodes.length < data.preview.total_nodes ? `
+                            <button class="btn btn-secondary" id="previewLoadMore"
+                                    onclick="inventoryComponent.loadMorePreview(${data.import_id})">
+                                Load More
+                            </button>
+                        ` : ''}
                     ` : '<p class="text-muted">No nodes found</p>'}
                 </div>
                 
@@ -332,7 +375,7 @@ export class InventoryComponent {
                             ${Object.entries(data.preview.groups).map(([groupName, groupData]) => `
                                 <div class="group-preview">
                                     <strong>${groupName}</strong>
-                                    <span class="text-muted">(${groupData.nodes.length} nodes)</span>
+                                    <span class="text-muted">(${groupData.node_count} nodes)</span>
                                 </div>
                             `).join('')}
                         </div>
@@ -351,12 +394,92 @@ export class InventoryComponent {
         `;
     }
 
+    renderSyncPreview(data) {
+        const diff = data.preview;
+        const totals = diff.totals;
+        const section = (title, total, rows, render) => `
+            <div class="preview-section">
+                <h5>${title} (${rows.length < total ? `showing ${rows.length} of ${total}` : total})</h5>
+                ${rows.length > 0 ? `
+                    <div class="groups-preview">
+                        ${rows.map(row => `<div class="group-preview">${render(row)}</div>`).join('')}
+                    </div>
+                ` : '<p class="text-muted">None</p>'}
+            </div>
+        `;
+        const fields = (values) => `${values.username}@${values.port}, ${values.name}`;
+
+        return `
+            <div class="preview-header">
+                <h4>Sync Preview</h4>
+                <div class="preview-stats">
+                    <span class="badge">+${totals.added} Added</span>
+                    <span class="badge">~${totals.changed} Changed</span>
+                    <span class="badge">-${totals.removed} Removed</span>
+                    <span class="badge">+${totals.groups_added} Groups</span>
+                    <span class="badge">+${totals.memberships_added} / -${totals.memberships_removed} Memberships</span>
+                </div>
+            </div>
+            
+            <div class="preview-sections">
+                ${section('Added nodes', totals.added, diff.added, node =>
+                    `<strong>${node.hostname}</strong> <span class="text-muted">${fields(node)}</span>`)}
+                ${section('Changed nodes', totals.changed, diff.changed, change =>
+                    `<strong>${change.hostname}</strong> <span class="text-muted">${fields(change.before)} &rarr; ${fields(change.after)}</span>`)}
+                ${section('Removed nodes', totals.removed, diff.removed, node =>
+                    `<strong>${node.hostname}</strong> <span class="text-muted">${node.name}</span>`)}
+                ${section('New groups', totals.groups_added, diff.groups_added, name => `<strong>${name}</strong>`)}
+                ${section('Memberships added', totals.memberships_added, diff.memberships_added, m =>
+                    `<strong>${m.hostname}</strong> &rarr; ${m.group}`)}
+                ${section('Memberships removed', totals.memberships_removed, diff.memberships_removed, m =>
+                    `node #${m.node_id} &larr; ${m.group}`)}
+            </div>
+            
+            <div class="preview-actions">
+                <button class="btn btn-success" onclick="inventoryComponent.executeImport(${data.import_id})">
+                    <i class="fas fa-check"></i> Apply Sync
+                </button>
+                <button class="btn btn-secondary" onclick="inventoryComponent.showTab('imports')">
+                    Cancel
+                </button>
+            </div>
+        `;
+    }
+
+    renderPreviewRows(nodes) {
+        return nodes.map(node => `
+            <tr>
+                <td>${node.name}</td>
+                <td>${node.hostname}</td>
+                <td>${node.username}</td>
+                <td>${node.port}</td>
+            </tr>
+        `).join('');
+    }
+
+    async loadMorePreview(importId) {
+        const preview = this.currentPreview.preview;
+        try {
+            const response = await api.getImportPreview(importId, preview.nodes.length, preview.limit);
+            const page = response.data.preview;
+            preview.nodes = preview.nodes.concat(page.nodes);
+
+            document.getElementById('previewNodeRows').insertAdjacentHTML('beforeend', this.renderPreviewRows(page.nodes));
+            document.getElementById('previewNodeCount').textContent = preview.nodes.length;
+            if (preview.nodes.length >= page.total_nodes || page.nodes.length === 0) {
+                document.getElementById('previewLoadMore').remove();
+            }
+        } catch (error) {
+            showToast(error.response?.data?.message || 'Failed to load preview', 'error');
+        }
+    }
+
     async executeImport(importId) {
         if (!confirm('Are you sure you want to execute this import? This will create new nodes and groups.')) return;
 
         try {
             const response = await api.executeImport(importId);
-            showToast(response.data.message, 'success');
+            showToast(response.data.message, 'info');
             await this.loadImports();
             
             // Clear preview if this was the current preview
@@ -28,6 +28,12 @@ export class NodesComponent {
                         <span class="selection-info">
                             <span id="selectedNodeCount">0</span> node(s) selected
                         </span>
+                        <button class="btn btn-success btn-sm" onclick="nodesComponent.probeSelected()">
+                            <i class="fas fa-bolt"></i> Quick Probe
+                        </button>
+                        <button class="btn btn-secondary btn-sm" onclick="nodesComponent.refreshFactsSelected()">
+                            <i class="fas fa-sync"></i> Refresh Facts
+                        </button>
                         <button class="btn btn-warning btn-sm" onclick="nodesComponent.addToGroupModal()">
                             <i class="fas fa-users"></i> Add to Group
                         </button>
@@ -158,22 +164,44 @@ export class NodesComponent {
 
     setupSocketListeners() {
         Socket.on('node_ping_result', (data) => {
-            const statusElement = document.getElementById(`nodeStatus${data.node_id}`);
-            if (statusElement) {
-                statusElement.textContent = data.status;
-                statusElement.className = `status ${data.status}`;
-            }
-            
-            // Update local data
-            const node = this.nodes.find(n => n.id === data.node_id);
-            if (node) {
-                node.status = data.status;
+            // Bulk pings deliver results in batches
+            if (data.results) {
+                data.results.forEach(result => this.updateNodeStatus(result.node_id, result.status));
+                const failed = data.results.find(result => result.error);
+                if (failed) {
+                    showToast(failed.error, 'error');
+                    return;
+                }
+                const reachable = data.results.filter(result => result.success).length;
+                showToast(`${reachable}/${data.results.length} node(s) reachable`, 'info');
+                return;
             }
+
+            this.updateNodeStatus(data.node_id, data.status);
             
             const message = data.success ? 'Node is reachable' : 'Node is unreachable';
             const type = data.success ? 'success' : 'warning';
             showToast(message, type);
         });
+
+        Socket.on('node_facts_refreshed', (data) => {
+            const type = data.failed.length ? 'warning' : 'success';
+            showToast(`Facts refreshed for ${data.gathered}/${data.host_count} host(s)`, type);
+        });
+    }
+
+    updateNodeStatus(nodeId, status) {
+        const statusElement = document.getElementById(`nodeStatus${nodeId}`);
+        if (statusElement) {
+            statusElement.textContent = status;
+            statusElement.className = `status ${status}`;
+        }
+        
+        // Update local data
+        const node = this.nodes.find(n => n.id === nodeId);
+        if (node) {
+            node.status = status;
+        }
     }
 
     toggleSelection(nodeId, checkbox) {
@@ -218,6 +246,31 @@ export class NodesComponent {
         this.updateSelectionUI();
     }
 
+    connectionFields(prefix, node = {}) {
+        // Blank values fall back to the server's SSH connection profile
+        const pipelining = node.ssh_pipelining === true ? 'true' : node.ssh_pipelining === false ? 'false' : '';
+        return `
+            <div class="form-group">
+                <label for="${prefix}Pipelining">SSH Pipelining:</label>
+                <select id="${prefix}Pipelining" name="ssh_pipelining" class="form-control">
+                    <option value="" ${pipelining === '' ? 'selected' : ''}>Default</option>
+                    <option value="true" ${pipelining === 'true' ? 'selected' : ''}>On</option>
+                    <option value="false" ${pipelining === 'false' ? 'selected' : ''}>Off</option>
+                </select>
+            </div>
+            <div class="form-group">
+                <label for="${prefix}ControlPersist">ControlPersist (seconds):</label>
+                <input type="number" min="0" id="${prefix}ControlPersist" name="ssh_control_persist" class="form-control"
+                       placeholder="Default" value="${node.ssh_control_persist ?? ''}">
+            </div>
+            <div class="form-group">
+                <label for="${prefix}SshExtraArgs">Extra SSH Arguments:</label>
+                <input type="text" id="${prefix}SshExtraArgs" name="ssh_extra_args" class="form-control"
+                       placeholder="-o ProxyJump=bastion" value="${node.ssh_extra_args || ''}">
+            </div>
+        `;
+    }
+
     showCreateModal() {
         const modal = document.createElement('div');
         modal.className = 'modal';
@@ -248,6 +301,7 @@ export class NodesComponent {
                         <label for="nodeDescription">Description:</label>
                         <textarea id="nodeDescription" name="description" class="form-control" rows="3"></textarea>
                     </div>
+                    ${this.connectionFields('node')}
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" onclick="this.closest('.modal').remove()">Cancel</button>
                         <button type="submit" class="btn btn-primary">Add Node</button>
@@ -307,6 +361,7 @@ export class NodesComponent {
                         <label for="editNodeDescription">Description:</label>
                         <textarea id="editNodeDescription" name="description" class="form-control" rows="3">${node.description || ''}</textarea>
                     </div>
+                    ${this.connectionFields('editNode', node)}
                     <div class="modal-footer">
                         <button type="button" class="btn btn-secondary" onclick="this.closest('.modal').remove()">Cancel</button>
                         <button type="submit" class="btn btn-primary">Update Node</button>
@@ -384,15 +439,34 @@ export class NodesComponent {
             return;
         }
 
-        for (const nodeId of this.selectedNodes) {
-            try {
-                await api.pingNode(nodeId);
-            } catch (error) {
-                console.error(`Failed to ping node ${nodeId}:`, error);
-            }
+        try {
+            await api.pingNodes({ node_ids: Array.from(this.selectedNodes) });
+            showToast(`Pinging ${this.selectedNodes.size} node(s)`, 'info');
+        } catch (error) {
+            showToast('Failed to start ping', 'error');
+        }
+    }
+
+    async probeSelected() {
+        if (this.selectedNodes.size === 0) return;
+
+        try {
+            await api.probeNodes({ node_ids: Array.from(this.selectedNodes) });
+            showToast(`Probing ${this.selectedNodes.size} node(s)`, 'info');
+        } catch (error) {
+            showToast('Failed to start probe', 'error');
+        }
+    }
+
+    async refreshFactsSelected() {
+        if (this.selectedNodes.size === 0) return;
+
+        try {
+            await api.refreshNodeFacts({ node_ids: Array.from(this.selectedNodes) });
+            showToast(`Gathering facts from ${this.selectedNodes.size} node(s)`, 'info');
+        } catch (error) {
+            showToast('Failed to start fact refresh', 'error');
         }
-        
-        showToast(`Pinging ${this.selectedNodes.size} node(s)`, 'info');
     }
 
     addToGroupModal() {
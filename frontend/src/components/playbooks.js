@@ -36,6 +36,15 @@ export class PlaybooksComponent {
                             Clear Selection
                         </button>
                     </div>
+                    <div class="d-flex gap-2 playbook-filters">
+                        <input type="text" id="playbookSearch" class="form-control" placeholder="Search playbooks and plays...">
+                        <select id="playbookHostFilter" class="form-control">
+                            <option value="">All host patterns</option>
+                        </select>
+                        <select id="playbookRoleFilter" class="form-control">
+                            <option value="">All roles</option>
+                        </select>
+                    </div>
                     <div class="table-responsive">
                         <table class="table">
                             <thead>
@@ -47,6 +56,8 @@ export class PlaybooksComponent {
                                         </label>
                                     </th>
                                     <th>Name</th>
+                                    <th>Hosts</th>
+                                    <th>Tasks</th>
                                     <th>Size</th>
                                     <th>Modified</th>
                                     <th>Actions</th>
@@ -54,7 +65,7 @@ export class PlaybooksComponent {
                             </thead>
                             <tbody id="playbooksTableBody">
                                 <tr>
-                                    <td colspan="5" class="text-center">
+                                    <td colspan="7" class="text-center">
                                         <div class="loading">
                                             <i class="fas fa-spinner fa-spin"></i>
                                             <span>Loading playbooks...</span>
@@ -76,22 +87,53 @@ export class PlaybooksComponent {
 
     async loadPlaybooks() {
         try {
-            const response = await api.getPlaybooks();
+            const response = await api.getPlaybooks(this.currentFilters());
             this.playbooks = response.data;
             this.renderPlaybooks();
+            await this.loadFacets();
         } catch (error) {
             showToast('Failed to load playbooks', 'error');
             console.error(error);
         }
     }
 
+    currentFilters() {
+        const params = {};
+        const search = document.getElementById('playbookSearch')?.value.trim();
+        const host = document.getElementById('playbookHostFilter')?.value;
+        const role = document.getElementById('playbookRoleFilter')?.value;
+        if (search) params.q = search;
+        if (host) params.host = host;
+        if (role) params.role = role;
+        return params;
+    }
+
+    async loadFacets() {
+        try {
+            const facets = (await api.getPlaybookFacets()).data;
+            const fill = (id, values, label) => {
+                const select = document.getElementById(id);
+                if (!select) return;
+                const selected = select.value;
+                select.innerHTML = `<option value="">${label}</option>` + Object.entries(values)
+                    .sort(([a], [b]) => a.localeCompare(b))
+                    .map(([value, count]) => `<option value="${value}" ${value === selected ? 'selected' : ''}>${value} (${count})</option>`)
+                    .join('');
+            };
+            fill('playbookHostFilter', facets.hosts, 'All host patterns');
+            fill('playbookRoleFilter', facets.roles, 'All roles');
+        } catch (error) {
+            console.error(error);
+        }
+    }
+
     renderPlaybooks() {
         const tbody = document.getElementById('playbooksTableBody');
         
         if (this.playbooks.length === 0) {
             tbody.innerHTML = `
                 <tr>
-                    <td colspan="5" class="text-center text-muted">
+                    <td colspan="7" class="text-center text-muted">
                         No playbooks found. Create or upload your first playbook.
                     </td>
                 </tr>
@@ -110,7 +152,11 @@ export class PlaybooksComponent {
                 </td>
                 <td>
                     <strong>${playbook.name}</strong>
+                    ${playbook.syntax.status === 'invalid' ? `<span class="status failed" title="${(playbook.syntax.error || '').replace(/"/g, '&quot;')}">invalid</span>` : ''}
+                    ${playbook.syntax.status === 'pending' ? '<span class="status pending">checking</span>' : ''}
                 </td>
+                <td>${playbook.hosts.join(', ')}</td>
+                <td>${playbook.task_count}${playbook.role_count ? ` + ${playbook.role_count} role(s)` : ''}</td>
                 <td>${this.formatFileSize(playbook.size)}</td>
                 <td>${this.formatDate(playbook.modified)}</td>
                 <td>
@@ -306,8 +352,10 @@ export class PlaybooksComponent {
 
     async editPlaybook(filename) {
         try {
-            const response = await api.getPlaybook(filename);
-            const content = response.data.content;
+            const response = await api.getPlaybookRaw(filename);
+            const content = response.data;
+            // Sent back as If-Match so a save can't overwrite someone else's newer edit
+            const etag = response.headers.etag;
 
             const modal = document.createElement('div');
             modal.className = 'modal';
@@ -339,7 +387,7 @@ export class PlaybooksComponent {
                 const content = formData.get('content');
 
                 try {
-                    await api.updatePlaybook(filename, content);
+                    await api.updatePlaybook(filename, content, etag);
                     showToast('Playbook updated successfully', 'success');
                     modal.remove();
                     await this.loadPlaybooks();
@@ -398,6 +446,14 @@ export class PlaybooksComponent {
     }
 
     setupEventListeners() {
+        let searchTimer;
+        document.getElementById('playbookSearch').addEventListener('input', () => {
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(() => this.loadPlaybooks(), 250);
+        });
+        document.getElementById('playbookHostFilter').addEventListener('change', () => this.loadPlaybooks());
+        document.getElementById('playbookRoleFilter').addEventListener('change', () => this.loadPlaybooks());
+
         // Context menu for playbooks
         document.addEventListener('contextmenu', (e) => {
             const row = e.target.closest('#playbooksTableBody tr');
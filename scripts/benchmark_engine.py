@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Measure how the execution engine scales with host count, offline.
+
+Usage: python scripts/benchmark_engine.py [--hosts N ...] [--scenarios NAME ...]
+                                          [--forks N] [--shards N] [--output FILE]
+
+Each scenario runs in a fresh process against a throwaway SQLite database
+seeded with N synthetic nodes in groups of --group-size. Every host runs over
+the local connection, so nothing needs to be reachable:
+
+  inventory  compile the targeted inventory (cold), then fetch it again (cached)
+  ping       bulk ping through one forked ad-hoc run
+  playbook   a full execute_playbooks run of a small representative playbook
+
+Results are printed as one JSON document: wall time, controller CPU (this
+process plus ansible), peak RSS and engine events per second for every
+scenario and host count. Keep the output to compare engine changes against.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# The backend's ansible_runner.py shares its name with the ansible-runner package it
+# imports, so load the package before the backend is on the path
+import ansible_runner  # noqa: F401
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND)
+
+from flask import Flask
+from config import Config
+from models import db, Node, NodeGroup, PlaybookExecution, node_group_members
+from migrations import run_migrations
+from versioning import ensure_collection_versions
+
+SCENARIOS = ('inventory', 'ping', 'playbook')
+
+PLAYBOOK = """---
+- name: Benchmark
+  hosts: all
+  gather_facts: false
+  tasks:
+    - name: Run a command
+      command: /bin/true
+      changed_when: false
+    - name: Compute a value
+      set_fact:
+        bench_value: "{{ inventory_hostname | hash('sha1') }}"
+    - name: Write a file
+      copy:
+        content: "{{ bench_value }}"
+        dest: "{{ output_dir }}/{{ inventory_hostname }}"
+"""
+
+
+class EventCounter:
+    """Stands in for Flask-SocketIO and counts the events the engine would push to clients"""
+
+    def __init__(self):
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def emit(self, name, data=None, **kwargs):
+        if name == 'execution_events':
+            count = len(data['events'])
+        elif name == 'node_ping_result':
+            count = len(data.get('results', [data]))
+        else:
+            return
+        with self._lock:
+            self.events += count
+
+
+def load_engine():
+    spec = importlib.util.spec_from_file_location('engine', os.path.join(BACKEND, 'ansible_runner.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.AnsibleRunner
+
+
+def seed(hosts, group_size):
+    """Insert hosts nodes in groups of group_size and return the group IDs"""
+    db.session.execute(db.insert(Node), [
+        {'name': f'host{i:05d}', 'hostname': f'host{i:05d}.bench', 'username': 'bench', 'port': 22}
+        for i in range(hosts)
+    ])
+    group_count = (hosts + group_size - 1) // group_size
+    db.session.execute(db.insert(NodeGroup), [{'name': f'group{g:04d}'} for g in range(group_count)])
+    node_ids = [row.id for row in db.session.query(Node.id).order_by(Node.id)]
+    group_ids = [row.id for row in db.session.query(NodeGroup.id).order_by(NodeGroup.id)]
+    db.session.execute(node_group_members.insert(), [
+        {'node_id': node_id, 'group_id': group_ids[i // group_size]} for i, node_id in enumerate(node_ids)
+    ])
+    db.session.commit()
+    return group_ids
+
+
+def usage():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux; children is the largest ansible process
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / 1024, 1)
+
+
+def run_scenario(scenario, hosts, args):
+    """Run one scenario in this process and return its measurements"""
+    with tempfile.TemporaryDirectory(prefix='engine-bench-') as work_dir:
+        return _measure(scenario, hosts, args, work_dir)
+
+
+def _measure(scenario, hosts, args, work_dir):
+    playbook_dir = os.path.join(work_dir, 'playbooks')
+    output_dir = os.path.join(work_dir, 'output')
+    os.makedirs(playbook_dir)
+    os.makedirs(output_dir)
+    with open(os.path.join(playbook_dir, 'benchmark.yml'), 'w') as f:
+        f.write(PLAYBOOK.replace('{{ output_dir }}', output_dir))
+
+    # Every inventory host runs on the controller; ansible-runner passes this environment through
+    os.environ['ANSIBLE_TRANSPORT'] = 'local'
+    os.environ['ANSIBLE_PYTHON_INTERPRETER'] = sys.executable
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{os.path.join(work_dir, 'benchmark.db')}",
+        UPLOAD_FOLDER=playbook_dir,
+        INVENTORY_CACHE_FOLDER=os.path.join(work_dir, 'compiled'),
+        FACT_CACHE_BACKEND='jsonfile',
+        FACT_CACHE_FOLDER=os.path.join(work_dir, 'facts'),
+        SSH_CONTROL_PATH_DIR=os.path.join(work_dir, 'cp'),
+        EXECUTION_FORKS=args.forks,
+        PING_FORKS=args.forks
+    )
+    db.init_app(app)
+    counter = EventCounter()
+    runner = load_engine()(counter, app)
+
+    with app.app_context():
+        run_migrations(db.engine)
+        ensure_collection_versions()
+        group_ids = seed(hosts, args.group_size)
+
+        result = {'scenario': scenario, 'hosts': hosts, 'forks': args.forks}
+        cpu_before = usage()
+        started = time.perf_counter()
+
+        if scenario == 'inventory':
+            runner.inventory_cache.get(None, group_ids)
+            compiled = time.perf_counter()
+            runner.inventory_cache.get(None, group_ids)
+            result['compile_s'] = round(compiled - started, 4)
+            result['cached_s'] = round(time.perf_counter() - compiled, 4)
+        elif scenario == 'ping':
+            runner._run_bulk_ping([row.id for row in db.session.query(Node.id)], args.forks)
+            result['reachable'] = Node.query.filter_by(status='reachable').count()
+        else:
+            execution = PlaybookExecution(playbooks=['benchmark.yml'], target_groups=group_ids,
+                                          shard_count=args.shards, status='pending')
+            db.session.add(execution)
+            db.session.commit()
+
+            done = threading.Event()
+            runner.execute_playbooks(execution.id, on_complete=lambda _: done.set())
+            done.wait()
+            db.session.expire_all()
+            execution = PlaybookExecution.query.get(execution.id)
+            result['status'] = execution.status
+            result['shards'] = args.shards
+            result['tasks'] = PLAYBOOK.count('    - name:')
+            result['hosts_written'] = len(os.listdir(output_dir))
+
+        wall = time.perf_counter() - started
+        result.update(
+            wall_s=round(wall, 3),
+            cpu_s=round(usage() - cpu_before, 3),
+            peak_rss_mb=peak_rss_mb(),
+            events=counter.events,
+            events_per_s=round(counter.events / wall, 1) if wall else None
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, nargs='+', default=[10, 100, 1000, 5000])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--forks', type=int, default=Config.EXECUTION_FORKS)
+    parser.add_argument('--shards', type=int, default=1, help='shard_count for the playbook scenario')
+    parser.add_argument('--group-size', type=int, default=50)
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    parser.add_argument('--worker', nargs=2, metavar=('SCENARIO', 'HOSTS'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scenario(args.worker[0], int(args.worker[1]), args)))
+        return
+
+    results = []
+    for hosts in args.hosts:
+        for scenario in args.scenarios:
+            # A fresh process per measurement keeps CPU and peak RSS figures independent
+            command = [sys.executable, os.path.abspath(__file__), '--worker', scenario, str(hosts),
+                       '--forks', str(args.forks), '--shards', str(args.shards),
+                       '--group-size', str(args.group_size)]
+            completed = subprocess.run(command, capture_output=True, text=True)
+            if completed.returncode != 0:
+                results.append({'scenario': scenario, 'hosts': hosts, 'error': completed.stderr.strip()[-2000:]})
+            else:
+                results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+            print(json.dumps(results[-1]), file=sys.stderr, flush=True)
+
+    report = {
+        'python': sys.version.split()[0],
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Time inventory import execution at increasing host counts.
+
+Usage: python scripts/benchmark_import.py [host counts...] [--database URL]
+
+Prints parse and import time per host count; per-host cost should stay flat.
+Nodes and groups are deleted between counts, so the benchmark runs against a
+throwaway SQLite file. DATABASE_URL is deliberately ignored; to measure
+another backend pass --database, which must point at an empty database.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from flask import Flask
+from sqlalchemy import create_engine, inspect
+from models import db, Node, NodeGroup, node_group_members
+from inventory_parser import load_inventory
+from importer import bulk_import
+from migrations import run_migrations
+
+
+def write_inventory(path, hosts, groups=20):
+    with open(path, 'w') as f:
+        f.write('all:\n  hosts:\n')
+        for i in range(hosts):
+            f.write(f'    host{i}.example.com:\n      ansible_host: 10.{i // 65536}.{i // 256 % 256}.{i % 256}\n')
+        f.write('  children:\n')
+        for g in range(groups):
+            f.write(f'    group{g}:\n      hosts:\n')
+            for i in range(g, hosts, groups):
+                f.write(f'        host{i}.example.com:\n')
+
+
+def is_empty(url):
+    """True if no table in the database holds any rows"""
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            return not any(conn.execute(db.select(db.literal(1)).select_from(db.table(name)).limit(1)).first()
+                           for name in inspect(conn).get_table_names())
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('counts', type=int, nargs='*', default=[1000, 5000, 20000])
+    parser.add_argument('--database', help='empty database URL to use instead of a temporary SQLite file')
+    args = parser.parse_args()
+
+    if args.database and not is_empty(args.database):
+        sys.exit('Refusing to run: --database is not empty and the benchmark deletes every node and group')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = args.database or f"sqlite:///{os.path.join(temp_dir, 'benchmark.db')}"
+        db.init_app(app)
+
+        print(f"{'hosts':>8} {'parse s':>8} {'import s':>9} {'us/host':>8}")
+        with app.app_context():
+            run_migrations(db.engine)
+            for count in args.counts:
+                db.session.execute(node_group_members.delete())
+                db.session.execute(db.delete(Node))
+                db.session.execute(db.delete(NodeGroup))
+                db.session.commit()
+
+                path = os.path.join(temp_dir, f'inventory_{count}.yml')
+                write_inventory(path, count)
+
+                started = time.perf_counter()
+                nodes_data, groups_data = load_inventory(path, 'yaml')
+                parsed = time.perf_counter()
+                bulk_import(nodes_data, groups_data, description='benchmark')
+                db.session.commit()
+                imported = time.perf_counter()
+
+                per_host = (imported - started) / count * 1e6
+                print(f'{count:>8} {parsed - started:>8.2f} {imported - parsed:>9.2f} {per_host:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
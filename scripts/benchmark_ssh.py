@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Compare per-task latency over SSH with and without the connection profile.
+
+Usage: python scripts/benchmark_ssh.py [--hosts N] [--tasks N] [--runs N]
+
+Starts a throwaway sshd on loopback addresses (127.0.0.2, 127.0.0.3, ...)
+that accepts a generated key for the current user, then runs a playbook of
+trivial tasks back to back under each configuration:
+
+  no-multiplexing  ControlMaster=no, no pipelining: a handshake per task
+  ansible-default  Ansible's stock ssh_args and pipelining off, which is what
+                   runs used before the connection profile
+  profile          ConnectionProfile settings from config.py
+
+Prints one JSON object per configuration and run. Requires the sshd binary
+(openssh-server); no network access or root is needed.
+"""
+import argparse
+import getpass
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from config import Config
+from connection_profile import ConnectionProfile
+
+
+def find_sshd():
+    return shutil.which('sshd') or next(
+        (path for path in ('/usr/sbin/sshd', '/usr/local/sbin/sshd') if os.path.exists(path)), None)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_sshd(sshd, work_dir, hosts):
+    """Run sshd as the current user and return (process, port, client key path)"""
+    host_key = os.path.join(work_dir, 'host_key')
+    client_key = os.path.join(work_dir, 'client_key')
+    for key in (host_key, client_key):
+        subprocess.run(['ssh-keygen', '-q', '-t', 'ed25519', '-N', '', '-f', key], check=True)
+    shutil.copy(client_key + '.pub', os.path.join(work_dir, 'authorized_keys'))
+
+    port = free_port()
+    config_path = os.path.join(work_dir, 'sshd_config')
+    with open(config_path, 'w') as f:
+        f.write(f'Port {port}\n')
+        for i in range(hosts):
+            f.write(f'ListenAddress 127.0.0.{i + 2}\n')
+        f.write(f'HostKey {host_key}\n'
+                f'PidFile {work_dir}/sshd.pid\n'
+                f'AuthorizedKeysFile {work_dir}/authorized_keys\n'
+                'PasswordAuthentication no\n'
+                'KbdInteractiveAuthentication no\n'
+                'StrictModes no\n'
+                'UsePAM no\n'
+                'MaxStartups 100\n'
+                'MaxSessions 100\n')
+
+    process = subprocess.Popen([sshd, '-D', '-e', '-f', config_path], stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.2', port), timeout=1).close()
+            return process, port, client_key
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError('sshd did not start listening')
+
+
+def write_files(work_dir, hosts, tasks, port, client_key):
+    inventory = os.path.join(work_dir, 'inventory.json')
+    with open(inventory, 'w') as f:
+        json.dump({'all': {
+            'hosts': {f'host{i}': {'ansible_host': f'127.0.0.{i + 2}'} for i in range(hosts)},
+            'vars': {
+                'ansible_port': port,
+                'ansible_user': getpass.getuser(),
+                'ansible_ssh_private_key_file': client_key,
+                'ansible_ssh_common_args': '-o StrictHostKeyChecking=no -o UserKnownHostsFile=/dev/null',
+                'ansible_python_interpreter': sys.executable
+            }
+        }}, f)
+
+    playbook = os.path.join(work_dir, 'benchmark.yml')
+    with open(playbook, 'w') as f:
+        f.write('- hosts: all\n  gather_facts: false\n  tasks:\n')
+        for i in range(tasks):
+            f.write(f'    - name: task {i}\n      command: /bin/true\n')
+    return inventory, playbook
+
+
+def configurations(work_dir):
+    profile = ConnectionProfile({
+        'SSH_CONTROL_PATH_DIR': os.path.join(work_dir, 'cp-profile'),
+        'SSH_CONTROL_PERSIST': Config.SSH_CONTROL_PERSIST,
+        'SSH_PIPELINING': Config.SSH_PIPELINING
+    })
+    return {
+        'no-multiplexing': {
+            'ANSIBLE_SSH_ARGS': '-o ControlMaster=no',
+            'ANSIBLE_PIPELINING': 'False'
+        },
+        'ansible-default': {
+            'ANSIBLE_SSH_CONTROL_PATH_DIR': os.path.join(work_dir, 'cp-default'),
+            'ANSIBLE_PIPELINING': 'False'
+        },
+        'profile': profile.envvars()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--hosts', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=20)
+    parser.add_argument('--runs', type=int, default=3, help='back-to-back playbook runs per configuration')
+    parser.add_argument('--forks', type=int, default=Config.EXECUTION_FORKS)
+    args = parser.parse_args()
+
+    sshd = find_sshd()
+    if sshd is None:
+        sys.exit('sshd not found; install openssh-server to run this benchmark')
+
+    with tempfile.TemporaryDirectory(prefix='ssh-bench-') as work_dir:
+        process, port, client_key = start_sshd(sshd, work_dir, args.hosts)
+        try:
+            inventory, playbook = write_files(work_dir, args.hosts, args.tasks, port, client_key)
+            for name, envvars in configurations(work_dir).items():
+                env = dict(os.environ, ANSIBLE_FORKS=str(args.forks), ANSIBLE_GATHERING='explicit', **envvars)
+                for run in range(1, args.runs + 1):
+                    started = time.perf_counter()
+                    result = subprocess.run(['ansible-playbook', '-i', inventory, playbook], env=env,
+                                            stdin=subprocess.DEVNULL, capture_output=True, text=True)
+                    elapsed = time.perf_counter() - started
+                    print(json.dumps({
+                        'config': name,
+                        'run': run,
+                        'hosts': args.hosts,
+                        'tasks': args.tasks,
+                        'ok': result.returncode == 0,
+                        'wall_s': round(elapsed, 3),
+                        'ms_per_task': round(elapsed / args.tasks * 1000, 1)
+                    }), flush=True)
+                    if result.returncode != 0:
+                        print(result.stdout[-2000:], file=sys.stderr)
+                # Close this configuration's master connections before the next one
+                subprocess.run(['pkill', '-f', f'ssh: {work_dir}'], stderr=subprocess.DEVNULL)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()